@@ -180,6 +180,7 @@ from corehq.apps.users.util import cc_user_domain
 from corehq.blobs.mixin import CODES, BlobMixin
 from corehq.const import USER_DATE_FORMAT, USER_TIME_FORMAT
 from corehq.util import bitly, view_utils
+from corehq.util.metrics import metrics_counter
 from corehq.util.quickcache import quickcache
 from corehq.util.timer import TimingContext, time_method
 from corehq.util.timezones.conversions import ServerTime
@@ -191,6 +192,17 @@ FIELD_SEPARATOR = ':'
 
 ATTACHMENT_REGEX = r'[^/]*\.xml'
 
+# Application properties that change between builds but are not used to
+# generate form files
+BUILD_METADATA_PROPERTIES = (
+    '_id', '_rev', '_attachments', 'external_blobs', 'version', 'copy_of',
+    'built_on', 'built_with', 'date_created', 'build_comment', 'comment_from',
+    'is_released', 'last_released', 'is_auto_generated', 'build_broken',
+    'build_broken_reason', 'has_submissions', 'last_modified', 'cached_properties',
+    'short_url', 'short_odk_url', 'short_odk_media_url', 'multimedia_map',
+    'form_file_keys', 'build_versions_set',
+)
+
 ANDROID_LOGO_PROPERTY_MAPPING = {
     'hq_logo_android_home': 'brand-banner-home',
     'hq_logo_android_login': 'brand-banner-login',
@@ -4530,7 +4542,8 @@ class ApplicationBase(LazyBlobDoc, SnapshotMixin,
         else:
             copy = deepcopy(self.to_json())
             bad_keys = ('_id', '_rev', '_attachments', 'external_blobs',
-                        'short_url', 'short_odk_url', 'short_odk_media_url', 'recipients')
+                        'short_url', 'short_odk_url', 'short_odk_media_url', 'recipients',
+                        'form_file_keys', 'build_versions_set')
 
             for bad_key in bad_keys:
                 if bad_key in copy:
@@ -4762,6 +4775,12 @@ class Application(ApplicationBase, ApplicationMediaMixin, ApplicationIntegration
 
     family_id = StringProperty()  # ID of earliest parent app across copies and linked apps
 
+    # {filename: key} of the form files of a build. Form files with the
+    # same key are identical, so they can be reused by later builds.
+    form_file_keys = DictProperty()
+    # whether form and media versions of a build were set when it was made
+    build_versions_set = BooleanProperty(default=False)
+
     def has_modules(self):
         return len(self.get_modules()) > 0 and not self.is_remote_app()
 
@@ -4888,13 +4907,19 @@ class Application(ApplicationBase, ApplicationMediaMixin, ApplicationIntegration
         """
         Set the 'version' property on each form as follows to the current app version if the form is new
         or has changed since the last build. Otherwise set it to the version from the last build.
+
+        Builds also record the keys of their form files, see ``_set_form_file_keys``.
         """
+        latest_build = self._get_version_comparison_build()
+        if latest_build:
+            self._set_form_versions_from_build(latest_build)
+        if self.copy_of:
+            self._set_form_file_keys()
+
+    def _set_form_versions_from_build(self, latest_build):
         def _hash(val):
             return hashlib.md5(val).hexdigest()
 
-        latest_build = self._get_version_comparison_build()
-        if not latest_build:
-            return
         force_new_version = self.build_profiles != latest_build.build_profiles
         for form_stuff in self.get_forms(bare=False):
             filename = 'files/%s' % self.get_form_filename(**form_stuff)
@@ -4902,16 +4927,19 @@ class Application(ApplicationBase, ApplicationMediaMixin, ApplicationIntegration
             if not force_new_version:
                 try:
                     previous_form = latest_build.get_form(current_form.unique_id)
+                except FormNotFoundException:
+                    current_form.version = None
+                    continue
+                # set form version to previous version, and only update if content has changed
+                current_form.version = previous_form.get_version()
+                try:
                     # take the previous version's compiled form as-is
                     # (generation code may have changed since last build)
                     previous_source = latest_build.fetch_attachment(filename)
-                except (ResourceNotFound, FormNotFoundException):
+                except ResourceNotFound:
                     current_form.version = None
                 else:
                     previous_hash = _hash(previous_source)
-
-                    # set form version to previous version, and only update if content has changed
-                    current_form.version = previous_form.get_version()
                     current_form = current_form.validate_form()
                     current_hash = _hash(current_form.render_xform())
                     if previous_hash != current_hash:
@@ -4921,6 +4949,31 @@ class Application(ApplicationBase, ApplicationMediaMixin, ApplicationIntegration
             else:
                 current_form.version = None
 
+    def _set_form_file_keys(self):
+        """Record a key for each form file of the build
+
+        The key hashes the inputs the file is generated from together with
+        the form as rendered by the current code, so form files of the
+        previous build are only reused when neither has changed since.
+        """
+        inputs_digest = self._get_form_inputs_digest()
+        build_profile_ids = [None] + sorted(self.build_profiles)
+        self.form_file_keys = {}
+        for form_stuff in self.get_forms(bare=False):
+            form = form_stuff['form']
+            if self._exclude_form_file(form):
+                continue
+            try:
+                rendered_hash = hashlib.md5(form.render_xform()).hexdigest()
+            except XFormException:
+                # reported when the form files are generated
+                continue
+            for build_profile_id in build_profile_ids:
+                prefix = '' if not build_profile_id else build_profile_id + '/'
+                filename = prefix + self.get_form_filename(**form_stuff)
+                self.form_file_keys[filename] = self._get_form_file_key(
+                    form, build_profile_id, inputs_digest, rendered_hash)
+
     @time_method()
     def set_media_versions(self):
         """
@@ -5137,27 +5190,74 @@ class Application(ApplicationBase, ApplicationMediaMixin, ApplicationIntegration
             for lang in ['default'] + self.get_build_langs(build_profile_id)
         }
 
+    def _get_form_inputs_digest(self):
+        """Hash of the app properties that form files are generated from
+
+        Form versions are excluded, since each form file only depends
+        on its own version.
+        """
+        app_json = self.to_json()
+        for name in BUILD_METADATA_PROPERTIES:
+            app_json.pop(name, None)
+        for module in app_json.get('modules', []):
+            for form in module.get('forms', []):
+                form.pop('version', None)
+                form.pop('validation_cache', None)
+        inputs = [
+            app_json,
+            sorted(toggles.toggles_enabled_for_domain(self.domain)),
+        ]
+        return hashlib.md5(json.dumps(inputs, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def _get_form_file_key(self, form, build_profile_id, inputs_digest, rendered_hash):
+        inputs = [
+            inputs_digest, build_profile_id, form.unique_id, form.get_version(), form.source, rendered_hash,
+        ]
+        return hashlib.md5(json.dumps(inputs).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _exclude_form_file(form):
+        return isinstance(form, ShadowForm) or form.is_a_disabled_release_form()
+
     @time_method()
     def _get_form_files(self, prefix, build_profile_id):
+        """Get form files, reusing files of the previous build that
+        have the same key"""
         files = {}
+        previous_build = self._get_version_comparison_build()
+        previous_keys = previous_build.form_file_keys if previous_build else {}
         for form_stuff in self.get_forms(bare=False):
-            def exclude_form(form):
-                return isinstance(form, ShadowForm) or form.is_a_disabled_release_form()
-
-            if not exclude_form(form_stuff['form']):
+            if not self._exclude_form_file(form_stuff['form']):
                 filename = prefix + self.get_form_filename(**form_stuff)
                 form = form_stuff['form']
-                try:
-                    files[filename] = form.render_xform(build_profile_id=build_profile_id)
-                except XFormException as e:
-                    raise XFormException(_('Error in form "{}": {}').format(trans(form.name), e))
+                key = self.form_file_keys.get(filename)
+                content = None
+                if key is not None and previous_keys.get(filename) == key:
+                    try:
+                        content = previous_build.lazy_fetch_attachment('files/%s' % filename)
+                    except ResourceNotFound:
+                        pass
+                metrics_counter('commcare.app_build.form_files', tags={
+                    'result': 'reused' if content is not None else 'generated',
+                })
+                if content is None:
+                    try:
+                        content = form.render_xform(build_profile_id=build_profile_id)
+                    except XFormException as e:
+                        raise XFormException(_('Error in form "{}": {}').format(trans(form.name), e))
+                files[filename] = content
         return files
 
     @time_method()
     @memoized
     def create_all_files(self, build_profile_id=None):
-        self.set_form_versions()
-        self.set_media_versions()
+        if not (self.copy_of and self.build_versions_set):
+            # versions of builds are set when they are made, and are
+            # shared by the files of all build profiles
+            self.set_form_versions()
+            self.set_media_versions()
+            if self.copy_of:
+                self.build_versions_set = True
         prefix = '' if not build_profile_id else build_profile_id + '/'
         files = {
             '{}profile.xml'.format(prefix): self.create_profile(is_odk=False, build_profile_id=build_profile_id),
@@ -1,3 +1,4 @@
+from contextlib import nullcontext
 from distutils.version import LooseVersion
 
 from django.urls import reverse
@@ -61,10 +62,18 @@ class SuiteGenerator(object):
         self.suite = Suite(version=self.app.version, descriptor=self.descriptor)
         self.build_profile_id = build_profile_id
 
+    def timing(self, name):
+        """Time a step of suite generation if the app is being timed"""
+        if self.app.timing_context.is_started():
+            return self.app.timing_context(name)
+        return nullcontext()
+
     def add_section(self, contributor_cls):
         contributor = contributor_cls(self.suite, self.app, self.modules, self.build_profile_id)
         section = contributor.section_name
-        section_elements = contributor.get_section_elements()
+        # some contributors are generators: time them while they are consumed
+        with self.timing(contributor_cls.__name__):
+            section_elements = list(contributor.get_section_elements())
         getattr(self.suite, section).extend(section_elements)
         return section_elements
 
@@ -88,12 +97,15 @@ class SuiteGenerator(object):
         else:
             training_menu = None
 
-        for module in self.modules:
-            self.suite.entries.extend(entries.get_module_contributions(module))
+        with self.timing("EntriesContributor"):
+            for module in self.modules:
+                self.suite.entries.extend(entries.get_module_contributions(module))
 
-            self.suite.menus.extend(
-                menus.get_module_contributions(module, training_menu)
-            )
+        with self.timing("MenuContributor"):
+            for module in self.modules:
+                self.suite.menus.extend(
+                    menus.get_module_contributions(module, training_menu)
+                )
 
         if training_menu:
             self.suite.menus.append(training_menu)
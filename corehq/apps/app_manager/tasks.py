@@ -2,6 +2,7 @@ from django.utils.translation import gettext as _
 
 from celery.task import task
 from celery.utils.log import get_task_logger
+from couchdbkit import ResourceConflict
 
 from corehq.apps.app_manager.dbaccessors import (
     get_app,
@@ -15,6 +16,8 @@ from corehq.util.decorators import serial_task
 
 logger = get_task_logger(__name__)
 
+BUILD_PROFILE_SAVE_ATTEMPTS = 5
+
 
 @task(queue='background_queue', ignore_result=True)
 def create_usercases(domain_name):
@@ -49,15 +52,39 @@ def autogenerate_build_task(app_id, domain, version, comment):
 
 @task(queue='background_queue', ignore_result=True)
 def create_build_files_for_all_app_profiles(domain, build_id):
+    """Create build files of all build profiles of a build
+
+    Each build profile is generated by its own task so that profiles are
+    generated concurrently.
+
+    Tasks don't share generated files: suites, media suites and form files
+    all depend on the profile's languages. Form and media versions are
+    set once when the build is made, and form files that are unchanged
+    since the previous build are reused from it (see ``form_file_keys``).
+    """
     app = get_app(domain, build_id)
-    build_profiles = app.build_profiles
-    save_app = False
-    for profile in build_profiles:
+    for profile in app.build_profiles:
         if not app.has_attachment('files/{id}/profile.xml'.format(id=profile)):
-            app.create_build_files(build_profile_id=profile)
-            save_app = True
-    if save_app:
-        app.save()
+            create_build_files_for_app_profile.delay(domain, build_id, profile)
+
+
+@task(queue='background_queue', ignore_result=True)
+def create_build_files_for_app_profile(domain, build_id, build_profile_id):
+    app = get_app(domain, build_id)
+    if app.has_attachment('files/{id}/profile.xml'.format(id=build_profile_id)):
+        return
+    files = app.create_all_files(build_profile_id)
+    for attempt in range(BUILD_PROFILE_SAVE_ATTEMPTS):
+        for filepath, content in files.items():
+            app.lazy_put_attachment(content, 'files/%s' % filepath)
+        try:
+            app.save()
+            return
+        except ResourceConflict:
+            # files of another profile were saved concurrently
+            if attempt == BUILD_PROFILE_SAVE_ATTEMPTS - 1:
+                raise
+            app = get_app(domain, build_id)
 
 
 @task(queue='background_queue')
@@ -1,7 +1,6 @@
 import itertools
 import os
-import tempfile
-import zipfile
+import uuid
 
 from django.test import TestCase
 
@@ -11,10 +10,13 @@ from corehq.apps.app_manager.tests.app_factory import AppFactory
 from corehq.apps.app_manager.xform_builder import XFormBuilder
 from corehq.apps.hqmedia.models import CommCareImage
 from corehq.apps.hqmedia.tasks import (
+    _get_ccz_cache_key,
     check_ccz_multimedia_integrity,
+    create_files_for_ccz,
     find_missing_locale_ids_in_ccz,
 )
 from corehq.apps.hqmedia.views import iter_media_files
+from corehq.blobs import CODES, get_blob_db
 
 
 class CCZTest(TestCase):
@@ -54,26 +56,62 @@ class CCZTest(TestCase):
         self.module.set_icon('en', icon_path)
         self.factory.app.create_mapping(self.image, icon_path, save=False)
 
-        zip_path = self._create_multimedia_integrity_zip(
-            self.factory.app.create_media_suite(),
+        files = self._get_multimedia_integrity_files(
             list(self.factory.app.get_media_objects(remove_unused=True)))
-        errors = check_ccz_multimedia_integrity(self.domain, zip_path)
+        errors = check_ccz_multimedia_integrity(self.domain, list(files), files)
         self.assertEqual(len(errors), 0)
 
-        zip_path = self._create_multimedia_integrity_zip(self.factory.app.create_media_suite(), [])
-        errors = check_ccz_multimedia_integrity(self.domain, zip_path)
+        files = self._get_multimedia_integrity_files([])
+        errors = check_ccz_multimedia_integrity(self.domain, list(files), files)
         self.assertEqual(len(errors), 1)
         self.assertIn('commcare/icon.png', errors[0])
 
-    def _create_multimedia_integrity_zip(self, media_suite, media_objects):
-        # Creates a limited zip, containing only media suite and multimedia files
+    def _get_multimedia_integrity_files(self, media_objects):
+        # Limited CCZ files, containing only media suite and multimedia files
         files, errors = iter_media_files(media_objects)
         media_suite = self.factory.app.create_media_suite()
-        files = itertools.chain(files, [('media_suite.xml', media_suite)])
-
-        dummy, zip_path = tempfile.mkstemp()
-        with open(zip_path, 'wb') as tmp:
-            with zipfile.ZipFile(tmp, "w") as z:
-                for path, data in files:
-                    z.writestr(path, data, zipfile.ZIP_STORED)
-        return zip_path
+        return dict(itertools.chain(files, [('media_suite.xml', media_suite)]))
+
+    def test_ccz_of_build_is_cached(self):
+        build = self.factory.app
+        build._id = uuid.uuid4().hex
+        build.copy_of = 'ccz-app-id'
+
+        cache_key = _get_ccz_cache_key(build, None, True, True, False, False)
+        for key in [cache_key, _get_ccz_cache_key(build, None, False, True, False, False)]:
+            self.addCleanup(get_blob_db().delete, key=key)
+
+        def create_ccz_file(build, build_profile_id, include_multimedia_files, include_index_files,
+                            download_id, compress_zip, filename, download_targeted_version, fpath, *args):
+            with open(fpath, 'wb') as ccz:
+                ccz.write(b'ccz content')
+
+        with patch('corehq.apps.hqmedia.tasks._create_ccz_file', side_effect=create_ccz_file) as create:
+            self.assertIsNone(create_files_for_ccz(build, None))
+            create_files_for_ccz(build, None)
+            create_files_for_ccz(build, None, include_multimedia_files=False)
+        self.assertEqual(create.call_count, 2)
+
+        with get_blob_db().get(key=cache_key, type_code=CODES.application_ccz) as ccz:
+            self.assertEqual(ccz.read(), b'ccz content')
+
+    def test_ccz_being_cached_elsewhere_is_built(self):
+        build = self.factory.app
+        build._id = uuid.uuid4().hex
+        build.copy_of = 'ccz-app-id'
+
+        def create_ccz_file(build, build_profile_id, include_multimedia_files, include_index_files,
+                            download_id, compress_zip, filename, download_targeted_version, fpath, *args):
+            with open(fpath, 'wb') as ccz:
+                ccz.write(b'ccz content')
+
+        with patch('corehq.apps.hqmedia.tasks._create_ccz_file', side_effect=create_ccz_file) as create, \
+                patch('corehq.apps.hqmedia.tasks.get_redis_lock') as get_lock:
+            get_lock.return_value.acquire.return_value = False
+            fpath = create_files_for_ccz(build, None)
+        self.addCleanup(os.remove, fpath)
+        self.assertEqual(create.call_count, 1)
+        with open(fpath, 'rb') as ccz:
+            self.assertEqual(ccz.read(), b'ccz content')
+        cache_key = _get_ccz_cache_key(build, None, True, True, False, False)
+        self.assertFalse(get_blob_db().exists(key=cache_key))
@@ -4,6 +4,7 @@ from unittest.mock import patch
 
 from corehq.apps.app_manager.models import (
     Application,
+    BuildProfile,
     Form,
     FormLink,
     Module,
@@ -117,6 +118,71 @@ class FormVersioningTest(TestCase):
         self.assertEqual(self.get_form_versions(xxx_build1), [1, 1])
         self.assertEqual(self.get_form_versions(xxx_build2), [2, 1])
 
+    @patch_default_builds
+    @patch('corehq.apps.app_manager.models.validate_xform', return_value=None)
+    def test_unchanged_form_files_are_reused(self, mock):
+        add_build(version='2.7.0', build_number=20655)
+        factory = AppFactory('form-file-reuse-test', 'Foo')
+        m0, f0 = factory.new_basic_module("bar", "bar")
+        f0.source = get_simple_form(xmlns='xmlns-0.0')
+        f1 = factory.new_form(m0)
+        f1.source = get_simple_form(xmlns='xmlns-1')
+        app = factory.app
+        app.build_spec = BuildSpec.from_string('2.7.0/latest')
+        app.build_profiles = {'en-profile': BuildProfile(langs=['en'], name='English')}
+        app.save()
+        build1 = app.make_build()
+        build1.save()
+        build1.create_build_files('en-profile')
+        build1.save()
+
+        # change the title of the first form
+        app.get_module(0).get_form(0).source = f0.source.replace('New Form', 'Renamed Form')
+        app.save()
+        with patch.object(Form, 'add_stuff_to_xform', autospec=True,
+                          side_effect=Form.add_stuff_to_xform) as render:
+            build2 = app.make_build()
+            build2.save()
+            build2.create_build_files('en-profile')
+            build2.save()
+
+        def rendered(build_profile_id):
+            return {
+                call.args[0].unique_id for call in render.call_args_list
+                if call.args[2] == build_profile_id
+            }
+
+        # all forms are still rendered to compare them with the previous build
+        self.assertEqual(rendered(None), {f0.unique_id, f1.unique_id})
+        self.assertEqual(rendered('en-profile'), {f0.unique_id})
+        self.assertEqual(self.get_form_versions(build2), [2, 1])
+        form1_file = 'files/en-profile/modules-0/forms-1.xml'
+        self.assertEqual(build2.fetch_attachment(form1_file), build1.fetch_attachment(form1_file))
+        self.assertEqual(build2.form_file_keys['en-profile/modules-0/forms-1.xml'],
+                         build1.form_file_keys['en-profile/modules-0/forms-1.xml'])
+
+    @patch_default_builds
+    @patch('corehq.apps.app_manager.models.validate_xform', return_value=None)
+    def test_build_profile_files_keep_build_versions(self, mock):
+        add_build(version='2.7.0', build_number=20655)
+        factory = AppFactory('build-versions-test', 'Foo')
+        m0, f0 = factory.new_basic_module("bar", "bar")
+        f0.source = get_simple_form(xmlns='xmlns-0.0')
+        app = factory.app
+        app.build_spec = BuildSpec.from_string('2.7.0/latest')
+        app.build_profiles = {'en-profile': BuildProfile(langs=['en'], name='English')}
+        app.save()
+        with patch('corehq.apps.app_manager.models.toggles.SKIP_CREATING_DEFAULT_BUILD_FILES_ON_BUILD.enabled',
+                   return_value=True):
+            build = app.make_build()
+        self.assertTrue(build.build_versions_set)
+        build.save()
+
+        build = Application.get(build._id)
+        with patch.object(Application, 'set_form_versions') as set_form_versions:
+            build.create_build_files('en-profile')
+        set_form_versions.assert_not_called()
+
     @staticmethod
     def get_form_versions(build):
         from lxml import etree
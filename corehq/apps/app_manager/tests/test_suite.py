@@ -231,6 +231,18 @@ class SuiteTest(SimpleTestCase, SuiteMixin):
         with self.assertRaises(SuiteValidationError):
             factory.app.create_suite()
 
+    def test_contributors_are_timed(self, *args):
+        factory = AppFactory()
+        module, form = factory.new_basic_module('m0', 'case1')
+        factory.form_requires_case(form, 'case1')
+        timing_context = factory.app.timing_context
+        with timing_context:
+            factory.app.create_suite()
+        names = {timer.name for timer in timing_context.to_list()}
+        for name in ['FormResourceContributor', 'DetailContributor', 'EntriesContributor',
+                     'MenuContributor', 'FixtureContributor']:
+            self.assertIn(name, names)
+
     def test_custom_variables(self, *args):
         factory = AppFactory()
         module, form = factory.new_basic_module('m0', 'case1')
@@ -97,6 +97,13 @@ def download_suite(request, domain, app_id):
     if not request.app.copy_of:
         request.app.set_form_versions()
     profile = _get_build_profile_id(request)
+    if request.app.copy_of:
+        # saved builds store the suite generated when they were built
+        path = 'files/{}/suite.xml'.format(profile) if profile else 'files/suite.xml'
+        try:
+            return HttpResponse(request.app.fetch_attachment(path))
+        except ResourceNotFound:
+            pass
     return HttpResponse(
         request.app.create_suite(build_profile_id=profile)
     )
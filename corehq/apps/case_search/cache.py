@@ -0,0 +1,103 @@
+"""
+Caching of case search results for domains that opt in via the
+``CASE_SEARCH_RESULT_CACHE`` toggle.
+
+Entries are keyed by a hash of the assembled Elasticsearch query along
+with a "generation" token per (domain, case type). The case search pillow
+discards the generation token whenever a case of that type changes, which
+orphans every cached result that could include it. Orphaned entries are
+never read again and fall out of the cache after ``CACHE_TIMEOUT``.
+
+Changes are not visible to searches until the index refreshes, so for
+``REFRESH_WINDOW`` after an invalidation results for that case type are
+not cached, which would otherwise cache stale hits under the new
+generation. When a case's type changes, results for its old type are
+invalidated as the case is updated, before the pillow indexes it, so they
+are not cached for the longer ``TYPE_CHANGE_WINDOW``.
+"""
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+
+from corehq import toggles
+
+CACHE_TIMEOUT = 5 * 60
+GENERATION_TIMEOUT = 24 * 60 * 60
+# longer than the index refresh interval (INDEX_CONF_STANDARD)
+REFRESH_WINDOW = 10
+# how long a case may still be indexed with the type it was changed from
+TYPE_CHANGE_WINDOW = CACHE_TIMEOUT
+
+_ALL_CASE_TYPES = '*'
+
+
+def case_search_cache_enabled(domain, query_domains):
+    # Registry searches span domains whose changes may not be tracked,
+    # so only searches scoped to the requesting domain are cached.
+    return list(query_domains) == [domain] and toggles.CASE_SEARCH_RESULT_CACHE.enabled(domain)
+
+
+def get_case_search_hits(domain, case_types, search_es):
+    """Return the raw hits for ``search_es``, from the cache if possible"""
+    case_types = [_ALL_CASE_TYPES] + sorted(set(case_types))
+    if _recently_changed(domain, case_types):
+        return search_es.run().raw_hits
+
+    key = _get_cache_key(domain, case_types, search_es)
+    hits = cache.get(key)
+    if hits is None:
+        hits = search_es.run().raw_hits
+        cache.set(key, hits, CACHE_TIMEOUT)
+    return hits
+
+
+def invalidate_case_search_cache(domain, case_type=None):
+    """Invalidate cached results for ``case_type`` in ``domain``
+
+    If the case type is not known all cached results for the domain are
+    invalidated.
+    """
+    _invalidate(domain, case_type or _ALL_CASE_TYPES, REFRESH_WINDOW)
+
+
+def invalidate_case_type_change(domain, old_case_type):
+    """Invalidate cached results for the type a case is changed from"""
+    if toggles.CASE_SEARCH_RESULT_CACHE.enabled(domain):
+        _invalidate(domain, old_case_type, TYPE_CHANGE_WINDOW)
+
+
+def _invalidate(domain, case_type, window):
+    cache.set(_changed_key(domain, case_type), True, window)
+    cache.delete(_generation_key(domain, case_type))
+
+
+def _recently_changed(domain, case_types):
+    return bool(cache.get_many([_changed_key(domain, case_type) for case_type in case_types]))
+
+
+def _get_cache_key(domain, case_types, search_es):
+    generations = _get_generations(domain, case_types)
+    normalized_query = json.dumps(search_es.raw_query, sort_keys=True)
+    query_hash = hashlib.md5(normalized_query.encode('utf-8')).hexdigest()
+    generation_hash = hashlib.md5(':'.join(generations).encode('utf-8')).hexdigest()
+    return f'case-search-results:{domain}:{query_hash}:{generation_hash}'
+
+
+def _get_generations(domain, case_types):
+    keys = [_generation_key(domain, case_type) for case_type in case_types]
+    generations = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in generations}
+    if missing:
+        cache.set_many(missing, GENERATION_TIMEOUT)
+        generations.update(missing)
+    return [generations[key] for key in keys]
+
+
+def _generation_key(domain, case_type):
+    return f'case-search-generation:{domain}:{case_type}'
+
+
+def _changed_key(domain, case_type):
+    return f'case-search-changed:{domain}:{case_type}'
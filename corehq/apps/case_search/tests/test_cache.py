@@ -0,0 +1,96 @@
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from corehq.apps.case_search.cache import (
+    TYPE_CHANGE_WINDOW,
+    _changed_key,
+    case_search_cache_enabled,
+    get_case_search_hits,
+    invalidate_case_search_cache,
+    invalidate_case_type_change,
+)
+from corehq.util.test_utils import flag_enabled
+
+
+class TestCaseSearchResultCache(SimpleTestCase):
+    domain = 'case-search-cache'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def _search_es(self, query, hits):
+        search_es = MagicMock()
+        search_es.raw_query = query
+        search_es.run.return_value.raw_hits = hits
+        return search_es
+
+    def test_repeated_query_is_cached(self):
+        search_es = self._search_es({"query": {"a": 1, "b": 2}}, [{"_id": "c1"}])
+        self.assertEqual(get_case_search_hits(self.domain, ['patient'], search_es), [{"_id": "c1"}])
+        self.assertEqual(get_case_search_hits(self.domain, ['patient'], search_es), [{"_id": "c1"}])
+        self.assertEqual(search_es.run.call_count, 1)
+
+    def test_key_is_normalized(self):
+        first = self._search_es({"query": {"a": 1, "b": 2}}, [{"_id": "c1"}])
+        second = self._search_es({"query": {"b": 2, "a": 1}}, [{"_id": "c2"}])
+        get_case_search_hits(self.domain, ['patient', 'household'], first)
+        self.assertEqual(get_case_search_hits(self.domain, ['household', 'patient'], second), [{"_id": "c1"}])
+        second.run.assert_not_called()
+
+    def test_invalidate_case_type(self):
+        search_es = self._search_es({"query": {}}, [])
+        get_case_search_hits(self.domain, ['patient'], search_es)
+        invalidate_case_search_cache(self.domain, 'household')
+        get_case_search_hits(self.domain, ['patient'], search_es)
+        self.assertEqual(search_es.run.call_count, 1)
+
+        invalidate_case_search_cache(self.domain, 'patient')
+        get_case_search_hits(self.domain, ['patient'], search_es)
+        self.assertEqual(search_es.run.call_count, 2)
+
+    def test_not_cached_until_index_refresh(self):
+        search_es = self._search_es({"query": {}}, [])
+        invalidate_case_search_cache(self.domain, 'patient')
+        get_case_search_hits(self.domain, ['patient'], search_es)
+        get_case_search_hits(self.domain, ['patient'], search_es)
+        self.assertEqual(search_es.run.call_count, 2)
+
+        cache.delete(_changed_key(self.domain, 'patient'))  # the index has refreshed
+        get_case_search_hits(self.domain, ['patient'], search_es)
+        get_case_search_hits(self.domain, ['patient'], search_es)
+        self.assertEqual(search_es.run.call_count, 3)
+
+    def test_invalidate_unknown_case_type(self):
+        search_es = self._search_es({"query": {}}, [])
+        get_case_search_hits(self.domain, ['patient'], search_es)
+        invalidate_case_search_cache(self.domain)
+        get_case_search_hits(self.domain, ['patient'], search_es)
+        self.assertEqual(search_es.run.call_count, 2)
+
+    @flag_enabled('CASE_SEARCH_RESULT_CACHE')
+    def test_invalidate_case_type_change(self):
+        search_es = self._search_es({"query": {}}, [])
+        get_case_search_hits(self.domain, ['patient'], search_es)
+        with patch('corehq.apps.case_search.cache.cache.set', wraps=cache.set) as cache_set:
+            invalidate_case_type_change(self.domain, 'patient')
+        cache_set.assert_called_once_with(_changed_key(self.domain, 'patient'), True, TYPE_CHANGE_WINDOW)
+        get_case_search_hits(self.domain, ['patient'], search_es)
+        self.assertEqual(search_es.run.call_count, 2)
+
+    def test_case_type_change_without_cache(self):
+        search_es = self._search_es({"query": {}}, [])
+        get_case_search_hits(self.domain, ['patient'], search_es)
+        invalidate_case_type_change(self.domain, 'patient')
+        get_case_search_hits(self.domain, ['patient'], search_es)
+        self.assertEqual(search_es.run.call_count, 1)
+
+    @flag_enabled('CASE_SEARCH_RESULT_CACHE')
+    def test_registry_searches_not_cached(self):
+        self.assertTrue(case_search_cache_enabled(self.domain, [self.domain]))
+        self.assertFalse(case_search_cache_enabled(self.domain, [self.domain, 'other']))
+
+    def test_disabled_by_default(self):
+        self.assertFalse(case_search_cache_enabled(self.domain, [self.domain]))
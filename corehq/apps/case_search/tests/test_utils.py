@@ -1,6 +1,12 @@
 from unittest.mock import patch
 
-from corehq.apps.case_search.utils import get_expanded_case_results
+from testil import eq
+
+from corehq.apps.case_search.utils import (
+    get_expanded_case_results,
+    get_related_case_results,
+)
+from corehq.apps.es.case_search import wrap_case_search_hit
 from corehq.form_processor.models import CommCareCase
 
 
@@ -16,3 +22,32 @@ def test_get_expanded_case_results(get_cases_mock):
     helper = None
     get_expanded_case_results(helper, "potential_duplicate_id", cases)
     get_cases_mock.assert_called_with(helper, {"123", "456"})
+
+
+def test_get_related_case_results_batches_fragments_by_depth():
+    def _case(case_id, **indices):
+        return wrap_case_search_hit({"_id": case_id, "indices": [
+            {"identifier": identifier, "referenced_id": referenced_id,
+             "referenced_type": "monster", "relationship": "child"}
+            for identifier, referenced_id in indices.items()
+        ]})
+
+    cases_by_id = {
+        "p1": _case("p1", parent="gp1"),
+        "h1": _case("h1", parent="hp1"),
+        "gp1": _case("gp1"),
+        "hp1": _case("hp1"),
+    }
+
+    def get_cases(helper, case_ids):
+        return [cases_by_id[case_id] for case_id in case_ids if case_id in cases_by_id]
+
+    cases = [_case("c1", parent="p1"), _case("c2", host="h1")]
+    paths = {"parent", "host", "parent/parent", "host/parent"}
+    with patch("corehq.apps.case_search.utils._get_case_search_cases", side_effect=get_cases) as get_cases_mock:
+        results = get_related_case_results(None, cases, paths)
+
+    eq({case.case_id for case in results}, {"p1", "h1", "gp1", "hp1"})
+    # one query per level of depth rather than one per path fragment
+    eq(get_cases_mock.call_count, 2)
+    eq([c.args[1] for c in get_cases_mock.call_args_list], [{"p1", "h1"}, {"gp1", "hp1"}])
@@ -8,6 +8,10 @@ from dimagi.utils.logging import notify_exception
 
 from corehq.apps.app_manager.dbaccessors import get_app_cached
 from corehq.apps.app_manager.util import module_offers_search
+from corehq.apps.case_search.cache import (
+    case_search_cache_enabled,
+    get_case_search_hits,
+)
 from corehq.apps.case_search.const import (
     CASE_SEARCH_MAX_RESULTS,
     COMMCARE_PROJECT,
@@ -36,6 +40,7 @@ from corehq.apps.registry.exceptions import (
     RegistryNotFound,
 )
 from corehq.apps.registry.helper import DataRegistryHelper
+from corehq.util.quickcache import quickcache
 
 
 def get_case_search_results_from_request(domain, app_id, couch_user, request_dict):
@@ -73,7 +78,10 @@ def get_case_search_results(domain, case_types, criteria,
         raise CaseSearchUserError(str(e))
 
     try:
-        hits = search_es.run().raw_hits
+        if case_search_cache_enabled(domain, query_domains):
+            hits = get_case_search_hits(domain, case_types, search_es)
+        else:
+            hits = search_es.run().raw_hits
     except Exception as e:
         notify_exception(None, str(e), details=dict(
             exception_type=type(e),
@@ -292,39 +300,42 @@ def get_related_case_relationships(app, case_type):
 
     Returns a set of relationships, e.g. {"parent", "host", "parent/parent"}
     """
-    paths = set()
-    for module in app.get_modules():
-        if module.case_type == case_type and module_offers_search(module):
-            for column in module.search_detail("short").columns + module.search_detail("long").columns:
-                if not column.useXpathExpression:
-                    parts = column.field.split("/")
-                    if len(parts) > 1:
-                        parts.pop()     # keep only the relationship: "parent", "parent/parent", etc.
-                        paths.add("/".join(parts))
-    return paths
+    return set(_get_search_detail_relationships(app).get(case_type, {}).get("paths", ()))
 
 
 def get_related_case_results(helper, cases, paths):
     """
     Given a set of cases and a set of case property paths,
     fetches ES documents for all cases referenced by those paths.
+
+    Paths are walked one level at a time and every fragment at the same
+    depth (e.g. "parent" and "host") is fetched with a single query, so
+    the number of queries is bounded by the depth of the deepest path
+    rather than by the number of distinct fragments.
     """
-    if not cases:
+    if not cases or not paths:
         return []
 
+    split_paths = [path.split("/") for path in paths]
     results_cache = {}
-    for path in paths:
-        current_cases = cases
-        parts = path.split("/")
-        for index, identifier in enumerate(parts):
-            fragment = "/".join(parts[:index + 1])
-            if fragment in results_cache:
-                current_cases = results_cache[fragment]
-            else:
-                indices = [case.get_index(identifier) for case in current_cases]
-                related_case_ids = {i.referenced_id for i in indices if i}
-                current_cases = _get_case_search_cases(helper, related_case_ids)
-                results_cache[fragment] = current_cases
+    for depth in range(1, max(len(parts) for parts in split_paths) + 1):
+        ids_by_fragment = {}
+        for parts in split_paths:
+            if len(parts) < depth:
+                continue
+            fragment = "/".join(parts[:depth])
+            if fragment in ids_by_fragment:
+                continue
+            current_cases = results_cache["/".join(parts[:depth - 1])] if depth > 1 else cases
+            indices = [case.get_index(parts[depth - 1]) for case in current_cases]
+            ids_by_fragment[fragment] = {i.referenced_id for i in indices if i}
+
+        cases_by_id = {
+            case.case_id: case
+            for case in _get_case_search_cases(helper, set().union(*ids_by_fragment.values()))
+        }
+        for fragment, case_ids in ids_by_fragment.items():
+            results_cache[fragment] = [cases_by_id[case_id] for case_id in case_ids if case_id in cases_by_id]
 
     results = []
     for path in paths:
@@ -340,18 +351,50 @@ def get_child_case_types(app, case_type):
 
     Returns a set of case types
     """
-    case_types = set()
-    for module in app.get_modules():
-        if module.case_type == case_type and module_offers_search(module):
-            for tab in module.search_detail("long").tabs:
-                if tab.has_nodeset and tab.nodeset_case_type:
-                    case_types.add(tab.nodeset_case_type)
+    return set(_get_search_detail_relationships(app).get(case_type, {}).get("child_case_types", ()))
+
+
+def _get_search_detail_relationships(app):
+    """
+    Walk the app's search modules once and return the relationship paths and
+    child case types used by their search details, keyed by case type::
+
+        {"patient": {"paths": {"parent", "host"}, "child_case_types": {"visit"}}}
+
+    App builds are immutable so the result is cached per build.
+    """
+    if app.copy_of:
+        return _get_search_detail_relationships_for_build(app.domain, app.get_id, app)
+    return _walk_search_detail_relationships(app)
+
 
-    return case_types
+@quickcache(['domain', 'build_id'], timeout=24 * 60 * 60)
+def _get_search_detail_relationships_for_build(domain, build_id, app):
+    return _walk_search_detail_relationships(app)
+
+
+def _walk_search_detail_relationships(app):
+    relationships = defaultdict(lambda: {"paths": set(), "child_case_types": set()})
+    for module in app.get_modules():
+        if not module_offers_search(module):
+            continue
+        case_type_relationships = relationships[module.case_type]
+        for column in module.search_detail("short").columns + module.search_detail("long").columns:
+            if not column.useXpathExpression:
+                parts = column.field.split("/")
+                if len(parts) > 1:
+                    parts.pop()     # keep only the relationship: "parent", "parent/parent", etc.
+                    case_type_relationships["paths"].add("/".join(parts))
+        for tab in module.search_detail("long").tabs:
+            if tab.has_nodeset and tab.nodeset_case_type:
+                case_type_relationships["child_case_types"].add(tab.nodeset_case_type)
+    return dict(relationships)
 
 
 def get_child_case_results(helper, parent_cases, case_types):
     parent_case_ids = {c.case_id for c in parent_cases}
+    if not parent_case_ids:
+        return []
     results = (helper.get_base_queryset()
                .case_type(case_types)
                .get_child_cases(parent_case_ids, "parent")
@@ -368,5 +411,7 @@ def get_expanded_case_results(helper, custom_related_case_property, cases):
 
 
 def _get_case_search_cases(helper, case_ids):
+    if not case_ids:
+        return []
     results = helper.get_base_queryset().case_ids(case_ids).run().hits
     return [helper.wrap_case(result, is_related_case=True) for result in results]
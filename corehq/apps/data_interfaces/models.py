@@ -1,11 +1,16 @@
+import operator
 import re
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
 from datetime import date, datetime, time, timedelta
+from functools import reduce
 
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
 from django.db import models, transaction
 from django.db.models import Q
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast, Collate
 from django.utils.translation import gettext_lazy
 
 import jsonfield
@@ -48,7 +53,9 @@ from corehq.messaging.scheduling.const import (
 )
 from corehq.messaging.scheduling.models import AlertSchedule, TimedSchedule
 from corehq.messaging.scheduling.scheduling_partitioned.dbaccessors import (
+    get_case_alert_schedule_instances_for_cases,
     get_case_alert_schedule_instances_for_schedule_id,
+    get_case_timed_schedule_instances_for_cases,
     get_case_timed_schedule_instances_for_schedule_id,
 )
 from corehq.messaging.scheduling.tasks import (
@@ -69,6 +76,10 @@ from corehq.util.test_utils import unit_testing_only
 ALLOWED_DATE_REGEX = re.compile(r'^\d{4}-\d{2}-\d{2}')
 AUTO_UPDATE_XMLNS = 'http://commcarehq.org/hq_case_update_rule'
 
+# CommCareCase.case_json is a text column, so filters on case properties
+# use it cast to jsonb under this name
+CASE_JSON_ANNOTATION = 'case_json_data'
+
 
 def _try_date_conversion(date_or_string):
     if isinstance(date_or_string, bytes):
@@ -221,13 +232,54 @@ class AutomaticUpdateRule(models.Model):
         return date
 
     @classmethod
-    def iter_cases(cls, domain, case_type, boundary_date=None, db=None, include_closed=False):
+    def get_case_filter(cls, rules, now):
+        """
+        Returns a CaseFilter for the cases that any of the rules might match,
+        or None if all cases of the rules' case type need to be checked.
+        """
+        filters = [rule.get_rule_case_filter(now) for rule in rules]
+        if not filters or None in filters:
+            return None
+        return CaseFilter.any(filters)
+
+    def get_rule_case_filter(self, now):
+        """
+        Returns a CaseFilter for the cases this rule might match, or None if
+        all cases of the case type need to be checked. It narrows down the
+        cases in SQL; criteria_match still decides whether each case matches.
+        """
+        filters = [criteria.definition.get_case_filter(now) for criteria in self.memoized_criteria]
+        if self.filter_on_server_modified:
+            filters.append(CaseFilter(
+                Q(server_modified_on__lte=now - timedelta(days=self.server_modified_boundary)),
+                {}
+            ))
+        elif self.criteria_operator == 'ANY':
+            # criteria_match counts not filtering on server_modified_on as
+            # a criteria that every case meets
+            return None
+
+        if self.criteria_operator == 'ANY':
+            if not filters or None in filters:
+                return None
+            return CaseFilter.any(filters)
+
+        # Criteria that can't be expressed in SQL are left to criteria_match
+        filters = [case_filter for case_filter in filters if case_filter is not None]
+        if not filters:
+            return None
+        return CaseFilter.all(filters)
+
+    @classmethod
+    def iter_cases(cls, domain, case_type, boundary_date=None, db=None, include_closed=False, case_filter=None):
         return cls._iter_cases_from_postgres(
-            domain, case_type, boundary_date=boundary_date, db=db, include_closed=include_closed
+            domain, case_type, boundary_date=boundary_date, db=db, include_closed=include_closed,
+            case_filter=case_filter,
         )
 
     @classmethod
-    def _iter_cases_from_postgres(cls, domain, case_type, boundary_date=None, db=None, include_closed=False):
+    def _iter_cases_from_postgres(cls, domain, case_type, boundary_date=None, db=None, include_closed=False,
+                                  case_filter=None):
         q_expression = Q(
             domain=domain,
             type=case_type,
@@ -239,11 +291,17 @@ class AutomaticUpdateRule(models.Model):
         if boundary_date:
             q_expression = q_expression & Q(server_modified_on__lte=boundary_date)
 
+        annotate = None
+        if case_filter:
+            q_expression = q_expression & case_filter.q
+            annotate = case_filter.annotations or None
+
         if db:
-            return paginate_query(db, CommCareCase, q_expression, load_source='auto_update_rule')
+            return paginate_query(db, CommCareCase, q_expression, annotate=annotate,
+                                  load_source='auto_update_rule')
         else:
             return paginate_query_across_partitioned_databases(
-                CommCareCase, q_expression, load_source='auto_update_rule'
+                CommCareCase, q_expression, annotate=annotate, load_source='auto_update_rule'
             )
 
     @classmethod
@@ -381,6 +439,29 @@ class AutomaticUpdateRule(models.Model):
     def run_actions_when_case_matches(self, case):
         return self._run_method_on_action_definitions(case, 'when_case_matches')
 
+    @contextmanager
+    def prefetch_schedule_instances(self, case_ids):
+        """
+        Loads the schedule instances of this rule's actions for all of
+        case_ids up front, so that run_rule doesn't query them for each
+        case. Use when running the rule on a batch of cases:
+
+            with rule.prefetch_schedule_instances(case_ids):
+                for case in cases:
+                    rule.run_rule(case, now)
+        """
+        definitions = [
+            action.definition for action in self.memoized_actions
+            if isinstance(action.definition, CreateScheduleInstanceActionDefinition)
+        ]
+        for definition in definitions:
+            definition.prefetch_schedule_instances(case_ids)
+        try:
+            yield
+        finally:
+            for definition in definitions:
+                definition.clear_prefetched_schedule_instances()
+
     def run_actions_when_case_does_not_match(self, case):
         return self._run_method_on_action_definitions(case, 'when_case_does_not_match')
 
@@ -506,6 +587,37 @@ class CaseRuleCriteria(models.Model):
             raise ValueError("Unexpected type found: %s" % type(value))
 
 
+class CaseFilter(namedtuple('CaseFilter', 'q annotations')):
+    """
+    A filter on CommCareCase: a Q expression, and the annotations that
+    the expression refers to
+
+    Annotations are applied in order, so an annotation must come after
+    the annotations it refers to.
+    """
+
+    @classmethod
+    def all(cls, filters):
+        return cls._combine(filters, operator.and_)
+
+    @classmethod
+    def any(cls, filters):
+        return cls._combine(filters, operator.or_)
+
+    @classmethod
+    def _combine(cls, filters, combine):
+        annotations = {}
+        for case_filter in filters:
+            annotations.update(case_filter.annotations)
+        if CASE_JSON_ANNOTATION in annotations:
+            # other annotations refer to it
+            annotations = {
+                CASE_JSON_ANNOTATION: annotations.pop(CASE_JSON_ANNOTATION),
+                **annotations,
+            }
+        return cls(reduce(combine, [case_filter.q for case_filter in filters]), annotations)
+
+
 class CaseRuleCriteriaDefinition(models.Model):
 
     class Meta(object):
@@ -514,6 +626,15 @@ class CaseRuleCriteriaDefinition(models.Model):
     def matches(self, case, now):
         raise NotImplementedError()
 
+    def get_case_filter(self, now):
+        """
+        Override to return a CaseFilter that includes at least every case
+        that matches() would return True for, so that rules can skip
+        loading the other cases. Returns None if the criteria can't be
+        expressed in SQL.
+        """
+        return None
+
 
 class MatchPropertyDefinition(CaseRuleCriteriaDefinition):
     # True when today < (the date in property_name + property_value days)
@@ -628,6 +749,51 @@ class MatchPropertyDefinition(CaseRuleCriteriaDefinition):
 
         return False
 
+    def get_case_filter(self, now):
+        if (
+            '/' in self.property_name
+            or self.property_name == '_id'
+            or self.property_name in _get_case_field_names()
+        ):
+            # Parent and host properties and case fields are not in case_json
+            return None
+
+        case_json = {CASE_JSON_ANNOTATION: Cast('case_json', models.JSONField())}
+        if self.match_type in (self.MATCH_EQUAL, self.MATCH_NOT_EQUAL) and self.property_value is not None:
+            q = Q(**{CASE_JSON_ANNOTATION + '__contains': {self.property_name: self.property_value}})
+            return CaseFilter(q if self.match_type == self.MATCH_EQUAL else ~q, case_json)
+        elif self.match_type in (self.MATCH_HAS_VALUE, self.MATCH_REGEX):
+            # Only narrowed down to cases that have the property. Regular
+            # expressions aren't passed on because Python and Postgres
+            # don't support the same syntax.
+            return CaseFilter(Q(**{CASE_JSON_ANNOTATION + '__has_key': self.property_name}), case_json)
+        elif self.match_type in (self.MATCH_DAYS_BEFORE, self.MATCH_DAYS_AFTER):
+            try:
+                days = int(self.property_value)
+            except (TypeError, ValueError):
+                return None
+            return self._get_date_case_filter(now, days, case_json)
+        return None
+
+    def _get_date_case_filter(self, now, days, case_json):
+        # Only values that start with an ISO date are checked, and those
+        # compare as text with the C collation. Converting a value with a
+        # time zone to UTC can change its date, so a day is allowed either way.
+        alias = 'match_property_%s' % self.pk
+        annotations = {
+            **case_json,
+            alias: Collate(KeyTextTransform(self.property_name, CASE_JSON_ANNOTATION), 'C'),
+        }
+        if self.match_type == self.MATCH_DAYS_AFTER:
+            # now >= (value + days)
+            last_date = (now - timedelta(days=days - 1)).date()
+            q = Q(**{alias + '__lt': (last_date + timedelta(days=1)).isoformat()})
+        else:
+            # now < (value + days)
+            first_date = (now - timedelta(days=days + 1)).date()
+            q = Q(**{alias + '__gte': first_date.isoformat()})
+        return CaseFilter(q, annotations)
+
     def matches(self, case, now):
         return {
             self.MATCH_DAYS_BEFORE: self.check_days_before,
@@ -640,6 +806,11 @@ class MatchPropertyDefinition(CaseRuleCriteriaDefinition):
         }.get(self.match_type)(case, now)
 
 
+@memoized
+def _get_case_field_names():
+    return {field.name for field in CommCareCase._meta.fields}
+
+
 class CustomMatchDefinition(CaseRuleCriteriaDefinition):
     name = models.CharField(max_length=126)
 
@@ -1370,10 +1541,37 @@ class CreateScheduleInstanceActionDefinition(CaseRuleActionDefinition):
 
         return None
 
+    def prefetch_schedule_instances(self, case_ids):
+        """
+        Loads the instances of this action's schedule for all of case_ids.
+        They are used instead of querying the next time this action runs
+        on each of the cases.
+        """
+        if self.alert_schedule_id:
+            instances = get_case_alert_schedule_instances_for_cases(case_ids, self.alert_schedule_id)
+        else:
+            instances = get_case_timed_schedule_instances_for_cases(case_ids, self.timed_schedule_id)
+
+        self._prefetched_instances = {case_id: [] for case_id in case_ids}
+        for instance in instances:
+            self._prefetched_instances[instance.case_id].append(instance)
+
+    def clear_prefetched_schedule_instances(self):
+        self._prefetched_instances = {}
+
+    def _pop_prefetched_instances(self, case):
+        """
+        :return: the case's prefetched schedule instances, or None if they
+        were not prefetched
+        """
+        return getattr(self, '_prefetched_instances', {}).pop(case.case_id, None)
+
     def when_case_matches(self, case, rule):
+        existing_instances = self._pop_prefetched_instances(case)
         schedule = self.schedule
         if isinstance(schedule, AlertSchedule):
-            refresh_case_alert_schedule_instances(case, schedule, self, rule)
+            refresh_case_alert_schedule_instances(
+                case, schedule, self, rule, existing_instances=existing_instances)
         elif isinstance(schedule, TimedSchedule):
             kwargs = {}
             scheduler_module_info = self.get_scheduler_module_info()
@@ -1389,7 +1587,7 @@ class CreateScheduleInstanceActionDefinition(CaseRuleActionDefinition):
                 if not start_date:
                     # The case property doesn't reference a date, so delete any
                     # schedule instances pertaining to this rule and case and return
-                    self.delete_schedule_instances(case)
+                    self.delete_schedule_instances(case, existing_instances)
                     return CaseRuleActionResult()
 
                 kwargs['start_date'] = start_date
@@ -1400,27 +1598,35 @@ class CreateScheduleInstanceActionDefinition(CaseRuleActionDefinition):
                     case_phase_matches, schedule_instance_start_date = VisitSchedulerIntegrationHelper(case,
                         scheduler_module_info).get_result()
                 except VisitSchedulerIntegrationHelper.VisitSchedulerIntegrationException:
-                    self.delete_schedule_instances(case)
+                    self.delete_schedule_instances(case, existing_instances)
                     self.notify_scheduler_integration_exception(case, scheduler_module_info)
                     return CaseRuleActionResult()
 
                 if not case_phase_matches:
                     # The case is not in the matching schedule phase, so delete
                     # schedule instances pertaining to this rule and case and return
-                    self.delete_schedule_instances(case)
+                    self.delete_schedule_instances(case, existing_instances)
                     return CaseRuleActionResult()
                 else:
                     kwargs['start_date'] = schedule_instance_start_date
 
-            refresh_case_timed_schedule_instances(case, schedule, self, rule, **kwargs)
+            refresh_case_timed_schedule_instances(
+                case, schedule, self, rule, existing_instances=existing_instances, **kwargs)
 
         return CaseRuleActionResult()
 
     def when_case_does_not_match(self, case, rule):
-        self.delete_schedule_instances(case)
+        self.delete_schedule_instances(case, self._pop_prefetched_instances(case))
         return CaseRuleActionResult()
 
-    def delete_schedule_instances(self, case):
+    def delete_schedule_instances(self, case, existing_instances=None):
+        """
+        :param existing_instances: the case's prefetched schedule instances, if
+        any; when they are known to be empty there's nothing to delete
+        """
+        if existing_instances is not None and not existing_instances:
+            return
+
         if self.alert_schedule_id:
             get_case_alert_schedule_instances_for_schedule_id(case.case_id, self.alert_schedule_id).delete()
 
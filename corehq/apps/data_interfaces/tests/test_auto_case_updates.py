@@ -10,6 +10,7 @@ from casexml.apps.case.mock import CaseFactory
 from corehq.apps import hqcase
 from corehq.apps.data_interfaces.models import (
     AUTO_UPDATE_XMLNS,
+    CASE_JSON_ANNOTATION,
     AutomaticUpdateRule,
     CaseRuleActionResult,
     CaseRuleSubmission,
@@ -1039,6 +1040,106 @@ class CaseRuleEndToEndTests(BaseCaseRuleTest):
             rules_by_case_type['person-2'], datetime(2016, 1, 1))
         self.assertIsNone(boundary_date)
 
+    def test_case_filter(self):
+        rule = _create_empty_rule(self.domain)
+        rule.add_criteria(
+            MatchPropertyDefinition,
+            property_name='result',
+            property_value='X',
+            match_type=MatchPropertyDefinition.MATCH_EQUAL,
+        )
+        rule.add_criteria(
+            MatchPropertyDefinition,
+            property_name='last_visit_date',
+            property_value='5',
+            match_type=MatchPropertyDefinition.MATCH_DAYS_AFTER,
+        )
+        now = datetime(2017, 1, 20)
+
+        with _with_case(self.domain, 'person', now) as case1, \
+                _with_case(self.domain, 'person', now) as case2, \
+                _with_case(self.domain, 'person', now) as case3:
+            for case, properties in [
+                (case1, {'result': 'X', 'last_visit_date': '2017-01-10'}),
+                (case2, {'result': 'X', 'last_visit_date': '2017-01-19'}),
+                (case3, {'result': 'Y', 'last_visit_date': '2017-01-10'}),
+            ]:
+                hqcase.utils.update_case(self.domain, case.case_id, case_properties=properties)
+
+            case_filter = AutomaticUpdateRule.get_case_filter([rule], now)
+            cases = list(AutomaticUpdateRule.iter_cases(self.domain, 'person', case_filter=case_filter))
+            self.assertEqual([case.case_id for case in cases], [case1.case_id])
+            self.assertTrue(rule.criteria_match(cases[0], now))
+
+    def test_date_case_filter(self):
+        rule = _create_empty_rule(self.domain)
+        rule.add_criteria(
+            MatchPropertyDefinition,
+            property_name='last_visit_date',
+            property_value='5',
+            match_type=MatchPropertyDefinition.MATCH_DAYS_AFTER,
+        )
+        now = datetime(2017, 1, 20)
+
+        with _with_case(self.domain, 'person', now) as case1, \
+                _with_case(self.domain, 'person', now) as case2:
+            for case, properties in [
+                (case1, {'last_visit_date': '2017-01-10'}),
+                (case2, {'last_visit_date': '2017-01-19'}),
+            ]:
+                hqcase.utils.update_case(self.domain, case.case_id, case_properties=properties)
+
+            case_filter = AutomaticUpdateRule.get_case_filter([rule], now)
+            cases = list(AutomaticUpdateRule.iter_cases(self.domain, 'person', case_filter=case_filter))
+            self.assertEqual([case.case_id for case in cases], [case1.case_id])
+
+    def test_case_filter_with_date_criteria_first(self):
+        rule = _create_empty_rule(self.domain)
+        rule.add_criteria(
+            MatchPropertyDefinition,
+            property_name='last_visit_date',
+            property_value='5',
+            match_type=MatchPropertyDefinition.MATCH_DAYS_AFTER,
+        )
+        rule.add_criteria(
+            MatchPropertyDefinition,
+            property_name='result',
+            property_value='X',
+            match_type=MatchPropertyDefinition.MATCH_EQUAL,
+        )
+        now = datetime(2017, 1, 20)
+
+        with _with_case(self.domain, 'person', now) as case1, \
+                _with_case(self.domain, 'person', now) as case2:
+            for case, properties in [
+                (case1, {'result': 'X', 'last_visit_date': '2017-01-10'}),
+                (case2, {'result': 'Y', 'last_visit_date': '2017-01-10'}),
+            ]:
+                hqcase.utils.update_case(self.domain, case.case_id, case_properties=properties)
+
+            case_filter = AutomaticUpdateRule.get_case_filter([rule], now)
+            self.assertEqual(list(case_filter.annotations)[0], CASE_JSON_ANNOTATION)
+            cases = list(AutomaticUpdateRule.iter_cases(self.domain, 'person', case_filter=case_filter))
+            self.assertEqual([case.case_id for case in cases], [case1.case_id])
+
+    def test_no_case_filter_for_custom_criteria(self):
+        rule = _create_empty_rule(self.domain)
+        rule.criteria_operator = 'ANY'
+        rule.filter_on_server_modified = True
+        rule.server_modified_boundary = 10
+        rule.save()
+        rule.add_criteria(
+            MatchPropertyDefinition,
+            property_name='result',
+            property_value='X',
+            match_type=MatchPropertyDefinition.MATCH_EQUAL,
+        )
+        rule.add_criteria(CustomMatchDefinition, name='CUSTOM_CRITERIA_TEST')
+        self.assertIsNone(AutomaticUpdateRule.get_case_filter([rule], datetime(2017, 1, 20)))
+
+        rule.criteria_operator = 'ALL'
+        self.assertIsNotNone(AutomaticUpdateRule.get_case_filter([rule], datetime(2017, 1, 20)))
+
     def assertRuleRunCount(self, count):
         self.assertEqual(DomainCaseRuleRun.objects.count(), count)
 
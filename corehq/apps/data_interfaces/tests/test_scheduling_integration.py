@@ -7,6 +7,7 @@ from django.test import TestCase
 from unittest.mock import call, patch
 
 from casexml.apps.case.tests.util import create_case
+from dimagi.utils.couch import CriticalSection
 from corehq.apps.app_manager.models import (
     AdvancedForm,
     AdvancedModule,
@@ -55,8 +56,10 @@ from corehq.messaging.scheduling.tests.util import (
     delete_timed_schedules,
 )
 from corehq.messaging.tasks import (
+    get_sync_key,
     run_messaging_rule,
     run_messaging_rule_for_shard,
+    sync_case_chunk_for_messaging_rule,
     sync_case_for_messaging,
     sync_case_for_messaging_rule,
 )
@@ -723,6 +726,28 @@ class CaseRuleSchedulingIntegrationTest(TestCase):
         instances = get_case_timed_schedule_instances_for_schedule(case.case_id, schedule)
         self.assertEqual(instances.count(), 0)
 
+    @patch('corehq.messaging.scheduling.util.utcnow')
+    def test_sync_case_chunk_for_messaging_rule(self, utcnow_patch):
+        setup = self.setup_timed_schedule_with_case(utcnow_patch)
+        with setup as (schedule, rule, definition, case), create_case(self.domain, 'person') as other_case:
+            utcnow_patch.return_value = datetime(2018, 2, 28, 7, 1)
+            update_case(self.domain, case.case_id, case_properties={'start_sending': 'Y'})
+            [instance] = get_case_timed_schedule_instances_for_schedule(case.case_id, schedule)
+            delete_case_schedule_instance(instance)
+
+            with patch('corehq.messaging.tasks.SYNC_LOCK_CHUNK_SIZE', 1), \
+                    patch('corehq.messaging.tasks.CriticalSection', wraps=CriticalSection) as critical_section:
+                sync_case_chunk_for_messaging_rule(self.domain, [case.case_id, other_case.case_id], rule.pk)
+            self.assertEqual(critical_section.call_args_list, [
+                call([get_sync_key(case.case_id)], timeout=5 * 60),
+                call([get_sync_key(other_case.case_id)], timeout=5 * 60),
+            ])
+            instances = get_case_timed_schedule_instances_for_schedule(case.case_id, schedule)
+            self.assertEqual(instances.count(), 1)
+            self.assertEqual(instances[0].start_date, date(2018, 3, 1))
+            instances = get_case_timed_schedule_instances_for_schedule(other_case.case_id, schedule)
+            self.assertEqual(instances.count(), 0)
+
     @patch('corehq.messaging.scheduling.util.utcnow')
     def test_sync_messaging_on_hard_deleted_case(self, utcnow_patch):
         setup = self.setup_timed_schedule_with_case(utcnow_patch)
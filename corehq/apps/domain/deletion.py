@@ -250,7 +250,7 @@ DOMAIN_DELETE_OPERATIONS = [
     DjangoUserRelatedModelDeletion('users', 'HQApiKey', 'user__username'),
     CustomDeletion('auth', _delete_django_users, ['User']),
     ModelDeletion('products', 'SQLProduct', 'domain'),
-    ModelDeletion('locations', 'SQLLocation', 'domain'),
+    ModelDeletion('locations', 'SQLLocation', 'domain', ['LocationClosure']),
     ModelDeletion('locations', 'LocationType', 'domain'),
     ModelDeletion('domain', 'AllowedUCRExpressionSettings', 'domain'),
     ModelDeletion('domain_migration_flags', 'DomainMigrationProgress', 'domain'),
@@ -315,6 +315,8 @@ DOMAIN_DELETE_OPERATIONS = [
     ModelDeletion('data_interfaces', 'CaseRuleSubmission', 'domain'),  # TODO
     ModelDeletion('data_interfaces', 'AutomaticUpdateRule', 'domain'),
     ModelDeletion('data_interfaces', 'DomainCaseRuleRun', 'domain'),
+    ModelDeletion('fixtures', 'LookupTableIndexStatus', 'domain'),
+    ModelDeletion('fixtures', 'LookupTableFieldIndex', 'domain'),
     ModelDeletion('integration', 'DialerSettings', 'domain'),
     ModelDeletion('integration', 'GaenOtpServerSettings', 'domain'),
     ModelDeletion('integration', 'HmacCalloutSettings', 'domain'),
@@ -48,6 +48,8 @@ IGNORE_MODELS = {
     'auth.Permission',
     'blobs.BlobMeta',
     'blobs.BlobMigrationState',
+    'blobs.BlobPackingCheckpoint',
+    'blobs.BlobSegment',
     'blobs.DeletedBlobMeta',
     'domain.DomainAuditRecordEntry',
     'domain.ProjectLimit',
@@ -1,6 +1,10 @@
 """HQ Elasticsearch client logic (adapters)."""
 import json
 import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
 from django.db.backends.base.creation import TEST_DATABASE_PREFIX
@@ -21,13 +25,21 @@ from corehq.util.es.elasticsearch import (
     NotFoundError,
     bulk,
 )
-from corehq.util.metrics import metrics_counter
+from corehq.util.metrics import metrics_counter, metrics_histogram
 
 from .const import (
+    BULK_MAX_CHUNK_BYTES,
+    BULK_MAX_RETRIES,
+    BULK_MAX_WORKERS,
+    BULK_RETRY_INTERVAL,
+    BULK_RETRY_STATUSES,
     INDEX_CONF_REINDEX,
     INDEX_CONF_STANDARD,
     SCROLL_KEEPALIVE,
     SCROLL_SIZE,
+    SEARCH_AFTER_MAX_RETRIES,
+    SEARCH_AFTER_RETRY_DELAY,
+    SEARCH_AFTER_TIEBREAKER,
 )
 from .exceptions import ESError, ESShardFailure, TaskError, TaskMissing
 from .utils import ElasticJSONSerializer
@@ -556,6 +568,114 @@ class ElasticDocumentAdapter(BaseAdapter):
             if scroll_id:
                 self._es.clear_scroll(body={"scroll_id": [scroll_id]}, ignore=(404,))
 
+    def scroll_sliced(self, query, slices, max_buffered_pages=None, **kw):
+        """Perform a sliced scrolling search, yielding each doc until every
+        slice's context is exhausted.
+
+        The query is split into ``slices`` independent scroll contexts (see
+        the Elastic "sliced scroll" docs) which are consumed concurrently by a
+        pool of threads. Pages are merged into a single iterator in the order
+        they arrive, so documents are not yielded in any particular order.
+        Worker threads block once ``max_buffered_pages`` pages are waiting to
+        be consumed, which bounds memory use to roughly
+        ``max_buffered_pages * size`` documents regardless of how slowly the
+        caller consumes them.
+
+        Sliced scrolls require Elasticsearch 5 or later. With ``slices=1``
+        this is equivalent to ``scroll()``.
+
+        :param query: ``dict`` raw search query.
+        :param slices: ``int`` number of slices (and worker threads)
+        :param max_buffered_pages: ``int`` maximum number of result pages held
+                                   in memory (default ``2 * slices``)
+        :param **kw: Additional scroll keyword arguments, as for ``scroll()``
+        :yields: ``dict`` documents
+        """
+        if slices < 1:
+            raise ValueError(f"invalid number of slices: {slices}")
+        if slices == 1:
+            yield from self.scroll(query, **kw)
+            return
+        valid_kw = {"size", "scroll"}
+        if not set(kw).issubset(valid_kw):
+            raise ValueError(f"invalid keyword args: {set(kw) - valid_kw}")
+        if "slice" in query:
+            raise ValueError("query is already sliced")
+
+        def iter_slice_pages(slice_id):
+            slice_query = dict(query, slice={"id": slice_id, "max": slices})
+            for result in self._scroll(slice_query, **kw):
+                self._report_and_fail_on_shard_failures(result)
+                self._fix_hits_in_result(result)
+                if result["hits"]["hits"]:
+                    yield result["hits"]["hits"]
+
+        producers = [iter_slice_pages(slice_id) for slice_id in range(slices)]
+        pages = _iter_merged_concurrently(producers, max_buffered_pages or slices * 2)
+        try:
+            for page in pages:
+                yield from page
+        except ElasticsearchException as e:
+            raise ESError(e)
+
+    def search_after(self, query, size=None, max_retries=SEARCH_AFTER_MAX_RETRIES):
+        """Iterate over all documents matched by ``query`` using sorted
+        ``search_after`` pagination, yielding each hit.
+
+        Unlike ``scroll()``, no search context is held open on the cluster
+        between pages, so long-running consumers do not pin index segments
+        and cannot fail due to an expired scroll. Each page request is
+        stateless, which allows a failed request to be retried from the sort
+        key of the last hit that was yielded.
+
+        Requires Elasticsearch 5 or later.
+
+        :param query: ``dict`` raw search query. Any ``sort`` in the query is
+                      kept and a unique tiebreaker sort is appended.
+        :param size: ``int`` number of documents to fetch per page (default
+                     ``SCROLL_SIZE``). Providing ``size`` in both the query
+                     and as a keyword argument raises ``ValueError``.
+        :param max_retries: ``int`` number of consecutive failed page
+                            requests to retry before raising
+        :yields: ``dict`` hits
+        """
+        query = query.copy()
+        if "from" in query:
+            raise ValueError("search_after queries cannot specify 'from'")
+        size_qy = query.get("size")
+        if size is None:
+            size = SCROLL_SIZE if size_qy is None else size_qy
+        elif size_qy is not None:
+            raise ValueError(f"size cannot be specified in both query and keyword "
+                             f"arguments (query: {size_qy}, kw: {size})")
+        sort = query.get("sort") or []
+        if not isinstance(sort, list):
+            sort = [sort]
+        query["sort"] = [s for s in sort if s not in ("_doc", "_score")] + [
+            {SEARCH_AFTER_TIEBREAKER: "asc"},
+        ]
+        query["size"] = size
+        failures = 0
+        while True:
+            try:
+                result = self._search(query)
+            except ElasticsearchException as e:
+                failures += 1
+                if failures > max_retries:
+                    raise ESError(e)
+                log.warning("search_after request failed (attempt %s), retrying: %s", failures, e)
+                metrics_counter("commcare.es.search_after.retry", tags={"index": self.index_name})
+                time.sleep(SEARCH_AFTER_RETRY_DELAY * failures)
+                continue
+            failures = 0
+            self._report_and_fail_on_shard_failures(result)
+            self._fix_hits_in_result(result)
+            hits = result["hits"]["hits"]
+            yield from hits
+            if len(hits) < size:
+                break
+            query["search_after"] = hits[-1]["sort"]
+
     def index(self, doc, refresh=False, **kw):
         """Index (send) a new document in (to) Elasticsearch
 
@@ -641,6 +761,111 @@ class ElasticDocumentAdapter(BaseAdapter):
         payload = [self._render_bulk_action(action) for action in actions]
         return bulk(self._es, payload, refresh=self._refresh_value(refresh), **kw)
 
+    def bulk_concurrent(self, actions, refresh=False, max_chunk_bytes=BULK_MAX_CHUNK_BYTES,
+                        max_workers=BULK_MAX_WORKERS, max_retries=BULK_MAX_RETRIES):
+        """Send actions to Elasticsearch as a series of bulk requests, split by
+        payload size rather than by number of documents, with up to
+        ``max_workers`` requests in flight at once.
+
+        Items rejected by Elasticsearch with a retryable status (the cluster
+        is overloaded or unavailable) are retried on their own, with an
+        exponential backoff, up to ``max_retries`` times. Other item errors
+        are returned to the caller.
+
+        :param actions: iterable of ``BulkActionItem`` instances
+        :param refresh: ``bool`` refresh the effected shards to make this
+                        operation visible to search
+        :param max_chunk_bytes: ``int`` maximum size (in bytes) of a single
+                                bulk request body
+        :param max_workers: ``int`` maximum number of concurrent requests
+        :param max_retries: ``int`` number of times to retry rejected items
+        :returns: ``tuple`` of ``(success_count, errors)`` in the same format
+                  as ``bulk(..., raise_on_error=False)``
+        """
+        chunks = self._chunk_bulk_payload(
+            [self._render_bulk_action(action) for action in actions],
+            max_chunk_bytes,
+        )
+        if not chunks:
+            return 0, []
+        start = time.monotonic()
+
+        def send(chunk):
+            return self._send_bulk_chunk(chunk, refresh, max_retries)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+            results = list(executor.map(send, chunks))
+        success_count = sum(success for success, errors in results)
+        errors = [error for success, errors in results for error in errors]
+        elapsed = time.monotonic() - start
+        tags = {"index": self.index_name}
+        metrics_counter("commcare.es.bulk.docs", success_count, tags=tags)
+        metrics_counter("commcare.es.bulk.errors", len(errors), tags=tags)
+        metrics_counter("commcare.es.bulk.bytes", sum(chunk.size for chunk in chunks), tags=tags)
+        metrics_histogram(
+            "commcare.es.bulk.docs_per_second", (success_count / elapsed) if elapsed else 0,
+            bucket_tag="rate", buckets=[10, 100, 1000, 5000, 10000], bucket_unit="docs/s",
+            tags=tags,
+        )
+        return success_count, errors
+
+    def _chunk_bulk_payload(self, rendered_actions, max_chunk_bytes):
+        """Serialize rendered bulk actions, grouped into chunks whose request
+        bodies do not exceed ``max_chunk_bytes`` (a single action larger than
+        the limit is sent in a chunk of its own).
+
+        :returns: ``list`` of ``_BulkChunk`` instances
+        """
+        serializer = self._es.transport.serializer
+        chunks = []
+        chunk = _BulkChunk()
+        for action in rendered_actions:
+            op_type = action["_op_type"]
+            lines = [serializer.dumps({op_type: {
+                "_index": action["_index"],
+                "_type": action["_type"],
+                "_id": action["_id"],
+            }})]
+            if "_source" in action:
+                lines.append(serializer.dumps(action["_source"]))
+            size = sum(len(line.encode("utf-8")) + 1 for line in lines)
+            if chunk.lines and chunk.size + size > max_chunk_bytes:
+                chunks.append(chunk)
+                chunk = _BulkChunk()
+            chunk.add(lines, size)
+        if chunk.lines:
+            chunks.append(chunk)
+        return chunks
+
+    def _send_bulk_chunk(self, chunk, refresh, max_retries):
+        """Send a chunk, retrying only the items rejected with a retryable
+        status.
+
+        :returns: ``tuple`` of ``(success_count, errors)``
+        """
+        success_count = 0
+        errors = []
+        attempt = 0
+        while chunk.lines:
+            result = self._es.bulk("\n".join(chunk.lines) + "\n",
+                                   refresh=self._refresh_value(refresh))
+            retry = _BulkChunk()
+            for item, (lines, size) in zip(result["items"], chunk.items):
+                op_type, info = next(iter(item.items()))
+                if 200 <= info.get("status", 500) < 300:
+                    success_count += 1
+                elif info.get("status") in BULK_RETRY_STATUSES and attempt < max_retries:
+                    retry.add(lines, size)
+                else:
+                    errors.append({op_type: info})
+            if retry.lines:
+                attempt += 1
+                metrics_counter("commcare.es.bulk.retries", len(retry.items),
+                                tags={"index": self.index_name})
+                time.sleep(BULK_RETRY_INTERVAL ** attempt)
+            chunk = retry
+        return success_count, errors
+
     def bulk_index(self, docs, refresh=False, **kw):
         """Convenience method for bulk indexing many documents without the
         BulkActionItem boilerplate.
@@ -767,6 +992,72 @@ class ElasticDocumentAdapter(BaseAdapter):
         return f"<{self.__class__.__name__} index={self.index_name!r}, type={self.type!r}>"
 
 
+class _BulkChunk:
+    """Serialized lines for a single bulk request body"""
+
+    def __init__(self):
+        self.lines = []
+        self.items = []  # (lines, size) for each action, in request order
+        self.size = 0
+
+    def add(self, lines, size):
+        self.lines.extend(lines)
+        self.items.append((lines, size))
+        self.size += size
+
+
+_DONE = object()
+
+
+def _iter_merged_concurrently(iterables, max_buffered):
+    """Consume each iterable in its own thread, yielding items from all of
+    them (in arrival order) through a bounded queue.
+
+    Exceptions raised by any iterable are re-raised in the consuming thread.
+    If the consumer stops early (or fails) the remaining workers are signalled
+    to stop and their iterables are closed.
+    """
+    items = queue.Queue(maxsize=max_buffered)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def consume(iterable):
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    break
+        except Exception as e:
+            put((None, e))
+        finally:
+            if hasattr(iterable, "close"):
+                iterable.close()
+            put((_DONE, None))
+
+    with ThreadPoolExecutor(max_workers=len(iterables)) as executor:
+        for iterable in iterables:
+            executor.submit(consume, iterable)
+        try:
+            remaining = len(iterables)
+            while remaining:
+                item, error = items.get()
+                if error is not None:
+                    raise error
+                if item is _DONE:
+                    remaining -= 1
+                else:
+                    yield item
+        finally:
+            stopped.set()
+
+
 class BulkActionItem:
     """A wrapper for documents to be processed via Elasticsearch's Bulk API.
     Collections of these objects can be passed to an ElasticDocumentAdapter's
@@ -10,6 +10,20 @@ MAX_CLAUSE_COUNT = 1024
 SCROLL_KEEPALIVE = '5m'
 SCROLL_SIZE = 1000
 
+# search_after pagination parameters. `_uid` is the only unique,
+# sortable document field available on Elastic 5.
+SEARCH_AFTER_TIEBREAKER = '_uid'
+SEARCH_AFTER_MAX_RETRIES = 3
+SEARCH_AFTER_RETRY_DELAY = 2  # seconds, multiplied by attempt number
+
+# Parameters for concurrent bulk requests (ElasticDocumentAdapter.bulk_concurrent)
+BULK_MAX_CHUNK_BYTES = 10 * 1024 * 1024
+BULK_MAX_WORKERS = 4
+BULK_MAX_RETRIES = 3
+BULK_RETRY_INTERVAL = 2  # seconds, exponentially increasing
+# item statuses indicating the cluster could not accept the item right now
+BULK_RETRY_STATUSES = {429, 503}
+
 # index settings
 INDEX_CONF_REINDEX = {
     "index.refresh_interval": "1800s",
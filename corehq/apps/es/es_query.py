@@ -96,6 +96,9 @@ from corehq.elastic import (
     run_query,
     count_query,
     scroll_query,
+    search_after_query,
+    search_after_supported,
+    sliced_scroll_query,
 )
 
 from . import aggregations, filters, queries
@@ -214,6 +217,30 @@ class ESQuery(object):
         for r in result:
             yield ESQuerySet.normalize_result(self, r)
 
+    def scroll_sliced(self, slices):
+        """
+        Run the query against the scroll api, split into ``slices`` scroll
+        contexts that are consumed concurrently. Returns an iterator yielding
+        each document that matches the query, in no particular order.
+        Requires Elasticsearch 5 or later.
+        """
+        result = sliced_scroll_query(self.index, self.raw_query, slices, for_export=self.for_export)
+        for r in result:
+            yield ESQuerySet.normalize_result(self, r)
+
+    def search_after(self):
+        """
+        Run the query using sorted ``search_after`` pagination. Returns an
+        iterator yielding each document that matches the query.
+
+        Unlike ``scroll``, this does not hold a search context open on the
+        cluster and failed page requests are retried from the last document
+        returned. Requires Elasticsearch 5 or later.
+        """
+        result = search_after_query(self.index, self.raw_query, for_export=self.for_export)
+        for r in result:
+            yield ESQuerySet.normalize_result(self, r)
+
     @property
     def _filters(self):
         return self.es_query['query']['bool']['filter']
@@ -458,8 +485,18 @@ class ESQuery(object):
         return self.exclude_source().run().doc_ids
 
     def scroll_ids(self):
-        """Returns a generator of all matching ids"""
-        return self.exclude_source().size(5000).scroll()
+        """Returns a generator of all matching ids
+
+        Uses ``search_after`` pagination where the cluster supports it."""
+        query = self.exclude_source().size(5000)
+        if search_after_supported():
+            return query.search_after()
+        return query.scroll()
+
+    def scroll_ids_sliced(self, slices):
+        """Returns a generator of all matching ids, scrolled with ``slices``
+        concurrent scroll contexts"""
+        return self.exclude_source().size(5000).scroll_sliced(slices)
 
 
 class ESQuerySet(object):
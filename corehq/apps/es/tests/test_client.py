@@ -28,7 +28,7 @@ from ..client import (
     _client_for_export,
 )
 from ..const import INDEX_CONF_REINDEX, INDEX_CONF_STANDARD
-from ..exceptions import ESShardFailure, TaskError, TaskMissing
+from ..exceptions import ESError, ESShardFailure, TaskError, TaskMissing
 
 
 @override_settings(ELASTICSEARCH_HOSTS=["localhost"],
@@ -1201,6 +1201,124 @@ class TestElasticDocumentAdapterWithoutRequests(AdapterTestCase):
         self.adapter._fix_hits_in_result(result)
         self.assertEqual(expected, result)
 
+    def _search_after_pages(self, *pages):
+        return [
+            {"_shards": {"failed": 0}, "hits": {"hits": [
+                {"_id": doc_id, "_source": {}, "sort": [doc_id]} for doc_id in page
+            ]}}
+            for page in pages
+        ]
+
+    def test_search_after(self):
+        pages = self._search_after_pages(["a", "b"], ["c", "d"], [])
+        with patch.object(self.adapter, "_search", side_effect=pages) as search:
+            ids = [hit["_id"] for hit in self.adapter.search_after({}, size=2)]
+        self.assertEqual(ids, ["a", "b", "c", "d"])
+        self.assertEqual(search.call_count, 3)
+        self.assertEqual(search.call_args_list[1].args[0]["search_after"], ["b"])
+        self.assertEqual(search.call_args_list[2].args[0]["search_after"], ["d"])
+
+    def test_search_after_stops_on_partial_page(self):
+        pages = self._search_after_pages(["a", "b"], ["c"])
+        with patch.object(self.adapter, "_search", side_effect=pages) as search:
+            ids = [hit["_id"] for hit in self.adapter.search_after({}, size=2)]
+        self.assertEqual(ids, ["a", "b", "c"])
+        self.assertEqual(search.call_count, 2)
+
+    def test_search_after_appends_tiebreaker_sort(self):
+        pages = self._search_after_pages([])
+        with patch.object(self.adapter, "_search", side_effect=pages) as search:
+            list(self.adapter.search_after({"sort": [{"value": "asc"}, "_doc"]}, size=2))
+        self.assertEqual(search.call_args.args[0]["sort"], [{"value": "asc"}, {"_uid": "asc"}])
+
+    @patch("corehq.apps.es.client.time.sleep")
+    def test_search_after_resumes_after_error(self, sleep):
+        pages = self._search_after_pages(["a", "b"], ["c"])
+        pages.insert(1, TransportError(500, "boom"))
+        with patch.object(self.adapter, "_search", side_effect=pages) as search:
+            ids = [hit["_id"] for hit in self.adapter.search_after({}, size=2)]
+        self.assertEqual(ids, ["a", "b", "c"])
+        self.assertEqual(search.call_args.args[0]["search_after"], ["b"])
+
+    @patch("corehq.apps.es.client.time.sleep")
+    def test_search_after_raises_after_retries(self, sleep):
+        with patch.object(self.adapter, "_search", side_effect=TransportError(500, "boom")):
+            with self.assertRaises(ESError):
+                list(self.adapter.search_after({}, size=2, max_retries=2))
+
+    def test_scroll_sliced(self):
+        def scroll(query, **kw):
+            slice_id = query["slice"]["id"]
+            self.assertEqual(query["slice"]["max"], 3)
+            yield {"_shards": {"failed": 0}, "hits": {"hits": [
+                {"_id": f"{slice_id}-{n}", "_source": {}} for n in range(2)
+            ]}}
+
+        with patch.object(self.adapter, "_scroll", side_effect=scroll):
+            ids = {hit["_id"] for hit in self.adapter.scroll_sliced({}, 3, max_buffered_pages=1)}
+        self.assertEqual(ids, {"0-0", "0-1", "1-0", "1-1", "2-0", "2-1"})
+
+    def test_scroll_sliced_raises_worker_errors(self):
+        def scroll(query, **kw):
+            if query["slice"]["id"] == 1:
+                raise TransportError(500, "boom")
+            yield {"_shards": {"failed": 0}, "hits": {"hits": [{"_id": "a", "_source": {}}]}}
+
+        with patch.object(self.adapter, "_scroll", side_effect=scroll):
+            with self.assertRaises(ESError):
+                list(self.adapter.scroll_sliced({}, 2))
+
+    def test_scroll_sliced_single_slice_is_scroll(self):
+        with patch.object(self.adapter, "scroll", return_value=iter([{"_id": "a"}])) as scroll:
+            self.assertEqual(list(self.adapter.scroll_sliced({}, 1, size=5)), [{"_id": "a"}])
+        scroll.assert_called_once_with({}, size=5)
+
+    def test__chunk_bulk_payload_splits_by_size(self):
+        docs = [TestDoc(str(n), "x" * 100) for n in range(4)]
+        rendered = [self.adapter._render_bulk_action(BulkActionItem.index(doc)) for doc in docs]
+        one_action_size = self.adapter._chunk_bulk_payload(rendered[:1], 10 ** 6)[0].size
+        chunks = self.adapter._chunk_bulk_payload(rendered, one_action_size * 2)
+        self.assertEqual([len(chunk.items) for chunk in chunks], [2, 2])
+        self.assertEqual([len(chunk.lines) for chunk in chunks], [4, 4])
+
+    def test__chunk_bulk_payload_oversized_action(self):
+        rendered = [self.adapter._render_bulk_action(BulkActionItem.delete_id(str(n))) for n in range(2)]
+        chunks = self.adapter._chunk_bulk_payload(rendered, 1)
+        self.assertEqual([len(chunk.items) for chunk in chunks], [1, 1])
+
+    @patch("corehq.apps.es.client.time.sleep")
+    def test_bulk_concurrent_retries_only_rejected_items(self, sleep):
+        docs = [TestDoc(str(n), "test") for n in range(3)]
+        responses = [
+            {"items": [
+                {"index": {"_id": "0", "status": 201}},
+                {"index": {"_id": "1", "status": 429, "error": "rejected"}},
+                {"index": {"_id": "2", "status": 400, "error": "mapper_parsing_exception"}},
+            ]},
+            {"items": [{"index": {"_id": "1", "status": 201}}]},
+        ]
+        with patch.object(self.adapter._es, "bulk", side_effect=responses) as bulk:
+            success, errors = self.adapter.bulk_concurrent(
+                [BulkActionItem.index(doc) for doc in docs], max_workers=1)
+        self.assertEqual(success, 2)
+        self.assertEqual(errors, [{"index": {"_id": "2", "status": 400, "error": "mapper_parsing_exception"}}])
+        self.assertEqual(bulk.call_count, 2)
+        retried_body = bulk.call_args_list[1].args[0]
+        self.assertEqual(json.loads(retried_body.splitlines()[0])["index"]["_id"], "1")
+
+    @patch("corehq.apps.es.client.time.sleep")
+    def test_bulk_concurrent_gives_up_after_max_retries(self, sleep):
+        rejected = {"items": [{"delete": {"_id": "1", "status": 503}}]}
+        with patch.object(self.adapter._es, "bulk", return_value=rejected) as bulk:
+            success, errors = self.adapter.bulk_concurrent([BulkActionItem.delete_id("1")], max_retries=2)
+        self.assertEqual(success, 0)
+        self.assertEqual(errors, [{"delete": {"_id": "1", "status": 503}}])
+        self.assertEqual(bulk.call_count, 3)
+
+    def test_search_after_ambiguous_size_raises(self):
+        with self.assertRaises(ValueError):
+            list(self.adapter.search_after({"size": 1}, size=1))
+
 
 @es_test
 class TestBulkActionItem(SimpleTestCase):
@@ -103,6 +103,8 @@ class FixtureDataType(QuickCachedDocumentMixin, Document):
         return False
 
     def recursive_delete(self, transaction):
+        from corehq.apps.fixtures.indexes import delete_lookup_table_index
+        delete_lookup_table_index(self.get_id)
         item_ids = []
         for item in FixtureDataItem.by_data_type(self.domain, self.get_id):
             transaction.delete(item)
@@ -117,8 +119,11 @@ class FixtureDataType(QuickCachedDocumentMixin, Document):
             type.recursive_delete(transaction)
 
     def clear_caches(self):
+        from corehq.apps.fixtures.indexes import invalidate_lookup_table_index
         super(FixtureDataType, self).clear_caches()
         get_fixture_data_types.clear(self.domain)
+        if getattr(self, '_id', False):
+            invalidate_lookup_table_index(self._id)
 
 
 class FixtureItemField(DocumentSchema):
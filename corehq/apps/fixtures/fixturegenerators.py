@@ -1,8 +1,11 @@
+import hashlib
 from collections import defaultdict
 from functools import partial
 from operator import itemgetter
 from xml.etree import cElementTree as ElementTree
 
+from django.core.cache import cache
+
 from casexml.apps.phone.fixtures import FixtureProvider
 from casexml.apps.phone.utils import (
     GLOBAL_USER_ID,
@@ -13,12 +16,19 @@ from corehq.apps.fixtures.exceptions import FixtureTypeCheckError
 from corehq.apps.fixtures.models import FIXTURE_BUCKET, FixtureDataItem, FixtureDataType
 from corehq.apps.products.fixtures import product_fixture_generator_json
 from corehq.apps.programs.fixtures import program_fixture_generator_json
-from corehq.util.metrics import metrics_histogram
+from corehq.util.metrics import metrics_counter, metrics_histogram
 from corehq.util.xml_utils import serialize
-from .utils import clean_fixture_field_name, get_index_schema_node
+from .utils import (
+    clean_fixture_field_name,
+    get_index_schema_node,
+    get_user_fixture_cache_generation,
+)
 
 LOOKUP_TABLE_FIXTURE = 'lookup_table_fixture'
 REPORT_FIXTURE = 'report_fixture'
+USER_FIXTURE_CACHE_TIMEOUT = 60 * 60
+# rendered user fixtures larger than this are not cached
+USER_FIXTURE_CACHE_MAX_BYTES = 5 * 1024 * 1024
 
 
 def item_lists_by_domain(domain, namespace_ids=False):
@@ -140,6 +150,36 @@ class ItemListsProvider(FixtureProvider):
         return self._get_fixtures(global_types, get_items_by_type, GLOBAL_USER_ID)
 
     def get_user_items_and_count(self, user_types, restore_user):
+        """Get user-scoped fixtures, from the cache if possible
+
+        Users belonging to the same groups and locations usually see
+        the same items, so rendered fixtures are cached by the set of
+        visible items (and data type revisions) rather than by user.
+        """
+        key = self._get_user_items_cache_key(user_types, restore_user)
+        cached = cache.get(key)
+        if cached is None:
+            metrics_counter('commcare.fixtures.item_lists.user_cache', tags={'result': 'miss'})
+            fixtures, user_items_count = self._get_user_items_and_count(user_types, restore_user)
+            elements = [ElementTree.tostring(fixture, encoding='utf-8') for fixture in fixtures]
+            if sum(len(element) for element in elements) <= USER_FIXTURE_CACHE_MAX_BYTES:
+                cache.set(key, (elements, user_items_count), USER_FIXTURE_CACHE_TIMEOUT)
+        else:
+            metrics_counter('commcare.fixtures.item_lists.user_cache', tags={'result': 'hit'})
+            elements, user_items_count = cached
+        global_id = GLOBAL_USER_ID.encode('utf-8')
+        b_user_id = restore_user.user_id.encode('utf-8')
+        return [element.replace(global_id, b_user_id) for element in elements], user_items_count
+
+    def _get_user_items_cache_key(self, user_types, restore_user):
+        domain = restore_user.domain
+        type_revs = sorted((data_type._id, data_type._rev) for data_type in user_types.values())
+        item_ids = sorted(restore_user.get_fixture_data_item_ids())
+        digest = hashlib.md5(repr((type_revs, item_ids)).encode('utf-8')).hexdigest()
+        generation = get_user_fixture_cache_generation(domain)
+        return f'user-fixture-items:{domain}:{generation}:{digest}'
+
+    def _get_user_items_and_count(self, user_types, restore_user):
         user_items_count = 0
         items_by_type = defaultdict(list)
         for item in restore_user.get_fixture_data_items():
@@ -153,7 +193,7 @@ class ItemListsProvider(FixtureProvider):
             return sorted(items_by_type.get(data_type, []),
                           key=itemgetter('sort_key'))
 
-        return self._get_fixtures(user_types, get_items_by_type, restore_user.user_id), user_items_count
+        return self._get_fixtures(user_types, get_items_by_type, GLOBAL_USER_ID), user_items_count
 
     def _set_cached_type(self, item, data_type):
         # set the cached version used by the object so that it doesn't
@@ -0,0 +1,223 @@
+"""SQL indexes of lookup table fields
+
+Fields of a lookup table flagged `is_indexed` are indexed in SQL so that
+items having a given field value can be found without loading the whole
+table. Lookup table items are stored in Couch and are written by many
+code paths, some of which bypass the models, so the index is not updated
+on write. Instead, writers mark the index of a table stale with
+`invalidate_lookup_table_index`. The next query queues a rebuild in a
+celery task, and queries use the Couch view until it is done.
+
+Results of recent queries are kept in an in-process LRU cache keyed by
+the time the index was built, so hot tables are served without a Couch
+request while still seeing changes made by other processes. The cache
+is bounded by the number of results and by their approximate size.
+"""
+import json
+from collections import OrderedDict
+from copy import deepcopy
+from datetime import datetime
+from threading import Lock
+
+from django.core.cache import cache
+from django.db import transaction
+
+from dimagi.utils.chunked import chunked
+from dimagi.utils.couch import get_redis_lock, release_lock
+from dimagi.utils.couch.database import iter_docs
+
+from corehq.apps.fixtures.dbaccessors import iter_fixture_items_for_data_type
+from corehq.apps.fixtures.models import (
+    FixtureDataItem,
+    LookupTableFieldIndex,
+    LookupTableIndexStatus,
+)
+from corehq.util.metrics import metrics_counter, metrics_histogram_timer
+
+INDEX_BATCH_SIZE = 1000
+INDEX_LOCK_TIMEOUT = 30 * 60
+QUERY_CACHE_SIZE = 1000
+QUERY_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+
+def get_items_by_field_value(data_type, field_name, value):
+    """Get items of a lookup table having `value` in field `field_name`
+
+    The SQL index is used if the field is indexed. Otherwise, or if the
+    index is stale and being rebuilt, items are found with a Couch view.
+
+    :param data_type: `FixtureDataType`.
+    :returns: List of `FixtureDataItem` ordered by `sort_key`.
+    """
+    indexed_fields = _get_indexed_fields(data_type)
+    version = _get_index_version(data_type, indexed_fields) if field_name in indexed_fields else None
+    if version is None:
+        metrics_counter('commcare.fixtures.index.queries', tags={'result': 'unindexed'})
+        items = FixtureDataItem.by_field_value(data_type.domain, data_type, field_name, value)
+        return sorted(items, key=lambda item: item.sort_key or 0)
+    metrics_counter('commcare.fixtures.index.queries', tags={'result': 'indexed'})
+    docs = _get_item_docs(data_type.get_id, version, field_name, str(value))
+    return [FixtureDataItem.wrap(deepcopy(doc)) for doc in docs]
+
+
+def invalidate_lookup_table_index(table_id):
+    """Mark the index of a lookup table stale
+
+    Must be called after items of the table are changed.
+    """
+    LookupTableIndexStatus.objects.filter(table_id=table_id).update(modified_on=datetime.utcnow())
+
+
+def delete_lookup_table_index(table_id):
+    with transaction.atomic():
+        LookupTableIndexStatus.objects.filter(table_id=table_id).delete()
+        LookupTableFieldIndex.objects.filter(table_id=table_id).delete()
+
+
+def _get_indexed_fields(data_type):
+    return {field.field_name for field in data_type.fields if field.is_indexed}
+
+
+def _get_index_version(data_type, indexed_fields):
+    """Get the version of a current index
+
+    A rebuild is queued if the index is missing or stale.
+
+    :returns: Index version or `None` if the index is not current.
+    """
+    status = LookupTableIndexStatus.objects.filter(table_id=data_type.get_id).first()
+    if status is None or not status.is_current:
+        _queue_index_build(data_type.get_id)
+        return None
+    return status.built_on.isoformat()
+
+
+def _queue_index_build(table_id):
+    from corehq.apps.fixtures.tasks import build_lookup_table_index_async
+    # queue one build at a time, the task clears this when it is done
+    if cache.add(_build_queued_key(table_id), True, INDEX_LOCK_TIMEOUT):
+        build_lookup_table_index_async.delay(table_id)
+
+
+def _build_queued_key(table_id):
+    return f"lookup-table-index-queued-{table_id}"
+
+
+def build_lookup_table_index(data_type):
+    """Build the index of a lookup table
+
+    :returns: `LookupTableIndexStatus` or `None` if another process is
+    building the index.
+    """
+    table_id = data_type.get_id
+    indexed_fields = _get_indexed_fields(data_type)
+    lock_key = f"lookup-table-index-{table_id}"
+    lock = get_redis_lock(lock_key, timeout=INDEX_LOCK_TIMEOUT, name="lookup_table_index")
+    if not lock.acquire(blocking=False):
+        return None
+    try:
+        # changes made after this time will make the new index stale
+        built_on = datetime.utcnow()
+        with metrics_histogram_timer(
+            'commcare.fixtures.index.build_time',
+            timing_buckets=(.1, 1, 10, 60, 300, 1800),
+        ), transaction.atomic():
+            LookupTableFieldIndex.objects.filter(table_id=table_id).delete()
+            entries = _iter_index_entries(data_type, indexed_fields)
+            for batch in chunked(entries, INDEX_BATCH_SIZE):
+                LookupTableFieldIndex.objects.bulk_create(batch)
+            status, created = LookupTableIndexStatus.objects.get_or_create(
+                table_id=table_id,
+                defaults={"domain": data_type.domain, "modified_on": built_on},
+            )
+            LookupTableIndexStatus.objects.filter(id=status.id).update(built_on=built_on)
+            status.built_on = built_on
+    finally:
+        release_lock(lock, True)
+        cache.delete(_build_queued_key(table_id))
+    return status
+
+
+def _iter_index_entries(data_type, indexed_fields):
+    domain = data_type.domain
+    table_id = data_type.get_id
+    for doc in iter_fixture_items_for_data_type(domain, table_id, wrap=False):
+        for field_name, value in _iter_field_values(doc, indexed_fields):
+            yield LookupTableFieldIndex(
+                domain=domain,
+                table_id=table_id,
+                field_name=field_name,
+                value=value,
+                item_id=doc["_id"],
+            )
+
+
+def _iter_field_values(doc, field_names):
+    # same values as the 'fixtures/data_items_by_field_value' view
+    fields = doc.get("fields") or {}
+    for field_name in field_names:
+        field = fields.get(field_name)
+        if isinstance(field, dict):
+            for field_value in field.get("field_list", []):
+                if field_value.get("field_value") is not None:
+                    yield field_name, str(field_value["field_value"])
+        elif field is not None:
+            yield field_name, str(field)
+
+
+class _QueryCache:
+    """Thread-safe LRU cache bounded by entry count and total size"""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # {key: (value, size)}
+        self._size = 0
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._size -= self._entries.popitem(last=False)[1][1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+_item_docs_cache = _QueryCache(QUERY_CACHE_SIZE, QUERY_CACHE_MAX_BYTES)
+
+
+def _get_item_docs(table_id, version, field_name, value):
+    key = (table_id, version, field_name, value)
+    docs = _item_docs_cache.get(key)
+    if docs is None:
+        docs = _query_item_docs(table_id, field_name, value)
+        _item_docs_cache.set(key, docs, len(json.dumps(docs)))
+    return docs
+
+
+def _query_item_docs(table_id, field_name, value):
+    item_ids = list(
+        LookupTableFieldIndex.objects
+        .filter(table_id=table_id, field_name=field_name, value=value)
+        .values_list("item_id", flat=True)
+        .distinct()
+    )
+    docs = iter_docs(FixtureDataItem.get_db(), item_ids)
+    return tuple(sorted(docs, key=lambda doc: doc.get("sort_key") or 0))
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fixtures', '0004_userlookuptablestatus'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LookupTableIndexStatus',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=255)),
+                ('table_id', models.CharField(max_length=255, unique=True)),
+                ('built_on', models.DateTimeField(null=True)),
+                ('modified_on', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LookupTableFieldIndex',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=255)),
+                ('table_id', models.CharField(max_length=255)),
+                ('field_name', models.CharField(max_length=255)),
+                ('value', models.TextField()),
+                ('item_id', models.CharField(max_length=255)),
+            ],
+            options={
+                'index_together': {('table_id', 'field_name', 'value')},
+            },
+        ),
+    ]
@@ -33,3 +33,35 @@ class UserLookupTableStatus(models.Model):
         app_label = 'fixtures'
         db_table = 'fixtures_userfixturestatus'
         unique_together = ("user_id", "fixture_type")
+
+
+class LookupTableIndexStatus(models.Model):
+    """Tracks whether the SQL index of a lookup table is current
+
+    The index is stale when the table was modified after the index was
+    built, and is rebuilt on the next query.
+    """
+    domain = models.CharField(max_length=255)
+    table_id = models.CharField(max_length=255, unique=True)
+    built_on = models.DateTimeField(null=True)
+    modified_on = models.DateTimeField()
+
+    class Meta:
+        app_label = 'fixtures'
+
+    @property
+    def is_current(self):
+        return self.built_on is not None and self.built_on >= self.modified_on
+
+
+class LookupTableFieldIndex(models.Model):
+    """A value of an indexed field of a lookup table item"""
+    domain = models.CharField(max_length=255)
+    table_id = models.CharField(max_length=255)
+    field_name = models.CharField(max_length=255)
+    value = models.TextField()
+    item_id = models.CharField(max_length=255)
+
+    class Meta:
+        app_label = 'fixtures'
+        index_together = [('table_id', 'field_name', 'value')]
@@ -10,12 +10,17 @@ from corehq.apps.api.resources import CouchResourceMixin, HqBaseResource
 from corehq.apps.api.resources.auth import RequirePermissionAuthentication
 from corehq.apps.api.resources.meta import CustomResourceMeta
 from corehq.apps.api.util import get_object_or_not_exist
+from corehq.apps.fixtures.indexes import (
+    get_items_by_field_value,
+    invalidate_lookup_table_index,
+)
 from corehq.apps.fixtures.models import (
     FieldList,
     FixtureDataItem,
     FixtureDataType,
     FixtureTypeField,
 )
+from corehq.apps.fixtures.utils import clear_user_fixture_cache
 from corehq.apps.users.models import Permissions
 
 
@@ -52,11 +57,16 @@ class FixtureResource(CouchResourceMixin, HqBaseResource):
 
         if parent_id and parent_ref_name and child_type and references:
             parent_fdi = FixtureDataItem.get(parent_id)
-            fdis = list(
-                FixtureDataItem.by_field_value(
-                    domain, child_type, parent_ref_name,
+            try:
+                child_data_type = FixtureDataType.get(child_type)
+            except ResourceNotFound:
+                child_data_type = None
+            if child_data_type is not None and child_data_type.domain == domain:
+                fdis = get_items_by_field_value(
+                    child_data_type, parent_ref_name,
                     parent_fdi.fields_without_attributes[references])
-            )
+            else:
+                fdis = []
         elif type_id or type_tag:
             type_id = type_id or FixtureDataType.by_domain_tag(
                 domain, type_tag).one()
@@ -199,6 +209,8 @@ class LookupTableItemResource(CouchResourceMixin, HqBaseResource):
             raise NotFound('Lookup table item not found')
         with CouchTransaction() as transaction:
             data_item.recursive_delete(transaction)
+        invalidate_lookup_table_index(data_item.data_type_id)
+        clear_user_fixture_cache(kwargs['domain'])
         return ImmediateHttpResponse(response=HttpAccepted())
 
     def obj_create(self, bundle, request=None, **kwargs):
@@ -217,6 +229,7 @@ class LookupTableItemResource(CouchResourceMixin, HqBaseResource):
         bundle.obj.domain = kwargs['domain']
         bundle.obj.sort_key = number_items + 1
         bundle.obj.save()
+        invalidate_lookup_table_index(data_type_id)
         return bundle
 
     def obj_update(self, bundle, **kwargs):
@@ -245,6 +258,8 @@ class LookupTableItemResource(CouchResourceMixin, HqBaseResource):
 
         if save:
             bundle.obj.save()
+            invalidate_lookup_table_index(bundle.obj.data_type_id)
+            clear_user_fixture_cache(kwargs['domain'])
 
         return bundle
 
@@ -4,12 +4,14 @@ from django.conf import settings
 from django.template.loader import render_to_string
 
 from celery.task import task
+from couchdbkit.exceptions import ResourceNotFound
 
 from dimagi.utils.chunked import chunked
 from soil import DownloadBase
 
 from corehq.apps.fixtures.download import prepare_fixture_download
-from corehq.apps.fixtures.models import FixtureDataItem, FixtureOwnership
+from corehq.apps.fixtures.indexes import build_lookup_table_index, delete_lookup_table_index
+from corehq.apps.fixtures.models import FixtureDataItem, FixtureDataType, FixtureOwnership
 from corehq.apps.fixtures.upload import upload_fixture_file
 from corehq.apps.hqwebapp.tasks import send_html_email_async
 
@@ -69,6 +71,7 @@ def delete_unneeded_fixture_data_item(self, domain, data_type_id):
     Note that this does not bust any caches meaning that the data items could still
     be returned to the user for some time
     """
+    delete_lookup_table_index(data_type_id)
     item_ids = []
     try:
         for items in chunked(FixtureDataItem.by_data_type(domain, data_type_id), 1000):
@@ -82,3 +85,12 @@ def delete_unneeded_fixture_data_item(self, domain, data_type_id):
     except Exception as exc:
         # there's no base exception in couchdbkit to catch, so must use Exception
         self.retry(exc=exc)
+
+
+@task(queue='background_queue', ignore_result=True)
+def build_lookup_table_index_async(table_id):
+    try:
+        data_type = FixtureDataType.get(table_id)
+    except ResourceNotFound:
+        return
+    build_lookup_table_index(data_type)
@@ -1,3 +1,4 @@
+from unittest.mock import patch
 from xml.etree import cElementTree as ElementTree
 
 from django.test import TestCase
@@ -21,6 +22,7 @@ from corehq.apps.fixtures.models import (
     FixtureOwnership,
     FixtureTypeField,
 )
+from corehq.apps.fixtures.utils import clear_fixture_cache
 from corehq.apps.users.dbaccessors import delete_all_users
 from corehq.apps.users.models import CommCareUser
 from corehq.blobs import get_blob_db
@@ -312,6 +314,26 @@ class FixtureDataTest(TestCase):
         fixtures = call_fixture_generator(sammy)
         self.assertEqual({item.attrib['user_id'] for item in fixtures}, {sammy.user_id})
 
+    def test_cached_user_fixture_shared_by_owner_set(self):
+        frank = self.user.to_ota_restore_user()
+        sammy_user = CommCareUser.create(self.domain, 'sammy', '***', None, None)
+        ownership = self.data_item.add_user(sammy_user)
+        self.addCleanup(ownership.delete)
+        sammy = sammy_user.to_ota_restore_user()
+        generate = fixturegenerators.item_lists._get_user_items_and_count
+
+        with patch.object(fixturegenerators.item_lists, '_get_user_items_and_count',
+                          wraps=generate) as mock:
+            fixtures = call_fixture_generator(frank)
+            self.assertEqual({item.attrib['user_id'] for item in fixtures}, {frank.user_id})
+            fixtures = call_fixture_generator(sammy)
+            self.assertEqual({item.attrib['user_id'] for item in fixtures}, {sammy.user_id})
+            self.assertEqual(mock.call_count, 1)
+
+            clear_fixture_cache(self.domain)
+            call_fixture_generator(sammy)
+            self.assertEqual(mock.call_count, 2)
+
     def make_data_type(self, name, is_global):
         data_type = FixtureDataType(
             domain=self.domain,
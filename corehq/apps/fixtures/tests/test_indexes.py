@@ -0,0 +1,111 @@
+from django.test import SimpleTestCase, TestCase
+
+from corehq.apps.fixtures.dbaccessors import get_fixture_data_types
+from corehq.apps.fixtures.indexes import (
+    _QueryCache,
+    get_items_by_field_value,
+    invalidate_lookup_table_index,
+)
+from corehq.apps.fixtures.models import (
+    FieldList,
+    FixtureDataItem,
+    FixtureDataType,
+    FixtureItemField,
+    FixtureTypeField,
+    LookupTableFieldIndex,
+    LookupTableIndexStatus,
+)
+from corehq.apps.userreports.expressions.factory import ExpressionFactory
+from corehq.apps.userreports.specs import EvaluationContext
+
+
+class TestLookupTableIndexes(TestCase):
+    domain = 'lookup-table-indexes'
+
+    def setUp(self):
+        self.data_type = FixtureDataType(
+            domain=self.domain,
+            tag='district',
+            is_global=True,
+            fields=[
+                FixtureTypeField(field_name='id', properties=[], is_indexed=True),
+                FixtureTypeField(field_name='name', properties=[]),
+            ],
+        )
+        self.data_type.save()
+        self.addCleanup(self.data_type.delete)
+        self.addCleanup(get_fixture_data_types.clear, self.domain)
+        self.items = [self.make_item(n, f'd{n}', f'District {n}') for n in range(3)]
+
+    def make_item(self, sort_key, id_, name):
+        item = FixtureDataItem(
+            domain=self.domain,
+            data_type_id=self.data_type._id,
+            sort_key=sort_key,
+            fields={
+                'id': FieldList(field_list=[FixtureItemField(field_value=id_, properties={})]),
+                'name': FieldList(field_list=[FixtureItemField(field_value=name, properties={})]),
+            },
+            item_attributes={},
+        )
+        item.save()
+        self.addCleanup(item.delete)
+        return item
+
+    def test_get_items_by_indexed_field(self):
+        # the first query uses the Couch view and queues building the index
+        items = get_items_by_field_value(self.data_type, 'id', 'd1')
+        self.assertEqual([item._id for item in items], [self.items[1]._id])
+        items = get_items_by_field_value(self.data_type, 'id', 'd1')
+        self.assertEqual([item._id for item in items], [self.items[1]._id])
+        self.assertTrue(LookupTableIndexStatus.objects.get(table_id=self.data_type._id).is_current)
+        self.assertEqual(LookupTableFieldIndex.objects.filter(table_id=self.data_type._id).count(), 3)
+
+    def test_get_items_by_unindexed_field(self):
+        items = get_items_by_field_value(self.data_type, 'name', 'District 2')
+        self.assertEqual([item._id for item in items], [self.items[2]._id])
+        self.assertFalse(LookupTableIndexStatus.objects.filter(table_id=self.data_type._id).exists())
+
+    def test_invalidated_index_is_rebuilt(self):
+        self.assertEqual(len(get_items_by_field_value(self.data_type, 'id', 'd1')), 1)
+        new_item = self.make_item(3, 'd1', 'District 1 (new)')
+        invalidate_lookup_table_index(self.data_type._id)
+
+        items = get_items_by_field_value(self.data_type, 'id', 'd1')
+        self.assertEqual([item._id for item in items], [self.items[1]._id, new_item._id])
+
+    def test_saving_data_type_invalidates_index(self):
+        get_items_by_field_value(self.data_type, 'id', 'd1')
+        self.data_type.save()
+        self.assertFalse(LookupTableIndexStatus.objects.get(table_id=self.data_type._id).is_current)
+
+    def test_lookup_table_item_expression(self):
+        expression = ExpressionFactory.from_spec({
+            'type': 'lookup_table_item',
+            'table_tag': 'district',
+            'field_name': 'id',
+            'field_value_expression': {'type': 'property_name', 'property_name': 'district_id'},
+            'value_expression': {'type': 'property_name', 'property_name': 'name'},
+        })
+        doc = {'domain': self.domain, 'district_id': 'd2'}
+        self.assertEqual(expression(doc, EvaluationContext(doc, 0)), 'District 2')
+        doc = {'domain': self.domain, 'district_id': 'unknown'}
+        self.assertIsNone(expression(doc, EvaluationContext(doc, 0)))
+
+
+class TestQueryCache(SimpleTestCase):
+
+    def test_bounded_by_entries(self):
+        cache = _QueryCache(max_entries=2, max_bytes=100)
+        cache.set('a', 1, 1)
+        cache.set('b', 2, 1)
+        cache.get('a')
+        cache.set('c', 3, 1)
+        self.assertEqual([cache.get(key) for key in 'abc'], [1, None, 3])
+
+    def test_bounded_by_size(self):
+        cache = _QueryCache(max_entries=10, max_bytes=10)
+        cache.set('a', 1, 6)
+        cache.set('b', 2, 6)
+        cache.set('c', 3, 11)  # too big to cache
+        self.assertEqual([cache.get(key) for key in 'abc'], [None, 2, None])
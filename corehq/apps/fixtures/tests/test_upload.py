@@ -360,3 +360,19 @@ class TestFixtureUpload(TestCase):
             self.get_fixture_items('name'),
             ['apple', 'orange']
         )
+
+    def test_unchanged_rows_are_not_saved(self):
+        rows = [(None, 'N', 'apple'), (None, 'N', 'banana'), (None, 'N', 'cherry')]
+        workbook = self._get_workbook_from_data(self.headers, self.make_rows(rows))
+        _run_fixture_upload(self.domain, workbook)
+        apple, banana, cherry = FixtureDataItem.get_item_list(self.domain, 'things')
+
+        new_rows = [(apple._id, 'N', 'apple'), (banana._id, 'N', 'blueberry'), (cherry._id, 'Y', 'cherry')]
+        workbook = self._get_workbook_from_data(self.headers, self.make_rows(new_rows))
+        _run_fixture_upload(self.domain, workbook)
+
+        items = FixtureDataItem.get_item_list(self.domain, 'things')
+        self.assertEqual([item._id for item in items], [apple._id, banana._id])
+        self.assertEqual(items[0]._rev, apple._rev)
+        self.assertNotEqual(items[1]._rev, banana._rev)
+        self.assertItemsEqual(self.get_fixture_items('name'), ['apple', 'blueberry'])
@@ -1,3 +1,5 @@
+import hashlib
+import json
 import uuid
 
 from django.core.exceptions import ValidationError
@@ -8,13 +10,16 @@ from requests import HTTPError
 
 from dimagi.utils.chunked import chunked
 from dimagi.utils.couch.bulk import CouchTransaction
+from dimagi.utils.couch.database import iter_docs
 from soil import DownloadBase
 
+from corehq.apps.fixtures.dbaccessors import iter_fixture_items_for_data_type
 from corehq.apps.fixtures.models import (
     FieldList,
     FixtureDataItem,
     FixtureDataType,
     FixtureItemField,
+    FixtureOwnership,
 )
 from corehq.apps.fixtures.upload.const import DELETE_HEADER
 from corehq.apps.fixtures.upload.definitions import FixtureUploadResult
@@ -26,6 +31,8 @@ from corehq.apps.fixtures.utils import clear_fixture_cache
 from corehq.apps.users.models import CommCareUser
 from corehq.apps.users.util import normalize_username
 
+UPLOAD_BATCH_SIZE = 1000
+
 
 def upload_fixture_file(domain, filename, replace, task=None, skip_orm=False):
     """
@@ -41,10 +48,14 @@ def upload_fixture_file(domain, filename, replace, task=None, skip_orm=False):
 
 
 def _run_fixture_upload(domain, workbook, replace=False, task=None):
-    from corehq.apps.user_importer.importer import GroupMemoizer
+    """Upload lookup tables, writing only items that have changed
+
+    Rows of each table are streamed from the workbook in batches and
+    compared with the existing items of the table by a hash of their
+    content, so that unchanged items are neither fetched nor saved.
+    """
     return_val = FixtureUploadResult()
-    group_memoizer = GroupMemoizer(domain)
-    get_location = get_memoized_location_getter(domain)
+    get_owners = _get_memoized_owner_getter(domain)
     data_types = []
 
     type_sheets = workbook.get_all_type_sheets()
@@ -53,45 +64,25 @@ def _run_fixture_upload(domain, workbook, replace=False, task=None):
 
     def _update_progress(table_count, item_count, items_in_table):
         if task:
-            processed = table_count * 10 + (10 * item_count / items_in_table)
+            processed = table_count * 10 + (10 * min(item_count / items_in_table, 1))
             DownloadBase.set_progress(task, processed, 10 * total_tables)
 
-    with CouchTransaction() as transaction:
-        for table_number, table_def in enumerate(type_sheets):
+    for table_number, table_def in enumerate(type_sheets):
+        with CouchTransaction() as transaction:
             data_type, delete, err = _create_data_type(domain, table_def, replace, transaction)
             return_val.errors.extend(err)
             if delete:
                 continue
             transaction.save(data_type)
-            data_types.append(data_type)
-
-            data_items = list(workbook.get_data_sheet(data_type.tag))
-            items_in_table = len(data_items)
-            for sort_key, di in enumerate(data_items):
-                _update_progress(table_number, sort_key, items_in_table)
-                type_fields = data_type.fields
-                item_fields = {
-                    field.field_name: _process_item_field(field, di)
-                    for field in type_fields
-                }
-
-                item_attributes = di.get('property', {})
-                old_data_item, delete, err = _process_data_item(
-                    domain, replace, data_type, di, item_fields, item_attributes, sort_key)
-                return_val.errors.extend(err)
-                if delete:
-                    old_data_item.recursive_delete(transaction)
-                    continue
-                transaction.save(old_data_item)
-
-                err = _process_group_ownership(di, old_data_item, group_memoizer, transaction)
-                return_val.errors.extend(err)
-
-                err = _process_user_ownership(di, old_data_item, transaction)
-                return_val.errors.extend(err)
-
-                err = _process_location_ownership(di, old_data_item, get_location, transaction)
-                return_val.errors.extend(err)
+        data_types.append(data_type)
+
+        data_sheet = workbook.get_data_sheet(data_type.tag)
+        items_in_table = max(data_sheet.worksheet.max_row - 1, 1)  # excluding header
+        item_hashes = {} if replace else _get_item_hashes(domain, data_type.get_id)
+        for rows in chunked(enumerate(data_sheet), UPLOAD_BATCH_SIZE):
+            err = _process_data_items(domain, data_type, rows, item_hashes, replace, get_owners)
+            return_val.errors.extend(err)
+            _update_progress(table_number, rows[-1][0] + 1, items_in_table)
 
     clear_fixture_quickcache(domain, data_types)
     clear_fixture_cache(domain)
@@ -324,117 +315,169 @@ def _process_item_field(field, data_item):
     )
 
 
-def _process_data_item(domain, replace, data_type, di, item_fields, item_attributes, sort_key):
-    """Processes a FixtureDataItem from its excel upload.
+def _get_item_hashes(domain, data_type_id):
+    """Get content hashes of the existing items of a lookup table
 
-    Returns a tuple with
-      - (unsaved) FixtureDataItem instance
-      - boolean flag to indiicate if the data item was deleted
-      - a list of errors
+    :returns: `{item_id: content_hash}`
     """
-    delete = False
-    errors = []
-    new_data_item = FixtureDataItem(
-        domain=domain,
-        data_type_id=data_type.get_id,
-        fields=item_fields,
-        item_attributes=item_attributes,
-        sort_key=sort_key
-    )
-    try:
-        if di['UID'] and not replace:
-            old_data_item = FixtureDataItem.get(di['UID'])
-        else:
-            old_data_item = new_data_item
-        old_data_item.fields = item_fields
-        old_data_item.item_attributes = item_attributes
-        if (old_data_item.domain != domain
-                or not old_data_item.data_type_id == data_type.get_id):
-            old_data_item = new_data_item
-            errors.append(
-                _("'%(UID)s' is not a valid UID. But the new item is created.")
-                % {'UID': di['UID']}
-            )
-        if di[DELETE_HEADER] == "Y" or di[DELETE_HEADER] == "y":
-            delete = True
-    except (ResourceNotFound, KeyError):
-        old_data_item = new_data_item
+    return {
+        doc["_id"]: _get_content_hash(doc)
+        for doc in iter_fixture_items_for_data_type(domain, data_type_id, wrap=False)
+    }
 
-    return old_data_item, delete, errors
 
+def _get_content_hash(item_json):
+    # sort_key is not updated on upload, so it is not part of the content
+    content = [item_json.get("fields"), item_json.get("item_attributes")]
+    return hashlib.md5(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
 
-def _process_group_ownership(di, old_data_item, group_memoizer, transaction):
-    """Removes groups from data items and add new ones based on the group column.
-
-    Note the removal does not happen within a context of the "transaction"
-    """
-    errors = []
-    old_groups = old_data_item.groups
-    for group in old_groups:
-        old_data_item.remove_group(group)
-
-    for group_name in di.get('group', []):
-        group = group_memoizer.by_name(group_name)
-        if group:
-            old_data_item.add_group(group, transaction=transaction)
-        else:
-            errors.append(
-                _("Unknown group: '%(name)s'. But the row is successfully added")
-                % {'name': group_name}
-            )
-
-    return errors
 
+def _process_data_items(domain, data_type, rows, item_hashes, replace, get_owners):
+    """Process a batch of rows of a lookup table sheet
 
-def _process_user_ownership(di, old_data_item, transaction):
-    """Removes users from data items and add new ones based on the user column.
+    New and changed items and their ownerships are saved in bulk. Rows
+    having the same content and owners as the existing item are skipped.
 
-    Note the removal does not happen within a context of the "transaction"
+    :param rows: List of `(sort_key, row)` tuples.
+    :param item_hashes: `{item_id: content_hash}` of existing items of
+    the table. Updated with changes made by this batch.
+    :returns: List of errors.
     """
     errors = []
-    domain = old_data_item.domain
-
-    old_users = old_data_item.users
-    for user in old_users:
-        old_data_item.remove_user(user)
-
-    for raw_username in di.get('user', []):
-        try:
-            username = normalize_username(str(raw_username), domain)
-        except ValidationError:
+    item_db = FixtureDataItem.get_db()
+    uids = {row.get('UID') for sort_key, row in rows if row.get('UID') and not replace}
+    unknown_uids = uids - set(item_hashes)
+    # UIDs of items belonging to another table or domain
+    invalid_uids = {doc["_id"] for doc in iter_docs(item_db, list(unknown_uids))}
+
+    new_docs = []
+    changed = {}    # {item_id: item_json}
+    deleted_ids = set()
+    owners = {}     # {item_id: {(owner_type, owner_id), ...}}
+    for sort_key, row in rows:
+        uid = None if replace else row.get('UID')
+        delete = row.get(DELETE_HEADER) in ("Y", "y")
+        item_json = FixtureDataItem(
+            domain=domain,
+            data_type_id=data_type.get_id,
+            fields={
+                field.field_name: _process_item_field(field, row)
+                for field in data_type.fields
+            },
+            item_attributes=row.get('property', {}),
+            sort_key=sort_key,
+        ).to_json()
+        if uid in invalid_uids:
             errors.append(
-                _("Invalid username: '%(name)s'. Row is not added")
-                % {'name': raw_username}
+                _("'%(UID)s' is not a valid UID. But the new item is created.")
+                % {'UID': uid}
             )
+        elif uid in item_hashes:
+            if delete:
+                deleted_ids.add(uid)
+                continue
+            content_hash = _get_content_hash(item_json)
+            if content_hash != item_hashes[uid]:
+                changed[uid] = item_json
+                item_hashes[uid] = content_hash
+        if delete:
             continue
-        user = CommCareUser.get_by_username(username)
-        if user:
-            old_data_item.add_user(user)
+        if uid not in item_hashes:
+            uid = item_json["_id"] = uuid.uuid4().hex
+            new_docs.append(item_json)
+        owners[uid], err = get_owners(row)
+        errors.extend(err)
+
+    new_ids = {doc["_id"] for doc in new_docs}
+    item_docs = list(new_docs)
+    for doc in iter_docs(item_db, list(changed) + list(deleted_ids)):
+        if doc["_id"] in deleted_ids:
+            item_docs.append({"_id": doc["_id"], "_rev": doc["_rev"], "_deleted": True})
         else:
-            errors.append(
-                _("Unknown user: '%(name)s'. But the row is successfully added")
-                % {'name': raw_username}
-            )
-
+            item_json = changed[doc["_id"]]
+            doc["fields"] = item_json["fields"]
+            doc["item_attributes"] = item_json["item_attributes"]
+            item_docs.append(doc)
+    for docs in chunked(item_docs, UPLOAD_BATCH_SIZE):
+        item_db.save_docs(docs)
+
+    ownership_docs = []
+    existing_ids = [uid for uid in owners if uid not in new_ids] + list(deleted_ids)
+    ownerships = FixtureOwnership.for_all_item_ids(existing_ids, domain) if existing_ids else []
+    for ownership in ownerships:
+        item_owners = owners.get(ownership.data_item_id, set())
+        owner = (ownership.owner_type, ownership.owner_id)
+        if owner in item_owners:
+            item_owners.remove(owner)  # already owned
+        else:
+            ownership_docs.append({"_id": ownership._id, "_rev": ownership._rev, "_deleted": True})
+    for item_id, item_owners in owners.items():
+        for owner_type, owner_id in item_owners:
+            ownership_docs.append(FixtureOwnership(
+                _id=uuid.uuid4().hex,
+                domain=domain,
+                data_item_id=item_id,
+                owner_type=owner_type,
+                owner_id=owner_id,
+            ).to_json())
+    for docs in chunked(ownership_docs, UPLOAD_BATCH_SIZE):
+        FixtureOwnership.get_db().save_docs(docs)
     return errors
 
 
-def _process_location_ownership(di, old_data_item, get_location, transaction):
-    """Removes locations from data items and add new ones based on the location column.
+def _get_memoized_owner_getter(domain):
+    """Get a function returning the owners listed in a row of a lookup table sheet
 
-    Note the removal does not happen within a context of the "transaction"
+    The function returns a tuple with
+      - a set of `(owner_type, owner_id)` tuples
+      - a list of errors
     """
-    errors = []
+    from corehq.apps.user_importer.importer import GroupMemoizer
+    group_memoizer = GroupMemoizer(domain)
+    get_location = get_memoized_location_getter(domain)
+    users = {}
+
+    def get_user(username):
+        if username not in users:
+            users[username] = CommCareUser.get_by_username(username)
+        return users[username]
+
+    def get_owners(row):
+        owners = set()
+        errors = []
+        for group_name in row.get('group', []):
+            group = group_memoizer.by_name(group_name)
+            if group:
+                owners.add(('group', group.get_id))
+            else:
+                errors.append(
+                    _("Unknown group: '%(name)s'. But the row is successfully added")
+                    % {'name': group_name}
+                )
 
-    old_locations = old_data_item.locations
-    for location in old_locations:
-        old_data_item.remove_location(location)
+        for raw_username in row.get('user', []):
+            try:
+                username = normalize_username(str(raw_username), domain)
+            except ValidationError:
+                errors.append(
+                    _("Invalid username: '%(name)s'. Row is not added")
+                    % {'name': raw_username}
+                )
+                continue
+            user = get_user(username)
+            if user:
+                owners.add(('user', user.get_id))
+            else:
+                errors.append(
+                    _("Unknown user: '%(name)s'. But the row is successfully added")
+                    % {'name': raw_username}
+                )
 
-    for name in di.get('location', []):
-        location_cache = get_location(name)
-        if location_cache.is_error:
-            errors.append(location_cache.message)
-        else:
-            old_data_item.add_location(location_cache.location,
-                                       transaction=transaction)
-    return errors
+        for name in row.get('location', []):
+            location_cache = get_location(name)
+            if location_cache.is_error:
+                errors.append(location_cache.message)
+            else:
+                owners.add(('location', location_cache.location.location_id))
+        return owners, errors
+    return get_owners
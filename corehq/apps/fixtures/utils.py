@@ -1,6 +1,9 @@
 import re
+from uuid import uuid4
 from xml.etree import cElementTree as ElementTree
 
+from django.core.cache import cache
+
 from celery.task import task
 
 from dimagi.utils.chunked import chunked
@@ -8,6 +11,7 @@ from dimagi.utils.chunked import chunked
 from corehq.blobs import get_blob_db
 
 BAD_SLUG_PATTERN = r"([/\\<>\s])"
+USER_FIXTURE_GENERATION_TIMEOUT = 24 * 60 * 60
 
 
 def clean_fixture_field_name(field_name):
@@ -64,6 +68,31 @@ def get_index_schema_node(fixture_id, attrs_to_index):
 def clear_fixture_cache(domain):
     from corehq.apps.fixtures.models import FIXTURE_BUCKET
     get_blob_db().delete(key=FIXTURE_BUCKET + '/' + domain)
+    clear_user_fixture_cache(domain)
+
+
+def get_user_fixture_cache_generation(domain):
+    """Get a token that changes whenever lookup tables in the domain change
+
+    It is part of the key of every cached user-scoped lookup table
+    fixture, so changing it invalidates them all.
+    """
+    key = _user_fixture_generation_key(domain)
+    generation = cache.get(key)
+    if generation is None:
+        generation = uuid4().hex
+        if not cache.add(key, generation, USER_FIXTURE_GENERATION_TIMEOUT):
+            # another process set it first
+            generation = cache.get(key) or generation
+    return generation
+
+
+def clear_user_fixture_cache(domain):
+    cache.delete(_user_fixture_generation_key(domain))
+
+
+def _user_fixture_generation_key(domain):
+    return f'user-fixture-generation:{domain}'
 
 
 @task(queue='background_queue')
@@ -42,6 +42,7 @@ from corehq.apps.fixtures.exceptions import (
     FixtureUploadError,
 )
 from corehq.apps.fixtures.fixturegenerators import item_lists_by_domain
+from corehq.apps.fixtures.indexes import invalidate_lookup_table_index
 from corehq.apps.fixtures.models import (
     FieldList,
     FixtureDataItem,
@@ -167,6 +168,8 @@ def update_tables(request, domain, data_type_id=None):
                 else:
                     data_type = _create_types(
                         fields_patches, domain, data_tag, is_global, description, transaction)
+        if data_type_id:
+            invalidate_lookup_table_index(data_type_id)
         clear_fixture_cache(domain)
         return json_response(strip_json(data_type))
 
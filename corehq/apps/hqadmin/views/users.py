@@ -601,6 +601,7 @@ class AppBuildTimingsView(TemplateView):
                     filename='app-profile-test.ccz',
                     download_targeted_version=False,
                     task=None,
+                    use_cache=False,
                 )
 
         os.remove(fpath)
@@ -1,3 +1,4 @@
+import hashlib
 import itertools
 import json
 import os
@@ -12,19 +13,33 @@ from django.utils.translation import gettext as _
 from celery.task import task
 from celery.utils.log import get_task_logger
 
+from dimagi.utils.couch import get_redis_lock, release_lock
 from dimagi.utils.logging import notify_exception
 from soil import DownloadBase
-from soil.util import expose_cached_download, expose_file_download
+from soil.util import (
+    expose_blob_download,
+    expose_cached_download,
+    expose_file_download,
+)
 
 from corehq import toggles
 from corehq.apps.app_manager.dbaccessors import get_app
 from corehq.apps.hqmedia.cache import BulkMultimediaStatusCache
 from corehq.apps.hqmedia.models import CommCareMultimedia
+from corehq.blobs import CODES, get_blob_db
+from corehq.blobs.models import BlobMeta
 from corehq.util.files import file_extention_from_filename
+from corehq.util.metrics import metrics_counter
 
 logging = get_task_logger(__name__)
 
 MULTIMEDIA_EXTENSIONS = ('.mp3', '.wav', '.jpg', '.png', '.gif', '.3gp', '.mp4', '.zip', )
+LOCALE_ID_CHECK_FILES = ('default/app_strings.txt', 'suite.xml')
+
+CCZ_CACHE_VERSION = 1  # increment to invalidate cached CCZs
+CCZ_CACHE_TIMEOUT = 30 * 24 * 60  # minutes since last download
+CCZ_LOCK_TIMEOUT = 60 * 60
+CCZ_LOCK_WAIT = 30  # seconds to wait for a CCZ being cached by another request
 
 
 @task(serializer='pickle')
@@ -186,6 +201,13 @@ def _build_ccz_files(build, build_profile_id, include_multimedia_files, include_
 
 
 def _zip_files_for_ccz(fpath, files, current_progress, file_progress, file_count, compression, task):
+    """Write files to a zip file
+
+    :returns: A tuple `(file_names, file_cache)`: the paths of all files
+    written and a dict of the contents of the files needed to check the
+    integrity of the CCZ, by path.
+    """
+    file_names = []
     file_cache = {}
     with open(fpath, 'wb') as tmp:
         with zipfile.ZipFile(tmp, "w", allowZip64=True) as z:
@@ -196,17 +218,22 @@ def _zip_files_for_ccz(fpath, files, current_progress, file_progress, file_count
                 z.writestr(path, data, file_compression)
                 current_progress += file_progress / file_count
                 DownloadBase.set_progress(task, current_progress, 100)
-                if extension not in MULTIMEDIA_EXTENSIONS:
+                file_names.append(path)
+                if path in LOCALE_ID_CHECK_FILES or _is_media_suite(path):
                     file_cache[path] = data
-    return file_cache
+    return file_names, file_cache
 
 
 def create_files_for_ccz(build, build_profile_id, include_multimedia_files=True, include_index_files=True,
                          download_id=None, compress_zip=False, filename="commcare.zip",
-                         download_targeted_version=False, task=None):
+                         download_targeted_version=False, task=None, use_cache=True):
     """
+    CCZs of saved builds are cached in the blob db, and are only built
+    by the first of concurrent requests for the same CCZ.
+
     :param task: celery task whose progress needs to be set when being run asynchronously by celery
-    :return: path to the ccz file
+    :param use_cache: Pass `False` to always build the CCZ file
+    :return: path to the ccz file, or `None` if the ccz is cached in the blob db
     """
     compression = zipfile.ZIP_DEFLATED if compress_zip else zipfile.ZIP_STORED
     current_progress = 10  # early on indicate something is happening
@@ -214,49 +241,30 @@ def create_files_for_ccz(build, build_profile_id, include_multimedia_files=True,
 
     DownloadBase.set_progress(task, current_progress, 100)
 
+    def create_ccz_file(fpath):
+        _create_ccz_file(
+            build, build_profile_id, include_multimedia_files, include_index_files, download_id,
+            compress_zip, filename, download_targeted_version, fpath, compression, current_progress,
+            file_progress, task,
+        )
+
+    if use_cache and _is_ccz_cacheable(build):
+        cache_key = _get_ccz_cache_key(build, build_profile_id, include_multimedia_files,
+                                       include_index_files, compress_zip, download_targeted_version)
+        blob_key = _get_cached_ccz(build, cache_key, create_ccz_file)
+        if blob_key is not None:
+            DownloadBase.set_progress(task, current_progress + file_progress, 100)
+            with build.timing_context("_expose_download_link"):
+                _expose_blob_download_link(blob_key, filename, compress_zip, download_id)
+            DownloadBase.set_progress(task, 100, 100)
+            return None
+
     fpath = _get_file_path(build, include_multimedia_files, include_index_files, build_profile_id,
                            download_targeted_version)
 
     # Don't rebuild the file if it is already there
     if not (os.path.isfile(fpath) and settings.SHARED_DRIVE_CONF.transfer_enabled):
-        with build.timing_context("_build_ccz_files"):
-            files, errors, file_count = _build_ccz_files(
-                build, build_profile_id, include_multimedia_files, include_index_files,
-                download_id, compress_zip, filename, download_targeted_version
-            )
-        with build.timing_context("_zip_files_for_ccz"):
-            file_cache = _zip_files_for_ccz(fpath, files, current_progress, file_progress,
-                                            file_count, compression, task)
-
-        if include_index_files and toggles.LOCALE_ID_INTEGRITY.enabled(build.domain):
-            with build.timing_context("find_missing_locale_ids_in_ccz"):
-                locale_errors = find_missing_locale_ids_in_ccz(file_cache)
-            if locale_errors:
-                errors.extend(locale_errors)
-                notify_exception(
-                    None,
-                    message="CCZ missing locale ids from default/app_strings.txt",
-                    details={'domain': build.domain, 'app_id': build.id, 'errors': locale_errors}
-                )
-        if include_index_files and include_multimedia_files:
-            with build.timing_context("check_ccz_multimedia_integrity"):
-                multimedia_errors = check_ccz_multimedia_integrity(build.domain, fpath)
-            if multimedia_errors:
-                multimedia_errors.insert(0, _(
-                    "Please try syncing multimedia files in multimedia tab under app settings to resolve "
-                    "issues with missing media files. Report an issue if this persists."
-                ))
-            errors.extend(multimedia_errors)
-            if multimedia_errors:
-                notify_exception(
-                    None,
-                    message="CCZ missing multimedia files",
-                    details={'domain': build.domain, 'app_id': build.id, 'errors': multimedia_errors}
-                )
-
-        if errors:
-            os.remove(fpath)
-            raise Exception('\t' + '\t'.join(errors))
+        create_ccz_file(fpath)
     else:
         DownloadBase.set_progress(task, current_progress + file_progress, 100)
     with build.timing_context("_expose_download_link"):
@@ -265,6 +273,123 @@ def create_files_for_ccz(build, build_profile_id, include_multimedia_files=True,
     return fpath
 
 
+def _create_ccz_file(build, build_profile_id, include_multimedia_files, include_index_files, download_id,
+                     compress_zip, filename, download_targeted_version, fpath, compression,
+                     current_progress, file_progress, task):
+    with build.timing_context("_build_ccz_files"):
+        files, errors, file_count = _build_ccz_files(
+            build, build_profile_id, include_multimedia_files, include_index_files,
+            download_id, compress_zip, filename, download_targeted_version
+        )
+    with build.timing_context("_zip_files_for_ccz"):
+        file_names, file_cache = _zip_files_for_ccz(fpath, files, current_progress, file_progress,
+                                                    file_count, compression, task)
+
+    if include_index_files and toggles.LOCALE_ID_INTEGRITY.enabled(build.domain):
+        with build.timing_context("find_missing_locale_ids_in_ccz"):
+            locale_errors = find_missing_locale_ids_in_ccz(file_cache)
+        if locale_errors:
+            errors.extend(locale_errors)
+            notify_exception(
+                None,
+                message="CCZ missing locale ids from default/app_strings.txt",
+                details={'domain': build.domain, 'app_id': build.id, 'errors': locale_errors}
+            )
+    if include_index_files and include_multimedia_files:
+        with build.timing_context("check_ccz_multimedia_integrity"):
+            multimedia_errors = check_ccz_multimedia_integrity(build.domain, file_names, file_cache)
+        if multimedia_errors:
+            multimedia_errors.insert(0, _(
+                "Please try syncing multimedia files in multimedia tab under app settings to resolve "
+                "issues with missing media files. Report an issue if this persists."
+            ))
+        errors.extend(multimedia_errors)
+        if multimedia_errors:
+            notify_exception(
+                None,
+                message="CCZ missing multimedia files",
+                details={'domain': build.domain, 'app_id': build.id, 'errors': multimedia_errors}
+            )
+
+    if errors:
+        os.remove(fpath)
+        raise Exception('\t' + '\t'.join(errors))
+
+
+def _is_ccz_cacheable(build):
+    # the manifest added for CAUTIOUS_MULTIMEDIA is different for each download
+    return bool(build.copy_of) and not toggles.CAUTIOUS_MULTIMEDIA.enabled(build.domain)
+
+
+def _get_ccz_cache_key(build, build_profile_id, include_multimedia_files, include_index_files,
+                       compress_zip, download_targeted_version):
+    # saved builds don't change, so a CCZ is identified by its build and options
+    options = json.dumps([
+        CCZ_CACHE_VERSION,
+        build_profile_id,
+        include_multimedia_files,
+        include_index_files,
+        compress_zip,
+        download_targeted_version,
+    ])
+    return "ccz-{}-{}".format(build.get_id, hashlib.sha1(options.encode('utf-8')).hexdigest())
+
+
+def _get_cached_ccz(build, cache_key, create_ccz_file):
+    """Get the blob key of a cached CCZ, creating it if necessary
+
+    Concurrent requests for the same CCZ briefly wait for the first one
+    to create it rather than creating it again.
+
+    :param create_ccz_file: Function that writes the CCZ to a given path.
+    :returns: The blob key, or `None` if the CCZ is still being created
+    by another request.
+    """
+    meta = _get_ccz_blob_meta(build, cache_key)
+    if meta is None:
+        lock = get_redis_lock(cache_key, timeout=CCZ_LOCK_TIMEOUT, name="ccz_cache")
+        acquired = lock.acquire(blocking=True, blocking_timeout=CCZ_LOCK_WAIT)
+        try:
+            # may have been created while waiting for the lock
+            meta = _get_ccz_blob_meta(build, cache_key)
+            if meta is None:
+                if not acquired:
+                    metrics_counter('commcare.app_build.ccz_cache', tags={'result': 'locked'})
+                    return None
+                metrics_counter('commcare.app_build.ccz_cache', tags={'result': 'miss'})
+                fd, fpath = tempfile.mkstemp()
+                os.close(fd)
+                try:
+                    create_ccz_file(fpath)
+                    with open(fpath, 'rb') as ccz, build.timing_context("_cache_ccz"):
+                        get_blob_db().put(
+                            ccz,
+                            domain=build.domain,
+                            parent_id=build.get_id,
+                            type_code=CODES.application_ccz,
+                            key=cache_key,
+                            timeout=CCZ_CACHE_TIMEOUT,
+                        )
+                finally:
+                    if os.path.exists(fpath):
+                        os.remove(fpath)
+                return cache_key
+        finally:
+            if acquired:
+                release_lock(lock, True)
+    metrics_counter('commcare.app_build.ccz_cache', tags={'result': 'hit'})
+    # keep CCZs that are still being downloaded
+    get_blob_db().metadb.expire(build.get_id, cache_key, minutes=CCZ_CACHE_TIMEOUT)
+    return cache_key
+
+
+def _get_ccz_blob_meta(build, cache_key):
+    try:
+        return get_blob_db().metadb.get(parent_id=build.get_id, key=cache_key)
+    except BlobMeta.DoesNotExist:
+        return None
+
+
 def _expose_download_link(fpath, filename, compress_zip, download_id):
     common_kwargs = {
         'mimetype': 'application/zip' if compress_zip else 'application/x-zip-compressed',
@@ -280,10 +405,22 @@ def _expose_download_link(fpath, filename, compress_zip, download_id):
                                **common_kwargs)
 
 
+def _expose_blob_download_link(blob_key, filename, compress_zip, download_id):
+    expose_blob_download(
+        filename,
+        expiry=(1 * 60 * 60),
+        mimetype='application/zip' if compress_zip else 'application/x-zip-compressed',
+        content_disposition='attachment; filename="{fname}"'.format(fname=filename),
+        download_id=download_id,
+        blob_key=blob_key,
+        type_code=CODES.application_ccz,
+    )
+
+
 def find_missing_locale_ids_in_ccz(file_cache):
     errors = [
         _("Could not find {file_path} in CCZ").format(file_path=file_path)
-        for file_path in ('default/app_strings.txt', 'suite.xml') if file_path not in file_cache]
+        for file_path in LOCALE_ID_CHECK_FILES if file_path not in file_cache]
     if errors:
         return errors
 
@@ -304,24 +441,29 @@ def find_missing_locale_ids_in_ccz(file_cache):
     ]
 
 
+def _is_media_suite(path):
+    return bool(re.search(r'\bmedia_suite.xml\b', path))
+
+
 # Check that all media files present in media_suite.xml were added to the zip
-def check_ccz_multimedia_integrity(domain, fpath):
+def check_ccz_multimedia_integrity(domain, file_names, file_cache):
+    """
+    :param file_names: paths of all files in the CCZ
+    :param file_cache: dict of file contents by path, including media_suite.xml
+    """
     errors = []
 
-    with open(fpath, 'rb') as tmp:
-        with zipfile.ZipFile(tmp, "r") as z:
-            media_suites = [f for f in z.namelist() if re.search(r'\bmedia_suite.xml\b', f)]
-            if len(media_suites) != 1:
-                message = _('Could not find media_suite.xml in CCZ')
-                errors.append(message)
-            else:
-                with z.open(media_suites[0]) as media_suite:
-                    from corehq.apps.app_manager.xform import parse_xml
-                    parsed = parse_xml(media_suite.read())
-                    resources = {node.text for node in
-                                 parsed.findall("media/resource/location[@authority='local']")}
-                    names = z.namelist()
-                    missing = [r for r in resources if re.sub(r'^\.\/', '', r) not in names]
-                    errors += [_('Media file missing from CCZ: {}').format(r) for r in missing]
+    media_suites = [f for f in file_names if _is_media_suite(f)]
+    if len(media_suites) != 1:
+        message = _('Could not find media_suite.xml in CCZ')
+        errors.append(message)
+    else:
+        from corehq.apps.app_manager.xform import parse_xml
+        parsed = parse_xml(file_cache[media_suites[0]])
+        resources = {node.text for node in
+                     parsed.findall("media/resource/location[@authority='local']")}
+        names = set(file_names)
+        missing = [r for r in resources if re.sub(r'^\.\/', '', r) not in names]
+        errors += [_('Media file missing from CCZ: {}').format(r) for r in missing]
 
     return errors
@@ -34,6 +34,7 @@ from memoized import memoized
 from couchexport.export import export_raw
 from couchexport.models import Format
 from couchexport.shortcuts import export_response
+from dimagi.utils.chunked import chunked
 from soil import DownloadBase
 from soil.util import expose_cached_download
 
@@ -80,12 +81,17 @@ from corehq.apps.hqwebapp.views import BaseSectionPageView
 from corehq.apps.translations.utils import get_file_content_from_workbook
 from corehq.apps.users.decorators import require_permission
 from corehq.apps.users.models import Permissions
+from corehq.blobs import CODES, get_blob_db
+from corehq.blobs.interface import iter_concurrently_in_order
 from corehq.middleware import always_allow_browser_caching
 from corehq.util.files import file_extention_from_filename
 from corehq.util.workbook_reading import valid_extensions, SpreadsheetFileExtError
 
 transient_file_store = TransientFileStore("hqmedia_upload_paths", timeout=1 * 60 * 60)
 
+MEDIA_FETCH_WORKERS = 8
+MEDIA_META_BATCH_SIZE = 100
+
 
 class BaseMultimediaView(ApplicationViewMixin, BaseSectionPageView):
 
@@ -832,11 +838,10 @@ def iter_media_files(media_objects):
     errors = []
 
     def _media_files():
-        for path, media in media_objects:
+        for (path, media), data in _iter_media_data(media_objects):
             try:
-                data, _ = media.get_display_file()
                 folder = path.replace(MULTIMEDIA_PREFIX, "")
-                if not isinstance(data, str):
+                if data is not None and not isinstance(data, str):
                     yield os.path.join(folder), data
             except NameError as e:
                 message = "%(path)s produced an ERROR: %(error)s" % {
@@ -847,6 +852,37 @@ def iter_media_files(media_objects):
     return _media_files(), errors
 
 
+def _iter_media_data(media_objects):
+    """Fetch the content of media files concurrently
+
+    Blob metadata is fetched in batches, and blob content is read by a
+    pool of threads, holding no more than `MEDIA_FETCH_WORKERS` files in
+    memory at a time.
+
+    :yields: `((path, media), data)` pairs in the order of `media_objects`.
+    """
+    db = get_blob_db()
+
+    def iter_metas():
+        for batch in chunked(media_objects, MEDIA_META_BATCH_SIZE):
+            parent_ids = list({media._id for path, media in batch})
+            metas = {meta.key: meta for meta in db.metadb.get_for_parents(parent_ids, CODES.multimedia)}
+            for path, media in batch:
+                blob = media.external_blobs.get(media.attachment_id)
+                yield (path, media), (metas.get(blob.key) if blob else None)
+
+    def get_data(item):
+        (path, media), meta = item
+        if meta is None:
+            # couch attachment, or missing blob: let get_display_file handle it
+            return media.get_display_file(return_type=False)
+        with meta.open(db) as fh:
+            return fh.read()
+
+    for (path_and_media, meta), data in iter_concurrently_in_order(get_data, iter_metas(), MEDIA_FETCH_WORKERS):
+        yield path_and_media, data
+
+
 def iter_app_files(app, include_multimedia_files, include_index_files,
                    build_profile_id=None, download_targeted_version=False):
     file_iterator = []
@@ -30,6 +30,7 @@ from corehq.apps.fixtures.dbaccessors import (
     delete_fixture_items_for_data_type,
     get_fixture_data_type_by_tag,
 )
+from corehq.apps.fixtures.indexes import invalidate_lookup_table_index
 from corehq.apps.fixtures.models import FixtureDataType, FixtureDataItem
 from corehq.apps.fixtures.upload.run_upload import clear_fixture_quickcache
 from corehq.apps.fixtures.utils import clear_fixture_cache
@@ -242,6 +243,7 @@ def update_fixture(domain_link, tag):
         doc["data_type_id"] = linked_data_type._id
         FixtureDataItem.wrap(doc).save()
 
+    invalidate_lookup_table_index(linked_data_type._id)
     clear_fixture_cache(domain_link.linked_domain)
 
 
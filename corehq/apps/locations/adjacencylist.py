@@ -46,13 +46,13 @@ class AdjListManager(models.Manager):
             where = node
         elif include_self:
             if isinstance(node, QuerySet):
-                if _is_empty(node):
+                if is_empty(node):
                     return self.none()
                 where = Q(id__in=node.order_by())
             else:
                 where = Q(id=node.id)
         elif isinstance(node, QuerySet):
-            if _is_empty(node):
+            if is_empty(node):
                 return self.none()
             where = Q(id__in=node.order_by().values("parent_id"))
         else:
@@ -94,14 +94,14 @@ class AdjListManager(models.Manager):
             discard_dups = True
         elif include_self:
             if isinstance(node, QuerySet):
-                if _is_empty(node):
+                if is_empty(node):
                     return self.none()
                 where = Q(id__in=node.order_by())
                 discard_dups = True
             else:
                 where = Q(id=node.id)
         elif isinstance(node, QuerySet):
-            if _is_empty(node):
+            if is_empty(node):
                 return self.none()
             where = Q(parent_id__in=node.order_by())
             discard_dups = True
@@ -196,7 +196,7 @@ class AdjListModel(models.Model):
         return self.children.all()
 
 
-def _is_empty(queryset):
+def is_empty(queryset):
     query = queryset.query
     if query.is_empty():
         return True
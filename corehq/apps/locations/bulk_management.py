@@ -251,7 +251,11 @@ class LocationCollection(object):
     def __init__(self, domain_obj):
         self.domain_name = domain_obj.name
         self.types = domain_obj.location_types
-        self.locations = list(SQLLocation.objects.filter(domain=self.domain_name, is_archived=False))
+        self.locations = list(
+            SQLLocation.objects
+            .filter(domain=self.domain_name, is_archived=False)
+            .select_related('location_type')
+        )
 
     @property
     @memoized
@@ -425,9 +429,10 @@ class NewLocationImporter(object):
         return self.result
 
     def bulk_commit(self, type_stubs, location_stubs):
-        type_objects = save_types(type_stubs, self.excel_importer)
-        save_locations(location_stubs, type_objects, self.old_collection,
-                       self.excel_importer, self.chunk_size)
+        with transaction.atomic():
+            type_objects = save_types(type_stubs, self.excel_importer)
+            save_locations(location_stubs, type_objects, self.old_collection,
+                           self.excel_importer, self.chunk_size)
         # Since we updated LocationType objects in bulk, some of the post-save logic
         # that occurs inside LocationType.save needs to be explicitly called here
         for lt in type_stubs:
@@ -629,9 +634,15 @@ class LocationTreeValidator(object):
     def _check_new_site_codes_available(self):
         updated_location_ids = {l.location_id for l in self.all_listed_locations
                                 if l.location_id}
-        # These site codes belong to locations in the db, but not the upload
-        unavailable_site_codes = {l.site_code for l in self.old_collection.locations
-                                  if l.location_id not in updated_location_ids}
+        # These site codes belong to locations in the db, but not the upload.
+        # The old collection only has unarchived locations, so query for all
+        # of them to avoid an IntegrityError when saving.
+        unavailable_site_codes = set(
+            SQLLocation.objects
+            .filter(domain=self.domain, site_code__in={l.site_code for l in self.all_listed_locations})
+            .exclude(location_id__in=updated_location_ids)
+            .values_list('site_code', flat=True)
+        )
         return [
             _("Location site_code '{code}' is in use by another location. "
               "All site_codes must be unique").format(code=l.site_code)
@@ -748,15 +759,21 @@ class LocationTreeValidator(object):
         return errors
 
     def _check_model_validation(self):
-        """Do model validation"""
+        """Do model validation
+
+        Foreign keys and uniqueness are not validated here because they
+        would be checked with queries for each location. They are
+        validated against the whole upload by the other checks (site
+        codes by `_check_new_site_codes_available`).
+        """
         errors = []
         for location in self.locations:
-            exclude_fields = ["location_type"]  # Skip foreign key validation
+            exclude_fields = ["location_type", "parent"]  # Skip foreign key validation
             if not location.db_object.location_id:
-                # Don't validate location_id if its blank because SQLLocation.save() will add it
+                # Don't validate location_id if its blank because SQLLocation.bulk_create() will add it
                 exclude_fields.append("location_id")
             try:
-                location.db_object.full_clean(exclude=exclude_fields)
+                location.db_object.full_clean(exclude=exclude_fields, validate_unique=False)
             except ValidationError as e:
                 for field, issues in e.message_dict.items():
                     for issue in issues:
@@ -844,7 +861,8 @@ def save_locations(location_stubs, types_by_code, old_collection,
     :param types_by_code: (dict) Mapping of 'code' to LocationType SQL objects
     :param excel_importer: Used for providing progress feedback. Disabled on None
 
-    This recursively saves tree top to bottom.
+    This saves the tree top to bottom in a single transaction when called
+    by `NewLocationImporter.bulk_commit()`.
     """
 
     def order_by_location_type():
@@ -870,38 +888,59 @@ def save_locations(location_stubs, types_by_code, old_collection,
 
         return top_to_bottom_locations
 
-    # Go through all locations and either flag for deletion or save
+    # Go through all locations and either flag for deletion or save.
+    # Locations are saved in bulk in top to bottom order, so that parents
+    # are always saved before their children.
     location_stubs_by_code = {stub.site_code: stub for stub in location_stubs}
     to_delete = []
     for stubs in chunked(order_by_location_type(), chunk_size):
-        with transaction.atomic():
-            for loc in stubs:
-                if loc.do_delete:
-                    if loc.is_new:
-                        if excel_importer:
-                            excel_importer.add_progress()
+        to_create = []
+        to_update = []
+        for loc in stubs:
+            if loc.do_delete and not loc.is_new:
+                # progress is added when locations are deleted
+                to_delete.append(loc)
+                continue
+            if excel_importer:
+                excel_importer.add_progress()
+            if loc.do_delete:
+                continue
+            if loc.needs_save:
+                # attach location type and parent to location
+                loc_object = loc.db_object
+                loc_object.location_type = types_by_code.get(loc.location_type)
+                parent_code = loc.parent_code
+                if parent_code == ROOT_LOCATION_TYPE:
+                    loc_object.parent = None
+                elif parent_code:
+                    if parent_code in location_stubs_by_code:
+                        loc_object.parent = location_stubs_by_code[parent_code].db_object
                     else:
-                        to_delete.append(loc)
-                    continue
-                if excel_importer:
-                    excel_importer.add_progress()
-                if loc.needs_save:
-                    # attach location type and parent to location, then save
-                    loc_object = loc.db_object
-                    loc_object.location_type = types_by_code.get(loc.location_type)
-                    parent_code = loc.parent_code
-                    if parent_code == ROOT_LOCATION_TYPE:
-                        loc_object.parent = None
-                    elif parent_code:
-                        if parent_code in location_stubs_by_code:
-                            loc_object.parent = location_stubs_by_code[parent_code].db_object
-                        else:
-                            loc_object.parent = old_collection.locations_by_site_code[parent_code]
-                    loc_object.save()
+                        loc_object.parent = old_collection.locations_by_site_code[parent_code]
+                (to_create if loc.is_new else to_update).append(loc_object)
+        # a chunk may hold new locations of a type and of its child type
+        for batch in _split_parents_from_children(to_create):
+            SQLLocation.bulk_create(batch)
+        if to_update:
+            SQLLocation.bulk_update(to_update)
 
     _delete_locations(to_delete, old_collection, excel_importer, chunk_size)
 
 
+def _split_parents_from_children(locations):
+    """Split new locations ordered top to bottom into batches that can
+    be inserted in order, each batch holding no parent of its locations"""
+    batches = []
+    batch_ids = set()
+    for loc in locations:
+        if not batches or id(loc.parent) in batch_ids:
+            batches.append([])
+            batch_ids = set()
+        batches[-1].append(loc)
+        batch_ids.add(id(loc))
+    return batches
+
+
 def _delete_locations(to_delete, old_collection, excel_importer, chunk_size):
     # Delete locations in chunks.  Also assemble ancestor IDs to update, but don't repeat across chunks.
     _seen = set()
@@ -922,7 +961,6 @@ def _delete_locations(to_delete, old_collection, excel_importer, chunk_size):
     for stubs in chunked(reversed(to_delete), chunk_size):
         to_delete = [loc.db_object for loc in stubs]
         ancestor_ids = list(iter_unprocessed_ancestor_ids(stubs))
-        with transaction.atomic():
-            SQLLocation.bulk_delete(to_delete, ancestor_ids)
-            if excel_importer:
-                excel_importer.add_progress(len(to_delete))
+        SQLLocation.bulk_delete(to_delete, ancestor_ids)
+        if excel_importer:
+            excel_importer.add_progress(len(to_delete))
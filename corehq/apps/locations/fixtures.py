@@ -1,14 +1,17 @@
+import hashlib
 from collections import defaultdict
 from itertools import groupby
-from xml.etree.cElementTree import Element, SubElement
+from xml.etree.cElementTree import Element, SubElement, tostring
 
 from django.contrib.postgres.fields.array import ArrayField
+from django.core.cache import cache
 from django.db.models import IntegerField, Q
 
 from django_cte import With
 from django_cte.raw import raw_cte_sql
 
 from casexml.apps.phone.fixtures import FixtureProvider
+from casexml.apps.phone.utils import GLOBAL_USER_ID
 
 from corehq import toggles
 from corehq.apps.app_manager.const import (
@@ -23,6 +26,11 @@ from corehq.apps.locations.models import (
     LocationType,
     SQLLocation,
 )
+from corehq.util.metrics import metrics_counter
+
+LOCATION_FIXTURE_CACHE_TIMEOUT = 60 * 60
+# rendered location fixtures larger than this are not cached
+LOCATION_FIXTURE_CACHE_MAX_BYTES = 5 * 1024 * 1024
 
 
 class LocationSet(object):
@@ -113,8 +121,44 @@ class LocationFixtureProvider(FixtureProvider):
         if not should_sync_locations(restore_state.last_sync_log, locations_queryset, restore_state):
             return []
 
-        return self.serializer.get_xml_nodes(restore_user.domain, self.id, restore_user.user_id,
-                                             locations_queryset)
+        return self._get_xml_nodes(restore_user.domain, restore_user.user_id, locations_queryset)
+
+    def _get_xml_nodes(self, domain, user_id, locations_queryset):
+        """Get rendered fixture nodes, from the cache if possible
+
+        Users assigned to the same locations get identical fixtures, so
+        they are cached by the expanded set of locations rather than by
+        user. Every location save updates `last_modified`, which is part
+        of the key along with the location types and custom data fields
+        of the domain, so a change only invalidates fixtures that include
+        the changed location.
+        """
+        key = _get_fixture_cache_key(domain, self.id, locations_queryset)
+        elements = cache.get(key)
+        if elements is None:
+            metrics_counter('commcare.fixtures.locations.cache', tags={'result': 'miss', 'fixture': self.id})
+            nodes = self.serializer.get_xml_nodes(domain, self.id, GLOBAL_USER_ID, locations_queryset)
+            elements = [tostring(node, encoding='utf-8') for node in nodes]
+            if sum(len(element) for element in elements) <= LOCATION_FIXTURE_CACHE_MAX_BYTES:
+                cache.set(key, elements, LOCATION_FIXTURE_CACHE_TIMEOUT)
+        else:
+            metrics_counter('commcare.fixtures.locations.cache', tags={'result': 'hit', 'fixture': self.id})
+        global_id = GLOBAL_USER_ID.encode('utf-8')
+        b_user_id = user_id.encode('utf-8')
+        return [element.replace(global_id, b_user_id) for element in elements]
+
+
+def _get_fixture_cache_key(domain, fixture_id, locations_queryset):
+    locations = sorted(
+        (pk, last_modified.isoformat())
+        for pk, last_modified in locations_queryset.order_by().values_list('id', 'last_modified')
+    )
+    location_types = list(
+        LocationType.objects.filter(domain=domain).order_by('id').values_list('id', 'code', 'name')
+    )
+    data_fields = [field.slug for field in get_location_data_fields(domain)]
+    digest = hashlib.md5(repr((locations, location_types, data_fields)).encode('utf-8')).hexdigest()
+    return f'location-fixture:{domain}:{fixture_id}:{digest}'
 
 
 class HierarchicalLocationSerializer(object):
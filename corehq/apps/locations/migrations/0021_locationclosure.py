@@ -0,0 +1,30 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+from corehq.sql_db.operations import RawSQLMigration
+
+migrator = RawSQLMigration(('corehq', 'apps', 'locations', 'sql_templates'), {})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0020_delete_locationrelation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationClosure',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.IntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='closure_descendants', to='locations.SQLLocation')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='closure_ancestors', to='locations.SQLLocation')),
+            ],
+            options={
+                'unique_together': {('ancestor', 'descendant')},
+                'index_together': {('descendant', 'depth')},
+            },
+        ),
+        migrator.get_migration('location_closure.sql', 'location_closure_rollback.sql'),
+    ]
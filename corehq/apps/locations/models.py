@@ -4,7 +4,7 @@ from datetime import datetime
 from functools import partial
 
 from django.db import models, transaction
-from django.db.models import Q
+from django.db.models import F, Func, Q
 
 import jsonfield
 from django_bulk_update.helper import bulk_update as bulk_update_helper
@@ -12,7 +12,11 @@ from django_cte import CTEQuerySet
 from memoized import memoized
 
 from corehq.apps.domain.models import Domain
-from corehq.apps.locations.adjacencylist import AdjListManager, AdjListModel
+from corehq.apps.locations.adjacencylist import (
+    AdjListManager,
+    AdjListModel,
+    is_empty,
+)
 from corehq.apps.products.models import SQLProduct
 from corehq.form_processor.exceptions import CaseNotFound
 from corehq.form_processor.interfaces.supply import SupplyInterface
@@ -326,6 +330,34 @@ class LocationManager(LocationQueriesMixin, AdjListManager):
         locations = self.filter(location_id__in=location_ids)
         return self.get_queryset_descendants(locations, include_self=True)
 
+    def get_queryset_ancestors(self, queryset, include_self=False):
+        """Query ancestors of locations using the closure table
+
+        :param queryset: A queryset of locations or their `id`s.
+        :returns: A queryset ordered by path (root ancestors first).
+        """
+        if is_empty(queryset):
+            return self.none()
+        ancestor_ids = LocationClosure.objects.filter(
+            descendant_id__in=queryset.order_by(),
+            depth__gte=0 if include_self else 1,
+        ).values('ancestor_id')
+        return self.filter(id__in=ancestor_ids).order_by(_name_path(F('id')))
+
+    def get_queryset_descendants(self, queryset, include_self=False):
+        """Query descendants of locations using the closure table
+
+        :param queryset: A queryset of locations or their `id`s.
+        :returns: A queryset ordered by path, like `get_descendants`.
+        """
+        if is_empty(queryset):
+            return self.none()
+        descendant_ids = LocationClosure.objects.filter(
+            ancestor_id__in=queryset.order_by(),
+            depth__gte=0 if include_self else 1,
+        ).values('descendant_id')
+        return self.filter(id__in=descendant_ids).order_by(_name_path(F('id')))
+
     def get_locations_and_children_ids(self, location_ids):
         return list(self.get_locations_and_children(location_ids).location_ids())
 
@@ -411,33 +443,35 @@ class SQLLocation(AdjListModel):
         to_delete = self.get_descendants(include_self=True)
         for loc in to_delete:
             loc._remove_user()
+        # closure rows are deleted with this location
+        ancestor_location_ids = list(self.get_ancestors().location_ids())
 
         super(SQLLocation, self).delete(*args, **kwargs)
         update_users_at_locations.delay(
             self.domain,
             [loc.location_id for loc in to_delete],
             [loc.supply_point_id for loc in to_delete if loc.supply_point_id],
-            list(self.get_ancestors().location_ids()),
+            ancestor_location_ids,
         )
         for loc in to_delete:
             publish_location_saved(loc.domain, loc.location_id, is_deletion=True)
 
     full_delete = delete
 
-    def get_descendants(self, include_self=False, **kwargs):
-        if include_self:
-            where = Q(domain=self.domain, id=self.id)
-        else:
-            where = Q(domain=self.domain, parent_id=self.id)
-        return SQLLocation.objects.get_descendants(
-            where, **kwargs
-        )
+    def get_descendants(self, include_self=False):
+        return SQLLocation.objects.filter(
+            domain=self.domain,
+            closure_ancestors__ancestor_id=self.id,
+            closure_ancestors__depth__gte=0 if include_self else 1,
+        ).order_by(_name_path(F('id')))
 
-    def get_ancestors(self, include_self=False, **kwargs):
-        where = Q(domain=self.domain, id=self.id if include_self else self.parent_id)
-        return SQLLocation.objects.get_ancestors(
-            where, **kwargs
-        )
+    def get_ancestors(self, include_self=False, ascending=False):
+        """Get ancestors ordered by depth, root first unless `ascending`"""
+        return SQLLocation.objects.filter(
+            domain=self.domain,
+            closure_descendants__descendant_id=self.id,
+            closure_descendants__depth__gte=0 if include_self else 1,
+        ).order_by(("" if ascending else "-") + "closure_descendants__depth")
 
     @classmethod
     def bulk_delete(cls, locations, ancestor_location_ids):
@@ -475,6 +509,63 @@ class SQLLocation(AdjListModel):
         for loc in locations:
             publish_location_saved(loc.domain, loc.location_id, is_deletion=True)
 
+    @classmethod
+    def bulk_create(cls, locations):
+        """Create new locations with a single insert
+
+        Post-save logic of `save()` is applied to each location. Parents
+        must be saved before their children. Closure rows are created by
+        database triggers.
+
+        :param locations: A list of unsaved SQLLocation objects with
+        `location_type` and `parent` set.
+        :returns: The list of created locations.
+        """
+        if not locations:
+            return []
+        for loc in locations:
+            if not loc.location_id:
+                loc.location_id = uuid.uuid4().hex
+            set_site_code_if_needed(loc)
+        cls._pre_bulk_save(locations)
+        cls.objects.bulk_create(locations)
+        cls._post_bulk_save(locations)
+        return list(locations)
+
+    @classmethod
+    def bulk_update(cls, locations):
+        """Update existing locations with bulk update statements
+
+        Moved locations must be updated after their new parents have
+        been saved. Closure rows are updated by database triggers.
+        """
+        if not locations:
+            return
+        now = datetime.utcnow()
+        for loc in locations:
+            # auto_now fields are not set by bulk updates
+            loc.last_modified = now
+        cls._pre_bulk_save(locations)
+        bulk_update_helper(locations)
+        cls._post_bulk_save(locations)
+
+    @classmethod
+    def _pre_bulk_save(cls, locations):
+        from corehq.apps.commtrack.models import sync_supply_point
+        for loc in locations:
+            sync_supply_point(loc)
+
+    @classmethod
+    def _post_bulk_save(cls, locations):
+        from .document_store import publish_location_saved
+
+        def publish_changes():
+            for loc in locations:
+                publish_location_saved(loc.domain, loc.location_id)
+
+        # publish once all locations of an upload have been committed
+        transaction.on_commit(publish_changes)
+
     def to_json(self, include_lineage=True):
         json_dict = {
             'name': self.name,
@@ -699,6 +790,42 @@ class SQLLocation(AdjListModel):
         return self
 
 
+class LocationClosure(models.Model):
+    """Materialized transitive closure of the location hierarchy
+
+    There is one row for each (ancestor, descendant) pair of locations,
+    including a row with depth 0 relating each location to itself.
+    Rows are maintained by database triggers when locations are created
+    or moved (see sql_templates/location_closure.sql), so they are kept
+    in sync by every code path that writes locations, and are deleted by
+    cascade when locations are deleted.
+    """
+    ancestor = models.ForeignKey(SQLLocation, on_delete=models.CASCADE, related_name='closure_descendants')
+    descendant = models.ForeignKey(SQLLocation, on_delete=models.CASCADE, related_name='closure_ancestors')
+    depth = models.IntegerField()
+
+    class Meta(object):
+        app_label = 'locations'
+        unique_together = ('ancestor', 'descendant')
+        index_together = ('descendant', 'depth')
+
+
+class _name_path(Func):
+    """Array of location names from the root to the location
+
+    Used to order locations in tree order, as the recursive queries of
+    `AdjListManager` do.
+    """
+    template = """ARRAY(
+        SELECT path_loc."name" || ''
+        FROM "locations_locationclosure" path_closure
+        INNER JOIN "locations_sqllocation" path_loc ON path_loc."id" = path_closure."ancestor_id"
+        WHERE path_closure."descendant_id" = %(expressions)s
+        ORDER BY path_closure."depth" DESC
+    )::varchar[]"""
+    output_field = models.Field()
+
+
 def filter_for_archived(locations, include_archive_ancestors):
     """
     Perform filtering on a location queryset.
@@ -0,0 +1,78 @@
+/*
+Maintain locations_locationclosure, which has one row for each
+(ancestor, descendant) pair of locations, including a row with depth 0
+linking each location to itself.
+
+Rows for deleted locations are removed by foreign key cascades.
+*/
+
+CREATE OR REPLACE FUNCTION location_closure_insert() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO locations_locationclosure (ancestor_id, descendant_id, depth)
+    SELECT NEW.id, NEW.id, 0
+    UNION ALL
+    SELECT c.ancestor_id, NEW.id, c.depth + 1
+    FROM locations_locationclosure c
+    WHERE c.descendant_id = NEW.parent_id;
+
+    -- attach subtrees of children inserted before this location, which
+    -- happens when foreign key checks are deferred (dump/reload)
+    INSERT INTO locations_locationclosure (ancestor_id, descendant_id, depth)
+    SELECT sup.ancestor_id, sub.descendant_id, sup.depth + sub.depth + 1
+    FROM locations_locationclosure sup
+    CROSS JOIN locations_sqllocation child
+    INNER JOIN locations_locationclosure sub ON sub.ancestor_id = child.id
+    WHERE sup.descendant_id = NEW.id AND child.parent_id = NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE OR REPLACE FUNCTION location_closure_move() RETURNS trigger AS $$
+BEGIN
+    -- detach the subtree rooted at the moved location from its old ancestors
+    DELETE FROM locations_locationclosure c
+    USING locations_locationclosure sub
+    WHERE sub.ancestor_id = NEW.id
+        AND c.descendant_id = sub.descendant_id
+        AND c.ancestor_id IN (
+            SELECT ancestor_id
+            FROM locations_locationclosure
+            WHERE descendant_id = NEW.id AND ancestor_id <> NEW.id
+        );
+
+    -- attach it to its new ancestors
+    INSERT INTO locations_locationclosure (ancestor_id, descendant_id, depth)
+    SELECT sup.ancestor_id, sub.descendant_id, sup.depth + sub.depth + 1
+    FROM locations_locationclosure sup
+    CROSS JOIN locations_locationclosure sub
+    WHERE sup.descendant_id = NEW.parent_id AND sub.ancestor_id = NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+DROP TRIGGER IF EXISTS location_closure_insert_trigger ON locations_sqllocation;
+CREATE TRIGGER location_closure_insert_trigger AFTER INSERT ON locations_sqllocation
+    FOR EACH ROW EXECUTE PROCEDURE location_closure_insert();
+
+DROP TRIGGER IF EXISTS location_closure_move_trigger ON locations_sqllocation;
+CREATE TRIGGER location_closure_move_trigger AFTER UPDATE OF parent_id ON locations_sqllocation
+    FOR EACH ROW WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id)
+    EXECUTE PROCEDURE location_closure_move();
+
+
+-- populate closure rows for existing locations
+INSERT INTO locations_locationclosure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE closure AS (
+    SELECT loc.id AS ancestor_id, loc.id AS descendant_id, 0 AS depth
+    FROM locations_sqllocation loc
+
+    UNION ALL
+
+    SELECT closure.ancestor_id, loc.id AS descendant_id, closure.depth + 1
+    FROM locations_sqllocation loc
+    INNER JOIN closure ON loc.parent_id = closure.descendant_id
+)
+SELECT ancestor_id, descendant_id, depth FROM closure
+ON CONFLICT DO NOTHING;
@@ -0,0 +1,4 @@
+DROP TRIGGER IF EXISTS location_closure_insert_trigger ON locations_sqllocation;
+DROP TRIGGER IF EXISTS location_closure_move_trigger ON locations_sqllocation;
+DROP FUNCTION IF EXISTS location_closure_insert();
+DROP FUNCTION IF EXISTS location_closure_move();
@@ -760,6 +760,14 @@ class TestBulkManagementWithInitialLocs(UploadTestUtils, LocationHierarchyPerTes
         self.assertLocationTypesMatch(FLAT_LOCATION_TYPES)
         self.assertLocationsMatch(self.as_pairs(self.basic_update + big_location_tree))
 
+    def test_site_code_of_archived_location(self):
+        self.locations['City211'].archive()
+        result = self.bulk_update_locations(
+            FLAT_LOCATION_TYPES,
+            [NewLocRow('City211 again', 'city211', 'city', 'county11')],
+        )
+        assert_errors(result, ["Location site_code 'city211' is in use by another location"])
+
     def test_move_county21_to_state1(self):
         self.assertLocationsMatch(self.as_pairs(self.basic_update))
 
@@ -935,6 +943,18 @@ class TestBulkManagementWithInitialLocs(UploadTestUtils, LocationHierarchyPerTes
             ('City 211', 'county21')
         ]), check_attr='name')
 
+    def test_edit_updates_last_modified(self):
+        # last_modified is used to invalidate cached location fixtures
+        old = self.locations_by_code['county11']
+        result = self.bulk_update_locations(
+            FLAT_LOCATION_TYPES,
+            [self.UpdateLocRow('County 11', 'county11', 'county', 's1')],
+        )
+        assert_errors(result, [])
+        new = SQLLocation.objects.get(location_id=old.location_id)
+        self.assertEqual(new.name, 'County 11')
+        self.assertGreater(new.last_modified, old.last_modified)
+
     def test_partial_type_edit(self):
         # edit a subset of types
         self.assertLocationsMatch(self.as_pairs(self.basic_update))
@@ -1085,13 +1105,15 @@ class TestBulkManagementWithInitialLocs(UploadTestUtils, LocationHierarchyPerTes
             worksheets.append(sheet)
         mock_importer = Mock()
         mock_importer.worksheets = worksheets
-        with patch('corehq.apps.locations.models.SQLLocation.save') as save_location, \
+        with patch('corehq.apps.locations.models.SQLLocation.bulk_create') as create_locations, \
+             patch('corehq.apps.locations.models.SQLLocation.bulk_update') as update_locations, \
              patch('corehq.apps.locations.models.LocationType.save') as save_type:
             result = new_locations_import(self.domain, mock_importer, self.user)
 
         # The upload should succeed and not perform any updates
         assert_errors(result, [])
-        self.assertFalse(save_location.called)
+        self.assertFalse(create_locations.called)
+        self.assertFalse(update_locations.called)
         self.assertFalse(save_type.called)
 
 
@@ -1135,10 +1157,10 @@ class TestRestrictedUserUpload(UploadTestUtils, LocationHierarchyPerTest):
             self.UpdateLocRow('Cambridge', 'cambridge', 'city', 'middlesex'),
             self.UpdateLocRow('Somerville', 'somerville', 'city', 'middlesex'),
         ]
-        with patch('corehq.apps.locations.models.SQLLocation.save') as save_location:
+        with patch('corehq.apps.locations.models.SQLLocation.bulk_update') as update_locations:
             result = self.bulk_update_locations(FLAT_LOCATION_TYPES, upload)
         assert_errors(result, [])
-        self.assertFalse(save_location.called)
+        self.assertFalse(update_locations.called)
 
     def test_subtree_upload_with_changes(self):
         upload = [
@@ -1149,10 +1171,14 @@ class TestRestrictedUserUpload(UploadTestUtils, LocationHierarchyPerTest):
             self.UpdateLocRow('Somerville', 'somerville', 'city', 'middlesex'),
             NewLocRow('Lowell', 'lowell', 'city', 'middlesex'),
         ]
-        with patch('corehq.apps.locations.models.SQLLocation.save') as save_location:
+        with patch('corehq.apps.locations.models.SQLLocation.bulk_create') as create_locations, \
+             patch('corehq.apps.locations.models.SQLLocation.bulk_update') as update_locations:
             result = self.bulk_update_locations(FLAT_LOCATION_TYPES, upload)
         assert_errors(result, [])
-        self.assertEqual(save_location.call_count, 2)
+        [(created,), _] = create_locations.call_args
+        [(updated,), _] = update_locations.call_args
+        self.assertEqual([loc.site_code for loc in created], ['lowell'])
+        self.assertEqual([loc.site_code for loc in updated], ['middlesex'])
 
     def test_out_of_bounds_edit(self):
         upload = [
@@ -4,16 +4,14 @@ from collections import namedtuple
 from datetime import datetime, timedelta
 from xml.etree import cElementTree as ElementTree
 
+from django.core.cache import cache
 from django.test import TestCase
 
 from unittest import mock
 
 from casexml.apps.phone.models import SimplifiedSyncLog
 from casexml.apps.phone.restore import RestoreParams
-from casexml.apps.phone.tests.utils import (
-    call_fixture_generator,
-    create_restore_user,
-)
+from casexml.apps.phone.tests.utils import create_restore_user
 
 from corehq.apps.app_manager.tests.util import (
     TestXmlMixin,
@@ -51,6 +49,7 @@ from .util import (
     LocationHierarchyTestCase,
     LocationStructure,
     LocationTypeStructure,
+    call_fixture_generator,
     setup_location_types_with_structure,
     setup_locations_with_structure,
 )
@@ -330,6 +329,36 @@ class LocationFixturesTest(LocationHierarchyTestCase, FixtureHasLocationsMixin):
             ['Massachusetts', 'Suffolk', 'Middlesex']
         )
 
+    @flag_enabled('HIERARCHICAL_LOCATION_FIXTURE')
+    def test_fixture_cached_by_location_set(self):
+        cache.clear()
+        other = create_restore_user(self.domain, 'other', '123')
+        self.addCleanup(other._couch_user.delete, self.domain, deleted_by=None)
+        self.user._couch_user.set_location(self.locations['Suffolk'])
+        other._couch_user.set_location(self.locations['Suffolk'])
+        serializer = location_fixture_generator.serializer
+
+        def get_fixture(user):
+            [fixture] = call_fixture_generator(location_fixture_generator, user._couch_user.to_ota_restore_user())
+            return fixture
+
+        with mock.patch.object(serializer, 'get_xml_nodes', wraps=serializer.get_xml_nodes) as get_xml_nodes:
+            self.assertEqual(get_fixture(self.user).attrib['user_id'], self.user.user_id)
+            self.assertEqual(get_fixture(other).attrib['user_id'], other.user_id)
+            self.assertEqual(get_xml_nodes.call_count, 1)
+
+            boston = self.locations['Boston']
+            boston.name = 'Beantown'
+            boston.save()
+
+            def _reset_name():
+                boston.name = 'Boston'
+                boston.save()
+            self.addCleanup(_reset_name)
+
+            self.assertIn('Beantown', [n.text for n in get_fixture(other).iter('name')])
+            self.assertEqual(get_xml_nodes.call_count, 2)
+
 
 @mock.patch.object(Domain, 'uses_locations', lambda: True)  # removes dependency on accounting
 class ForkedHierarchiesTest(TestCase, FixtureHasLocationsMixin):
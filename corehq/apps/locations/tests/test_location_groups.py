@@ -2,8 +2,6 @@ from django.test import TestCase
 
 from unittest.mock import patch
 
-from casexml.apps.phone.tests.utils import call_fixture_generator
-
 from corehq.apps.commtrack.tests.util import bootstrap_location_types
 from corehq.apps.domain.shortcuts import create_domain
 from corehq.apps.groups.exceptions import CantSaveException
@@ -11,7 +9,7 @@ from corehq.apps.users.models import CommCareUser
 from corehq.util.test_utils import flag_enabled
 
 from ..fixtures import location_fixture_generator
-from .util import make_loc
+from .util import call_fixture_generator, make_loc
 
 
 class LocationGroupBase(TestCase):
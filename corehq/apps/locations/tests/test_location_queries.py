@@ -1,4 +1,5 @@
 import pickle
+import uuid
 
 from corehq.apps.users.dbaccessors import delete_all_users
 from corehq.apps.users.models import WebUser
@@ -34,6 +35,64 @@ class TestLocationQuerysetMethods(BaseTestLocationQuerysetMethods):
             ['Suffolk', 'Massachusetts']
         )
 
+    def test_ancestors_order(self):
+        boston = SQLLocation.objects.get(name="Boston")
+        self.assertEqual(
+            [loc.name for loc in boston.get_ancestors(include_self=True)],
+            ['Massachusetts', 'Suffolk', 'Boston']
+        )
+        self.assertEqual(
+            [loc.name for loc in boston.get_ancestors(ascending=True)],
+            ['Suffolk', 'Massachusetts']
+        )
+
+    def test_moved_location(self):
+        middlesex = SQLLocation.objects.get(name="Middlesex")
+        california = SQLLocation.objects.get(name="California")
+        middlesex.parent = california
+        middlesex.save()
+
+        self.assertEqual(
+            [loc.name for loc in california.get_descendants()],
+            ['Los Angeles', 'Middlesex', 'Cambridge', 'Somerville']
+        )
+        self.assertEqual(
+            [loc.name for loc in SQLLocation.objects.get(name="Massachusetts").get_descendants()],
+            ['Suffolk', 'Boston']
+        )
+        self.assertEqual(
+            [loc.name for loc in SQLLocation.objects.get(name="Cambridge").get_ancestors()],
+            ['California', 'Middlesex']
+        )
+
+    def test_child_inserted_before_parent(self):
+        # loading a dump inserts rows in any order with foreign key checks deferred
+        suffolk = self.locations['Suffolk']
+        county_id = SQLLocation.objects.order_by('-id').values_list('id', flat=True)[0] + 10
+        SQLLocation.objects.bulk_create([SQLLocation(
+            domain=self.domain,
+            name='Quincy',
+            site_code='quincy',
+            location_id=uuid.uuid4().hex,
+            location_type=self.location_types['city'],
+            parent_id=county_id,
+        )])
+        SQLLocation.objects.bulk_create([SQLLocation(
+            id=county_id,
+            domain=self.domain,
+            name='Norfolk',
+            site_code='norfolk',
+            location_id=uuid.uuid4().hex,
+            location_type=self.location_types['county'],
+            parent_id=suffolk.parent_id,
+        )])
+
+        self.assertEqual(
+            [loc.name for loc in SQLLocation.objects.get(name="Quincy").get_ancestors()],
+            ['Massachusetts', 'Norfolk']
+        )
+        self.assertIn('Quincy', [loc.name for loc in suffolk.parent.get_descendants()])
+
     def test_ancestor_of_type(self):
         boston = SQLLocation.objects.get(name="Boston")
         self.assertEqual(
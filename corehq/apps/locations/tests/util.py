@@ -1,7 +1,11 @@
 from collections import namedtuple
+from xml.etree import cElementTree as ElementTree
 
 from django.test import TestCase
 
+from casexml.apps.phone.tests.utils import \
+    call_fixture_generator as call_fixture_generator_raw
+
 from corehq.apps.commtrack.tests.util import bootstrap_domain
 from corehq.apps.users.models import Permissions, UserRole
 from corehq.util.test_utils import unit_testing_only
@@ -23,6 +27,12 @@ def make_loc(code, name=None, domain=TEST_DOMAIN, type=TEST_LOCATION_TYPE,
     return loc
 
 
+def call_fixture_generator(*args, **kw):
+    # location fixtures are rendered to bytes so they can be cached
+    return [ElementTree.fromstring(f) if isinstance(f, bytes) else f
+            for f in call_fixture_generator_raw(*args, **kw)]
+
+
 @unit_testing_only
 def delete_all_locations():
     SQLLocation.objects.all().delete()
@@ -289,67 +289,142 @@ def send_message_via_backend(msg, backend=None, orig_phone_number=None):
     orig_phone_number - the originating phone number to use when sending; this
       is sent in if the backend supports load balancing
     """
-    sms_load_counter("outbound", msg.domain)()
+    _prepare_outbound_message(msg)
     try:
-        msg.text = clean_text(msg.text)
-    except Exception:
-        logging.exception("Could not clean text for sms dated '%s' in domain '%s'" % (msg.date, msg.domain))
-    try:
-        # We need to send SMS when msg.domain is None to support sending to
-        # people who opt in without being tied to a domain
-        if msg.domain and not domain_has_privilege(msg.domain, privileges.OUTBOUND_SMS):
-            raise Exception(
-                ("Domain '%s' does not have permission to send SMS."
-                 "  Please investigate why this function was called.") % msg.domain
-            )
+        _check_domain_can_send_sms(msg.domain)
 
         phone_obj = PhoneBlacklist.get_by_phone_number_or_none(msg.phone_number)
-        if phone_obj and not phone_obj.send_sms:
-            if msg.ignore_opt_out and phone_obj.can_opt_in:
-                # If ignore_opt_out is True on the message, then we'll still
-                # send it. However, if we're not letting the phone number
-                # opt back in and it's in an opted-out state, we will not
-                # send anything to it no matter the state of the ignore_opt_out
-                # flag.
-                pass
-            else:
-                msg.set_system_error(SMS.ERROR_PHONE_NUMBER_OPTED_OUT)
-                return False
+        if not _phone_can_receive_sms(msg, phone_obj):
+            msg.set_system_error(SMS.ERROR_PHONE_NUMBER_OPTED_OUT)
+            return False
 
         if not backend:
             backend = msg.outbound_backend
 
-        if backend.domain_is_authorized(msg.domain):
-            backend.send(msg, orig_phone_number=orig_phone_number)
-            metrics_counter("commcare.sms.outbound_message", tags={
-                'domain': msg.domain,
-                'status': 'ok',
-                'backend': _get_backend_tag(backend),
-            })
-        else:
-            raise BackendAuthorizationException(
-                "Domain '%s' is not authorized to use backend '%s'" % (msg.domain, backend.pk)
-            )
+        _check_backend_is_authorized(backend, msg.domain)
+        backend.send(msg, orig_phone_number=orig_phone_number)
+        _count_outbound_message(msg, backend, 'ok')
 
         msg.backend_api = backend.hq_api_id
         msg.backend_id = backend.couch_id
         msg.save()
         return True
     except Exception as e:
-        metrics_counter("commcare.sms.outbound_message", tags={
-            'domain': msg.domain,
-            'status': 'error',
-            'backend': _get_backend_tag(backend),
-        })
-        should_log_exception = True
+        _handle_send_exception(msg, backend, e)
+        return False
 
-        if backend:
-            should_log_exception = should_log_exception_for_backend(backend, e)
 
-        if should_log_exception:
-            log_sms_exception(msg)
+def send_messages_via_backend(messages, backend, orig_phone_numbers=None):
+    """send many sms using one backend
 
-        return False
+    The same as send_message_via_backend, except that the messages are sent
+    together with backend.send_many(), and they are not saved after sending;
+    the caller is expected to save them in bulk.
+
+    messages - outbound message objects
+    backend - backend to use for sending
+    orig_phone_numbers - the originating phone number to use for each message,
+      in the same order as messages, if the backend supports load balancing
+
+    Returns a list with True for each message that was sent.
+    """
+    if orig_phone_numbers is None:
+        orig_phone_numbers = [None] * len(messages)
+
+    opted_out = {
+        phone_obj.phone_number: phone_obj
+        for phone_obj in PhoneBlacklist.objects.filter(
+            phone_number__in={strip_plus(msg.phone_number) for msg in messages},
+            send_sms=False,
+        )
+    }
+    results = [False] * len(messages)
+    to_send = []
+    for index, msg in enumerate(messages):
+        _prepare_outbound_message(msg)
+        try:
+            _check_domain_can_send_sms(msg.domain)
+            if not _phone_can_receive_sms(msg, opted_out.get(strip_plus(msg.phone_number))):
+                msg.set_system_error(SMS.ERROR_PHONE_NUMBER_OPTED_OUT)
+                continue
+            _check_backend_is_authorized(backend, msg.domain)
+        except Exception as e:
+            _handle_send_exception(msg, backend, e)
+            continue
+        to_send.append(index)
+
+    if not to_send:
+        return results
+
+    errors = backend.send_many(
+        [messages[index] for index in to_send],
+        [orig_phone_numbers[index] for index in to_send],
+    )
+    for index, error in zip(to_send, errors):
+        msg = messages[index]
+        if error is not None:
+            _handle_send_exception(msg, backend, error)
+            continue
+        _count_outbound_message(msg, backend, 'ok')
+        msg.backend_api = backend.hq_api_id
+        msg.backend_id = backend.couch_id
+        results[index] = True
+    return results
+
+
+def _prepare_outbound_message(msg):
+    sms_load_counter("outbound", msg.domain)()
+    try:
+        msg.text = clean_text(msg.text)
+    except Exception:
+        logging.exception("Could not clean text for sms dated '%s' in domain '%s'" % (msg.date, msg.domain))
+
+
+def _check_domain_can_send_sms(domain):
+    # We need to send SMS when msg.domain is None to support sending to
+    # people who opt in without being tied to a domain
+    if domain and not domain_has_privilege(domain, privileges.OUTBOUND_SMS):
+        raise Exception(
+            ("Domain '%s' does not have permission to send SMS."
+             "  Please investigate why this function was called.") % domain
+        )
+
+
+def _phone_can_receive_sms(msg, phone_obj):
+    if phone_obj and not phone_obj.send_sms:
+        # If ignore_opt_out is True on the message, then we'll still
+        # send it. However, if we're not letting the phone number
+        # opt back in and it's in an opted-out state, we will not
+        # send anything to it no matter the state of the ignore_opt_out
+        # flag.
+        return msg.ignore_opt_out and phone_obj.can_opt_in
+    return True
+
+
+def _check_backend_is_authorized(backend, domain):
+    if not backend.domain_is_authorized(domain):
+        raise BackendAuthorizationException(
+            "Domain '%s' is not authorized to use backend '%s'" % (domain, backend.pk)
+        )
+
+
+def _count_outbound_message(msg, backend, status):
+    metrics_counter("commcare.sms.outbound_message", tags={
+        'domain': msg.domain,
+        'status': status,
+        'backend': _get_backend_tag(backend),
+    })
+
+
+def _handle_send_exception(msg, backend, exception):
+    _count_outbound_message(msg, backend, 'error')
+    should_log_exception = True
+
+    if backend:
+        should_log_exception = should_log_exception_for_backend(backend, exception)
+
+    if should_log_exception:
+        log_sms_exception(msg)
 
 
 @quickcache(['backend_id'], skip_arg='backend')
@@ -1,15 +1,30 @@
-from time import sleep
+from collections import defaultdict
+from datetime import datetime
+from time import sleep, time
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
 
+from redis.exceptions import LockError
+
+from dimagi.utils.chunked import chunked
 from dimagi.utils.couch import get_redis_lock
 from dimagi.utils.logging import notify_exception
 
 from corehq.apps.domain_migration_flags.api import any_migrations_in_progress
 from corehq.apps.sms.models import QueuedSMS
-from corehq.apps.sms.tasks import send_to_sms_queue
+from corehq.apps.sms.queue import DUE_SOON, pop_due_sms, push_due_sms, push_queued_sms
+from corehq.apps.sms.tasks import process_sms, process_sms_batch
 from corehq.sql_db.util import handle_connection_failure
 
+# seconds
+DISPATCH_INTERVAL = 0.5
+LEADER_RETRY_INTERVAL = 5
+LEADER_LOCK_TIMEOUT = 60
+SWEEP_INTERVAL = 60
+
+DISPATCH_BATCH_SIZE = 1000
+
 
 def skip_domain(domain):
     return any_migrations_in_progress(domain)
@@ -19,16 +34,24 @@ class SMSEnqueuingOperation(BaseCommand):
     """
     Based on our commcare-cloud code, there will be one instance of this
     command running on every machine that has a celery worker which
-    consumes from the sms_queue. This is ok because this process uses
-    locks to ensure items are only enqueued once, and it's what is desired
-    in order to more efficiently spawn the needed celery tasks.
+    consumes from the sms_queue. One of them is elected leader with a
+    redis lock, and the others wait to take over if it goes away.
+
+    The leader spawns tasks for messages as they come due from the
+    sorted set in `corehq.apps.sms.queue`, and periodically sweeps the
+    QueuedSMS table to add messages coming due to the set. Messages are
+    also enqueued directly when they are queued, and locks ensure each
+    message is only enqueued once per processing time.
+
+    When settings.SMS_QUEUE_BATCH_SIZE is more than 1, due messages are
+    grouped by domain and processed in batches by `process_sms_batch`.
     """
     help = "Spawns tasks to process queued SMS"
 
-    def get_enqueue_lock(self, queued_sms):
+    def get_enqueue_lock(self, queued_sms_id, datetime_to_process):
         key = "create-task-for-sms-%s-%s" % (
-            queued_sms.pk,
-            queued_sms.datetime_to_process.strftime('%Y-%m-%d %H:%M:%S')
+            queued_sms_id,
+            datetime_to_process.strftime('%Y-%m-%d %H:%M:%S')
         )
         return get_redis_lock(
             key,
@@ -37,26 +60,85 @@ class SMSEnqueuingOperation(BaseCommand):
             track_unreleased=False,
         )
 
+    @handle_connection_failure()
+    def sweep(self):
+        utcnow = datetime.utcnow()
+        queued_sms = QueuedSMS.objects.filter(
+            datetime_to_process__lte=utcnow + DUE_SOON,
+        ).values_list('pk', 'domain', 'datetime_to_process')
+        push_due_sms(queued_sms.iterator(), utcnow)
+
     @handle_connection_failure()
     def create_tasks(self):
-        for queued_sms in QueuedSMS.get_queued_sms():
-            if queued_sms.domain and skip_domain(queued_sms.domain):
+        batches = defaultdict(list)
+        for queued_sms_id, domain, datetime_to_process in pop_due_sms(datetime.utcnow(), DISPATCH_BATCH_SIZE):
+            if domain and skip_domain(domain):
+                # the next sweep will add it back
                 continue
 
-            self.enqueue(queued_sms)
+            if self.use_batches:
+                batches[domain].append((queued_sms_id, datetime_to_process))
+            else:
+                self.create_task(queued_sms_id, datetime_to_process)
+
+        for items in batches.values():
+            for batch in chunked(items, settings.SMS_QUEUE_BATCH_SIZE):
+                self.create_batch_task(batch)
+
+    @property
+    def use_batches(self):
+        return settings.SMS_QUEUE_BATCH_SIZE > 1
 
     def enqueue(self, queued_sms):
-        enqueue_lock = self.get_enqueue_lock(queued_sms)
+        # When processing in batches, due messages wait for the next
+        # dispatch so that they can be batched with other messages.
+        if queued_sms.datetime_to_process <= datetime.utcnow() and not self.use_batches:
+            self.create_task(queued_sms.pk, queued_sms.datetime_to_process)
+        else:
+            push_queued_sms(queued_sms)
+
+    def create_task(self, queued_sms_id, datetime_to_process):
+        enqueue_lock = self.get_enqueue_lock(queued_sms_id, datetime_to_process)
         if enqueue_lock.acquire(blocking=False):
-            send_to_sms_queue(queued_sms)
+            process_sms.apply_async([queued_sms_id])
+
+    def create_batch_task(self, items):
+        queued_sms_ids = [
+            queued_sms_id for queued_sms_id, datetime_to_process in items
+            if self.get_enqueue_lock(queued_sms_id, datetime_to_process).acquire(blocking=False)
+        ]
+        if queued_sms_ids:
+            process_sms_batch.apply_async([queued_sms_ids])
 
     def handle(self, **options):
+        leader_lock = get_redis_lock(
+            "sms-queue-leader",
+            timeout=LEADER_LOCK_TIMEOUT,
+            name="sms_queue_leader",
+            track_unreleased=False,
+        )
+        is_leader = False
+        next_sweep = 0
         while True:
             try:
-                self.create_tasks()
+                is_leader = self.keep_leadership(leader_lock, is_leader)
+                if is_leader:
+                    if time() >= next_sweep:
+                        next_sweep = time() + SWEEP_INTERVAL
+                        self.sweep()
+                    self.create_tasks()
             except:
                 notify_exception(None, message="Could not fetch due survey actions")
-            sleep(10)
+            sleep(DISPATCH_INTERVAL if is_leader else LEADER_RETRY_INTERVAL)
+
+    def keep_leadership(self, leader_lock, is_leader):
+        if is_leader:
+            try:
+                return leader_lock.reacquire()
+            except LockError:
+                # the lock expired, and another process may have taken over
+                return False
+        return leader_lock.acquire(blocking=False)
 
 
 class Command(SMSEnqueuingOperation):
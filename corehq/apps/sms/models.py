@@ -20,6 +20,7 @@ from corehq.apps.sms.mixin import (
     PhoneNumberInUseException,
     apply_leniency,
 )
+from corehq.apps.sms.queue import push_queued_sms
 from corehq.apps.users.models import CouchUser
 from corehq.form_processor.models import CommCareCase
 from corehq.util.mixin import UUIDGeneratorMixin
@@ -334,6 +335,7 @@ class SMS(SMSBase):
             queued_sms.processed_timestamp = None
             self.delete()
             queued_sms.save()
+        push_queued_sms(queued_sms)
 
     @staticmethod
     def get_counts_by_date(domain, start_date, end_date, time_zone):
@@ -2148,6 +2150,30 @@ class SQLSMSBackend(SQLMobileBackend):
     def send(self, msg, *args, **kwargs):
         raise NotImplementedError("Please implement this method.")
 
+    def send_many(self, messages, orig_phone_numbers=None, **kwargs):
+        """
+        Sends each of messages, which should all be due to be sent by this
+        backend. Override to use the gateway's batch API or to share a
+        connection between messages; by default send() is called for each.
+
+        orig_phone_numbers - the originating phone number for each message,
+            in the same order as messages, for PhoneLoadBalancingMixin backends
+
+        Returns a list with the exception raised sending each message, or
+        None for each message that was sent.
+        """
+        if orig_phone_numbers is None:
+            orig_phone_numbers = [None] * len(messages)
+        errors = []
+        for msg, orig_phone_number in zip(messages, orig_phone_numbers):
+            try:
+                self.send(msg, orig_phone_number=orig_phone_number, **kwargs)
+            except Exception as e:
+                errors.append(e)
+            else:
+                errors.append(None)
+        return errors
+
     # Override in case backend is fetching gateway fees through provider API
     using_api_to_get_fees = False
 
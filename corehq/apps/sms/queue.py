@@ -0,0 +1,80 @@
+"""Redis sorted set of queued SMS that are coming due
+
+The run_sms_queue command (`SMSEnqueuingOperation`) dispatches messages
+from this set as they come due. Messages are added to the set when they
+are queued or delayed if they are due within `DUE_SOON`. Other messages
+are added by a periodic sweep of the QueuedSMS table, which also picks
+up any message that was not added when it was saved.
+
+Members are `[pk, domain]` JSON lists scored by `datetime_to_process`.
+"""
+import json
+from datetime import datetime, timedelta
+
+from dimagi.utils.chunked import chunked
+from dimagi.utils.couch import get_redis_client
+
+DUE_SMS_KEY = "sms-queue-due"
+DUE_SOON = timedelta(minutes=15)
+PUSH_BATCH_SIZE = 1000
+EPOCH = datetime(1970, 1, 1)
+
+
+def push_queued_sms(queued_sms):
+    """Add a queued SMS to the set if it is due soon"""
+    push_due_sms([(queued_sms.pk, queued_sms.domain, queued_sms.datetime_to_process)])
+
+
+def push_due_sms(items, utcnow=None):
+    """Add messages that are due soon to the set
+
+    Messages that are already in the set are moved to their new time.
+
+    :param items: Iterable of `(pk, domain, datetime_to_process)` tuples.
+    """
+    cutoff = (utcnow or datetime.utcnow()) + DUE_SOON
+    due_soon = (
+        (pk, domain, datetime_to_process)
+        for pk, domain, datetime_to_process in items
+        if datetime_to_process is not None and datetime_to_process <= cutoff
+    )
+    client = _get_client()
+    for batch in chunked(due_soon, PUSH_BATCH_SIZE):
+        client.zadd(DUE_SMS_KEY, {
+            _to_member(pk, domain): _to_score(datetime_to_process)
+            for pk, domain, datetime_to_process in batch
+        })
+
+
+def pop_due_sms(utcnow, limit):
+    """Remove and return messages that are due
+
+    :returns: List of `(pk, domain, datetime_to_process)` tuples in
+    order of `datetime_to_process`.
+    """
+    client = _get_client()
+    members = client.zrangebyscore(
+        DUE_SMS_KEY, '-inf', _to_score(utcnow), start=0, num=limit, withscores=True)
+    if members:
+        client.zrem(DUE_SMS_KEY, *[member for member, score in members])
+    return [
+        tuple(json.loads(member)) + (_from_score(score),)
+        for member, score in members
+    ]
+
+
+def _get_client():
+    # raw redis client, the django_redis cache doesn't do sorted sets
+    return get_redis_client().client.get_client()
+
+
+def _to_member(pk, domain):
+    return json.dumps([pk, domain])
+
+
+def _to_score(timestamp):
+    return (timestamp - EPOCH).total_seconds()
+
+
+def _from_score(score):
+    return EPOCH + timedelta(seconds=score)
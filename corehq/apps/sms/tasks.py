@@ -1,5 +1,6 @@
 import hashlib
 import math
+from collections import defaultdict
 from datetime import datetime, timedelta
 
 from django.conf import settings
@@ -30,6 +31,7 @@ from corehq.apps.sms.api import (
     log_sms_exception,
     process_incoming,
     send_message_via_backend,
+    send_messages_via_backend,
 )
 from corehq.apps.sms.change_publishers import publish_sms_saved
 from corehq.apps.sms.mixin import (
@@ -46,7 +48,8 @@ from corehq.apps.sms.models import (
     PhoneNumber,
     QueuedSMS,
 )
-from corehq.apps.sms.util import is_contact_active
+from corehq.apps.sms.queue import push_queued_sms
+from corehq.apps.sms.util import get_inactive_case_ids, is_contact_active
 from corehq.apps.smsbillables.exceptions import (
     RetryBillableTaskException,
 )
@@ -66,6 +69,20 @@ def remove_from_queue(queued_sms):
         queued_sms.delete()
         sms.save()
 
+    _after_removing_from_queue(sms)
+
+
+def remove_many_from_queue(queued_sms_list):
+    with transaction.atomic():
+        sms_list = [get_sms_from_queued_sms(queued_sms) for queued_sms in queued_sms_list]
+        QueuedSMS.objects.filter(pk__in=[queued_sms.pk for queued_sms in queued_sms_list]).delete()
+        SMS.objects.bulk_create(sms_list)
+
+    for sms in sms_list:
+        _after_removing_from_queue(sms)
+
+
+def _after_removing_from_queue(sms):
     sms.publish_change()
 
     tags = {'backend': sms.backend_api}
@@ -108,19 +125,23 @@ def handle_unsuccessful_processing_attempt(msg):
 
 
 def handle_successful_processing_attempt(msg):
-    utcnow = get_utcnow()
+    set_processed(msg, get_utcnow())
+    msg.save()
+    remove_from_queue(msg)
+
+
+def set_processed(msg, utcnow):
     msg.num_processing_attempts += 1
     msg.processed = True
     msg.processed_timestamp = utcnow
     if msg.direction == OUTGOING:
         msg.date = utcnow
-    msg.save()
-    remove_from_queue(msg)
 
 
 def delay_processing(msg, minutes):
     msg.datetime_to_process += timedelta(minutes=minutes)
     msg.save()
+    push_queued_sms(msg)
 
 
 def get_lock(key):
@@ -184,6 +205,19 @@ def message_is_stale(msg, utcnow):
         return True
 
 
+def is_due_for_processing(msg, utcnow):
+    # We check datetime_to_process against utcnow plus a small amount
+    # of time because timestamps can differ between machines which
+    # can cause us to miss sending the message the first time and
+    # result in an unnecessary delay.
+    return (
+        isinstance(msg.processed, bool) and
+        not msg.processed and
+        not msg.error and
+        msg.datetime_to_process < (utcnow + timedelta(seconds=10))
+    )
+
+
 def get_connection_slot_from_phone_number(phone_number, max_simultaneous_connections):
     """
     Converts phone_number to a number between 0 and max_simultaneous_connections - 1.
@@ -306,18 +340,18 @@ class OutboundDailyCounter(object):
         # doesn't exist.
         self.client = get_redis_client().client.get_client()
 
-    def increment(self):
+    def increment(self, amount=1):
         # If the key doesn't exist, redis will set it to 0 and then increment.
-        value = self.client.incr(self.key)
+        value = self.client.incr(self.key, amount)
 
         # If it's the first time we're calling incr, set the key's expiration
-        if value == 1:
+        if value == amount:
             self.client.expire(self.key, 24 * 60 * 60)
 
         return value
 
-    def decrement(self):
-        return self.client.decr(self.key)
+    def decrement(self, amount=1):
+        return self.client.decr(self.key, amount)
 
     @property
     def current_usage(self):
@@ -359,6 +393,28 @@ class OutboundDailyCounter(object):
 
         return True
 
+    def filter_outbound_sms(self, queued_sms_list):
+        """
+        Bulk version of can_send_outbound_sms. Returns the messages that
+        can be sent without exceeding the outbound daily limit, and delays
+        the rest.
+        """
+        if not queued_sms_list:
+            return []
+
+        value = self.increment(len(queued_sms_list))
+        num_over_limit = min(max(value - self.daily_limit, 0), len(queued_sms_list))
+        if not num_over_limit:
+            return queued_sms_list
+
+        self.decrement(num_over_limit)
+        num_allowed = len(queued_sms_list) - num_over_limit
+        for queued_sms in queued_sms_list[num_allowed:]:
+            delay_processing(queued_sms, 60)
+        domain = self.domain_object.name if self.domain_object else ''
+        DailyOutboundSMSLimitReached.create_for_domain_and_date(domain, self.date)
+        return queued_sms_list[:num_allowed]
+
 
 @no_result_task(queue="sms_queue", acks_late=True)
 def process_sms(queued_sms_pk):
@@ -401,16 +457,7 @@ def process_sms(queued_sms_pk):
         # Process inbound SMS from a single contact one at a time
         recipient_block = msg.direction == INCOMING
 
-        # We check datetime_to_process against utcnow plus a small amount
-        # of time because timestamps can differ between machines which
-        # can cause us to miss sending the message the first time and
-        # result in an unnecessary delay.
-        if (
-            isinstance(msg.processed, bool) and
-            not msg.processed and
-            not msg.error and
-            msg.datetime_to_process < (utcnow + timedelta(seconds=10))
-        ):
+        if is_due_for_processing(msg, utcnow):
             if recipient_block:
                 recipient_lock = get_lock(
                     "sms-queue-recipient-phone-%s" % msg.phone_number)
@@ -453,6 +500,150 @@ def send_to_sms_queue(queued_sms):
     process_sms.apply_async([queued_sms.pk])
 
 
+@no_result_task(queue="sms_queue", acks_late=True)
+def process_sms_batch(queued_sms_pks):
+    """
+    queued_sms_pks - pks of due QueuedSMS entries from one domain
+
+    Outgoing messages are checked against the domain's restrictions and
+    limits, trial status and contact status in bulk, and sent with the
+    send_many() method of their backends. Messages that have to be
+    processed one at a time, like incoming messages and messages to
+    backends that limit their rate or connections, are passed on to
+    process_sms.
+    """
+    utcnow = get_utcnow()
+    message_locks = []
+    locked_pks = []
+    for queued_sms_pk in queued_sms_pks:
+        # Same lock as process_sms, in case a message got enqueued twice
+        message_lock = get_lock("sms-queue-processing-%s" % queued_sms_pk)
+        if message_lock.acquire(blocking=False):
+            message_locks.append(message_lock)
+            locked_pks.append(queued_sms_pk)
+
+    try:
+        queued_sms_list = list(QueuedSMS.objects.filter(pk__in=locked_pks))
+        process_individually = handle_outgoing_batch(queued_sms_list, utcnow)
+    finally:
+        for message_lock in message_locks:
+            release_lock(message_lock, True)
+
+    for msg in process_individually:
+        send_to_sms_queue(msg)
+
+
+def handle_outgoing_batch(queued_sms_list, utcnow):
+    """
+    Processes outgoing messages in bulk. Returns the messages that need to
+    be processed one at a time.
+    """
+    process_individually = []
+    by_domain = defaultdict(list)
+    for msg in queued_sms_list:
+        if msg.direction != OUTGOING:
+            process_individually.append(msg)
+        elif message_is_stale(msg, utcnow):
+            msg.set_system_error(SMS.ERROR_MESSAGE_IS_STALE)
+            remove_from_queue(msg)
+        elif is_due_for_processing(msg, utcnow):
+            by_domain[msg.domain].append(msg)
+
+    for domain, messages in by_domain.items():
+        domain_object = Domain.get_by_name(domain) if domain else None
+        if domain_object:
+            messages = [
+                msg for msg in messages
+                if not handle_domain_specific_delays(msg, domain_object, utcnow)
+            ]
+
+        backends = {}
+        batch = []
+        for msg in messages:
+            try:
+                backend = msg.outbound_backend
+            except Exception:
+                # let process_sms deal with the misconfiguration
+                process_individually.append(msg)
+                continue
+            if backend.get_sms_rate_limit() is not None or backend.get_max_simultaneous_connections():
+                process_individually.append(msg)
+            else:
+                backends[msg.pk] = backend
+                batch.append(msg)
+
+        batch = OutboundDailyCounter(domain_object).filter_outbound_sms(batch)
+        batch = _remove_inactive_contacts(domain, batch)
+        if domain and domain_is_on_trial(domain):
+            over_trial_limit = [msg for msg in batch if not passes_trial_check(msg)]
+            if over_trial_limit:
+                remove_many_from_queue(over_trial_limit)
+                batch = [msg for msg in batch if not msg.error]
+
+        by_backend = defaultdict(list)
+        for msg in batch:
+            by_backend[backends[msg.pk]].append(msg)
+        for backend, backend_messages in by_backend.items():
+            _send_outgoing_batch(backend, backend_messages)
+
+    return process_individually
+
+
+def _remove_inactive_contacts(domain, queued_sms_list):
+    """
+    Removes messages to inactive contacts from the queue with an error, and
+    returns the other messages.
+    """
+    if not domain:
+        return queued_sms_list
+
+    inactive_case_ids = get_inactive_case_ids(domain, {
+        msg.couch_recipient for msg in queued_sms_list
+        if msg.couch_recipient_doc_type == 'CommCareCase' and msg.couch_recipient
+    })
+    active = []
+    inactive = []
+    for msg in queued_sms_list:
+        if not (msg.couch_recipient_doc_type and msg.couch_recipient):
+            is_active = True
+        elif msg.couch_recipient_doc_type == 'CommCareCase':
+            is_active = msg.couch_recipient not in inactive_case_ids
+        else:
+            is_active = is_contact_active(domain, msg.couch_recipient_doc_type, msg.couch_recipient)
+
+        if is_active:
+            active.append(msg)
+        else:
+            msg.error = True
+            msg.system_error_message = SMS.ERROR_CONTACT_IS_INACTIVE
+            inactive.append(msg)
+
+    if inactive:
+        remove_many_from_queue(inactive)
+    return active
+
+
+def _send_outgoing_batch(backend, queued_sms_list):
+    orig_phone_numbers = None
+    if isinstance(backend, PhoneLoadBalancingMixin):
+        orig_phone_numbers = [backend.get_next_phone_number(msg.phone_number) for msg in queued_sms_list]
+
+    results = send_messages_via_backend(queued_sms_list, backend, orig_phone_numbers)
+    utcnow = get_utcnow()
+    processed = []
+    for msg, sent in zip(queued_sms_list, results):
+        if msg.error:
+            processed.append(msg)
+        elif sent:
+            set_processed(msg, utcnow)
+            processed.append(msg)
+        else:
+            handle_unsuccessful_processing_attempt(msg)
+
+    if processed:
+        remove_many_from_queue(processed)
+
+
 @no_result_task(queue='background_queue', default_retry_delay=60 * 60,
                 max_retries=23, bind=True)
 def store_billable(self, msg_couch_id):
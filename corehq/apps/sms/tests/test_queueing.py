@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 
 from django.conf import settings
+from django.test import SimpleTestCase
 from django.test.utils import override_settings
 
 from unittest.mock import Mock, patch
@@ -12,10 +13,11 @@ from dimagi.utils.couch.cache.cache_core import get_redis_client
 from corehq.apps.domain.models import Domain
 from corehq.apps.sms.api import incoming, send_sms
 from corehq.apps.sms.models import SMS, QueuedSMS
+from corehq.apps.sms.queue import DUE_SMS_KEY, pop_due_sms, push_due_sms
 from corehq.apps.sms.tasks import (
     MAX_TRIAL_SMS,
     passes_trial_check,
-    process_sms, get_sms_from_queued_sms, _get_sms_fields_to_copy,
+    process_sms, process_sms_batch, get_sms_from_queued_sms, _get_sms_fields_to_copy,
 )
 from corehq.apps.sms.tests.util import (
     BaseSMSTest,
@@ -299,6 +301,30 @@ class QueueingTestCase(BaseSMSTest):
         domain_is_on_trial_patch.return_value = False
         self.assertTrue(passes_trial_check(sms))
 
+    @patch('corehq.apps.sms.tasks.send_to_sms_queue')
+    def test_outgoing_batch(self, send_to_sms_queue_mock, process_sms_delay_mock, enqueue_directly_mock):
+        send_sms(self.domain, None, '+999123', 'test outgoing 1')
+        send_sms(self.domain, None, '+999123', 'test outgoing 2')
+        incoming('999123', 'inbound test', self.backend.get_api_id())
+        self.assertEqual(self.queued_sms_count, 3)
+        queued_sms = {msg.text: msg for msg in QueuedSMS.objects.all()}
+
+        with patch_successful_send() as send_mock:
+            process_sms_batch([msg.pk for msg in queued_sms.values()])
+
+        self.assertEqual(send_mock.call_count, 2)
+        # incoming messages are passed on to be processed one at a time
+        send_to_sms_queue_mock.assert_called_once_with(queued_sms['inbound test'])
+        self.assertEqual(list(QueuedSMS.objects.values_list('text', flat=True)), ['inbound test'])
+
+        reporting_sms = SMS.objects.filter(domain=self.domain, direction='O').order_by('text')
+        self.assertEqual([sms.text for sms in reporting_sms], ['test outgoing 1', 'test outgoing 2'])
+        for sms in reporting_sms:
+            self.assertEqual(sms.processed, True)
+            self.assertEqual(sms.error, False)
+            self.assertEqual(sms.backend_id, self.backend.couch_id)
+            self.assertBillableExists(sms.couch_id)
+
     def test_incoming(self, process_sms_delay_mock, enqueue_directly_mock):
         incoming('999123', 'inbound test', self.backend.get_api_id())
 
@@ -336,6 +362,40 @@ class QueueingTestCase(BaseSMSTest):
         self.assertBillableExists(couch_id)
 
 
+class DueSMSQueueTest(SimpleTestCase):
+
+    def setUp(self):
+        self.client = get_redis_client().client.get_client()
+        self.client.delete(DUE_SMS_KEY)
+        self.addCleanup(self.client.delete, DUE_SMS_KEY)
+
+    def test_pop_due_sms(self):
+        now = datetime(2016, 1, 1, 12, 0)
+        push_due_sms([
+            (1, 'domain-1', now + timedelta(seconds=1)),
+            (2, 'domain-2', now - timedelta(seconds=1)),
+            (3, None, now),
+            (4, 'domain-1', now + timedelta(days=1)),  # not due soon
+        ], utcnow=now)
+
+        self.assertEqual(pop_due_sms(now, limit=10), [
+            (2, 'domain-2', now - timedelta(seconds=1)),
+            (3, None, now),
+        ])
+        self.assertEqual(pop_due_sms(now, limit=10), [])
+        self.assertEqual(pop_due_sms(now + timedelta(days=2), limit=10), [
+            (1, 'domain-1', now + timedelta(seconds=1)),
+        ])
+
+    def test_push_moves_delayed_sms(self):
+        now = datetime(2016, 1, 1, 12, 0)
+        push_due_sms([(1, 'domain', now)], utcnow=now)
+        push_due_sms([(1, 'domain', now + timedelta(minutes=5))], utcnow=now)
+
+        self.assertEqual(pop_due_sms(now, limit=10), [])
+        self.assertEqual(self.client.zcard(DUE_SMS_KEY), 1)
+
+
 def test_get_sms_from_queued_sms():
     test_data = get_test_sms_fields("test_domain", datetime.utcnow(), 123)
     expected = _get_sms_fields_to_copy()
@@ -286,6 +286,20 @@ def is_case_contact_active(domain, case_id):
     return not (case.closed or case.is_deleted)
 
 
+def get_inactive_case_ids(domain, case_ids):
+    """
+    Bulk version of is_case_contact_active. Returns the ids of the cases
+    that are closed, deleted or missing.
+    """
+    if not case_ids:
+        return set()
+    active_case_ids = {
+        case.case_id for case in CommCareCase.objects.get_cases(list(case_ids), domain)
+        if not (case.closed or case.is_deleted)
+    }
+    return set(case_ids) - active_case_ids
+
+
 @quickcache(['domain', 'user_id'], timeout=60 * 60)
 def is_user_contact_active(domain, user_id):
     try:
@@ -41,6 +41,7 @@ from corehq.apps.userreports.expressions.specs import (
     IterationNumberExpressionSpec,
     IteratorExpressionSpec,
     JsonpathExpressionSpec,
+    LookupTableItemExpressionSpec,
     NamedExpressionSpec,
     NestedExpressionSpec,
     PropertyNameGetterSpec,
@@ -132,6 +133,15 @@ def _related_doc_expression(spec, context):
     return wrapped
 
 
+def _lookup_table_item_expression(spec, context):
+    wrapped = LookupTableItemExpressionSpec.wrap(spec)
+    wrapped.configure(
+        field_value_expression=ExpressionFactory.from_spec(wrapped.field_value_expression, context),
+        value_expression=ExpressionFactory.from_spec(wrapped.value_expression, context),
+    )
+    return wrapped
+
+
 def _iterator_expression(spec, context):
     wrapped = IteratorExpressionSpec.wrap(spec)
     wrapped.configure(
@@ -353,6 +363,7 @@ class ExpressionFactory(object):
         'identity': _identity_expression,
         'iterator': _iterator_expression,
         'jsonpath': _jsonpath_expression,
+        'lookup_table_item': _lookup_table_item_expression,
         'map_items': _map_items_expression,
         'month_end_date': _month_end_date_expression,
         'month_start_date': _month_start_date_expression,
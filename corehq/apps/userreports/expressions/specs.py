@@ -16,6 +16,8 @@ from pillowtop.dao.exceptions import DocumentNotFoundError
 from corehq.apps.change_feed.data_sources import (
     get_document_store_for_doc_type,
 )
+from corehq.apps.fixtures.dbaccessors import get_fixture_data_type_by_tag
+from corehq.apps.fixtures.indexes import get_items_by_field_value
 from corehq.apps.locations.document_store import LOCATION_DOC_TYPE
 from corehq.apps.userreports.const import (
     NAMED_EXPRESSION_PREFIX,
@@ -617,6 +619,73 @@ class RelatedDocExpressionSpec(JsonObject):
                                   str(self._value_expression))
 
 
+class LookupTableItemExpressionSpec(JsonObject):
+    """
+    This can be used to lookup a property of a lookup table item by the
+    value of one of its fields. Here's an example that looks up the
+    district name of the ``district_id`` case property in a lookup table
+    with the tag ``district``.
+
+    .. code:: json
+
+       {
+           "type": "lookup_table_item",
+           "table_tag": "district",
+           "field_name": "id",
+           "field_value_expression": {
+               "type": "property_name",
+               "property_name": "district_id"
+           },
+           "value_expression": {
+               "type": "property_name",
+               "property_name": "name"
+           }
+       }
+
+    The value expression is evaluated against the fields of the first
+    matching item, or ``null`` if no item matches. Lookups are much
+    faster when ``field_name`` is an indexed field of the lookup table.
+    """
+    type = TypeProperty('lookup_table_item')
+    table_tag = StringProperty(required=True)
+    field_name = StringProperty(required=True)
+    field_value_expression = DictProperty(required=True)
+    value_expression = DictProperty(required=True)
+
+    def configure(self, field_value_expression, value_expression):
+        self._field_value_expression = field_value_expression
+        self._value_expression = value_expression
+
+    def __call__(self, item, context=None):
+        field_value = self._field_value_expression(item, context)
+        if field_value is None or context is None:
+            return None
+        fields = self._get_item_fields(self.table_tag, self.field_name, field_value, context)
+        if fields is None:
+            return None
+        # explicitly use a new evaluation context since this is a new document
+        return self._value_expression(fields, EvaluationContext(fields, 0))
+
+    @staticmethod
+    @ucr_context_cache(vary_on=('table_tag', 'field_name', 'field_value',))
+    def _get_item_fields(table_tag, field_name, field_value, context):
+        data_type = get_fixture_data_type_by_tag(context.root_doc['domain'], table_tag)
+        if data_type is None:
+            return None
+        items = get_items_by_field_value(data_type, field_name, field_value)
+        if not items:
+            return None
+        return {
+            name: field_list.field_list[0].field_value if field_list.field_list else None
+            for name, field_list in items[0].fields.items()
+        }
+
+    def __str__(self):
+        return "{}[{}={}]/{}".format(self.table_tag, self.field_name,
+                                     str(self._field_value_expression),
+                                     str(self._value_expression))
+
+
 class NestedExpressionSpec(JsonObject):
     """
     These can be used to nest expressions. This can be used, e.g. to pull a
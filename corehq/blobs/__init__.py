@@ -13,6 +13,9 @@ def get_blob_db():
             db = _get_migrating_db(db, _get_fs_db(settings))
         elif getattr(settings, "BLOB_DB_MIGRATING_FROM_S3_TO_S3", False):
             db = _get_migrating_db(db, _get_s3_db(settings, "OLD_S3_BLOB_DB_SETTINGS"))
+        cache_config = getattr(settings, "BLOB_DB_LOCAL_CACHE", None)
+        if cache_config is not None:
+            db = _get_caching_db(db, cache_config)
         _db.append(db)
     return _db[-1]
 
@@ -37,6 +40,11 @@ def _get_migrating_db(new_db, old_db):
     return MigratingBlobDB(new_db, old_db)
 
 
+def _get_caching_db(db, config):
+    from .cachingdb import CachingBlobDB
+    return CachingBlobDB(db, **config)
+
+
 class CODES:
     """Blob type codes.
 
@@ -82,6 +90,7 @@ class CODES:
     demo_user_restore = 14  # DemoUserRestore
     data_file = 15      # domain data file (see DataFile class)
     form_multimedia = 16     # form submission multimedia zip
+    application_ccz = 17     # cached CCZ of an application build
 
 
 CODES.name_of = {code: name
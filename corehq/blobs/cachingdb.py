@@ -0,0 +1,203 @@
+"""Node-local read-through cache for blob db reads
+"""
+import os
+from io import BytesIO
+from os.path import dirname, exists, getsize, isdir
+from tempfile import NamedTemporaryFile
+
+from corehq.blobs.exceptions import NotFound
+from corehq.blobs.fsdb import safejoin
+from corehq.blobs.interface import DEFAULT_GET_MANY_WORKERS, iter_concurrently
+from corehq.blobs.util import BlobStream
+from corehq.util.metrics import metrics_counter, metrics_histogram_timer
+
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024  # 1GB
+DEFAULT_MAX_BLOB_SIZE = 1024 * 1024  # 1MB
+# fraction of max_size to shrink the cache to when evicting
+EVICT_TO = 0.8
+
+
+def get_backend_db(db):
+    """Get the blob db that `db` reads from if it is a `CachingBlobDB`
+
+    Use this to inspect the type of the configured blob db backend.
+    """
+    return db.db if isinstance(db, CachingBlobDB) else db
+
+
+class CachingBlobDB(object):
+    """Adaptor that caches blob content read from another blob db on the
+    local filesystem
+
+    Only reads made with a `BlobMeta` are cached, since the metadata
+    records the content length needed to verify a cached copy. Cached
+    content is stored uncompressed and the least recently read blobs are
+    evicted when the cache grows beyond `max_size` bytes. Blobs larger
+    than `max_blob_size` are never cached.
+
+    Blob content is immutable once written, so cached copies only need to
+    be removed when a blob is deleted. Other nodes may have cached a
+    deleted blob, but it can no longer be read from them because its
+    metadata is gone.
+    """
+
+    def __init__(self, db, cache_dir, max_size=DEFAULT_MAX_SIZE, max_blob_size=DEFAULT_MAX_BLOB_SIZE):
+        self.db = db
+        self.metadb = db.metadb
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.max_blob_size = max_blob_size
+        self._cache_size = None
+
+    def report_timing(self, action, key):
+        return metrics_histogram_timer(
+            'commcare.blobs.cache.timing',
+            timing_buckets=(.001, .003, .01, .03, .1, .3, 1, 3),
+            tags={'action': action},
+        )
+
+    def put(self, *args, **kw):
+        return self.db.put(*args, **kw)
+
+    def get(self, key=None, type_code=None, meta=None):
+        if not self._is_cacheable(meta):
+            return self.db.get(key=key, type_code=type_code, meta=meta)
+        return self._get_through_cache(meta, self.db.get)
+
+    def _is_cacheable(self, meta):
+        return not (meta is None or meta.content_length is None or meta.content_length > self.max_blob_size)
+
+    def _get_through_cache(self, meta, fetch):
+        path = self.get_path(meta.key)
+        with self.report_timing('get', meta.key):
+            content = self._read_cached(path, meta.content_length)
+        if content is None:
+            metrics_counter('commcare.blobs.cache.requests', tags={'result': 'miss'})
+            with fetch(meta=meta) as fh:
+                content = fh.read()
+            if len(content) == meta.content_length:
+                self._write_cached(path, content)
+        else:
+            metrics_counter('commcare.blobs.cache.requests', tags={'result': 'hit'})
+        return BlobStream(BytesIO(content), self.db, meta.key, len(content), meta.compressed_length)
+
+    def get_many(self, metas, max_workers=DEFAULT_GET_MANY_WORKERS, type_code=None):
+        if type_code is not None:
+            # stored bytes are not cached
+            yield from self.db.get_many(metas, max_workers, type_code)
+            return
+
+        def get_content(meta):
+            try:
+                if not self._is_cacheable(meta):
+                    return self.db._get_in_memory(meta)
+                return self._get_through_cache(meta, self.db._get_in_memory)
+            except NotFound:
+                return None
+
+        yield from iter_concurrently(get_content, metas, max_workers)
+
+    def size(self, *args, **kw):
+        return self.db.size(*args, **kw)
+
+    def exists(self, *args, **kw):
+        return self.db.exists(*args, **kw)
+
+    def delete(self, key, *args, **kw):
+        self._remove_cached(self.get_path(key))
+        return self.db.delete(key, *args, **kw)
+
+    def bulk_delete(self, metas, *args, **kw):
+        metas = list(metas)
+        for meta in metas:
+            self._remove_cached(self.get_path(meta.key))
+        return self.db.bulk_delete(metas, *args, **kw)
+
+    def expire(self, *args, **kw):
+        self.metadb.expire(*args, **kw)
+
+    def copy_blob(self, *args, **kw):
+        self.db.copy_blob(*args, **kw)
+
+    def get_path(self, key):
+        return safejoin(self.cache_dir, key)
+
+    def __getattr__(self, name):
+        # backend-specific attributes (s3_bucket_name, etc.)
+        return getattr(self.db, name)
+
+    def _read_cached(self, path, content_length):
+        try:
+            if getsize(path) != content_length:
+                # partial or corrupt entry
+                self._remove_cached(path)
+                return None
+            with open(path, "rb") as fh:
+                content = fh.read()
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        return content
+
+    def _write_cached(self, path, content):
+        dirpath = dirname(path)
+        if not isdir(dirpath):
+            os.makedirs(dirpath, exist_ok=True)
+        # write to a temporary file and rename so that concurrent readers
+        # never see a partially written entry
+        with NamedTemporaryFile(dir=dirpath, delete=False) as fh:
+            fh.write(content)
+        os.replace(fh.name, path)
+        if self._cache_size is None:
+            self._cache_size = self._get_cache_size()
+        else:
+            self._cache_size += len(content)
+        if self._cache_size > self.max_size:
+            self._evict()
+
+    def _remove_cached(self, path):
+        try:
+            size = getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        if self._cache_size is not None:
+            self._cache_size -= size
+
+    def _evict(self):
+        """Remove least recently used entries until the cache is below
+        `EVICT_TO` of its maximum size
+
+        The cache directory may be shared by several processes, so the
+        size is recalculated from the files on disk.
+        """
+        entries = sorted(self._iter_cache_entries(), key=lambda entry: entry[1])
+        size = sum(entry[2] for entry in entries)
+        target = self.max_size * EVICT_TO
+        evicted = 0
+        for path, mtime, entry_size in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+            evicted += 1
+        self._cache_size = size
+        metrics_counter('commcare.blobs.cache.evictions', evicted)
+
+    def _get_cache_size(self):
+        return sum(entry[2] for entry in self._iter_cache_entries())
+
+    def _iter_cache_entries(self):
+        if not exists(self.cache_dir):
+            return
+        for root, dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_mtime, stat.st_size
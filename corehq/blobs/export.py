@@ -1,9 +1,10 @@
 import os
 from abc import ABC, abstractmethod
 
+from dimagi.utils.chunked import chunked
 from dimagi.utils.couch.database import iter_docs
 
-from . import NotFound, get_blob_db, CODES
+from . import get_blob_db, CODES
 from .migrate import PROCESSING_COMPLETE_MESSAGE
 from .models import BlobMeta
 from .targzipdb import TarGzipBlobDB
@@ -27,18 +28,24 @@ class BlobDbBackendExporter(object):
             print(PROCESSING_COMPLETE_MESSAGE.format(self.not_found, self.total_blobs))
 
     def process_object(self, meta):
-        self.total_blobs += 1
-        if meta.key in self._already_exported:
-            # This object is already in an another dump
-            return
-
-        try:
-            content = self.src_db.get(meta.key, CODES.maybe_compressed)
-        except NotFound:
-            self.not_found += 1
-        else:
-            with content:
-                self.db.copy_blob(content, key=meta.key)
+        self.process_objects([meta])
+
+    def process_objects(self, metas):
+        """Export a batch of blobs, fetching them concurrently"""
+        to_export = []
+        for meta in metas:
+            self.total_blobs += 1
+            if meta.key in self._already_exported:
+                # This object is already in an another dump
+                continue
+            to_export.append(meta)
+
+        for meta, content in self.src_db.get_many(to_export, type_code=CODES.maybe_compressed):
+            if content is None:
+                self.not_found += 1
+            else:
+                with content:
+                    self.db.copy_blob(content, key=meta.key)
 
 
 class BlobExporter(ABC):
@@ -84,10 +91,9 @@ class ExportByDomain(BlobExporter):
             BlobMeta, self.domain, iterator_builders, limit_to_db)
         for model_class, builder in builders:
             for iterator in builder.iterators():
-                for obj in iterator:
-                    migrator.process_object(obj)
-                    if migrator.total_blobs % chunk_size == 0:
-                        print("Processed {} {} objects".format(migrator.total_blobs, self.slug))
+                for objs in chunked(iterator, chunk_size):
+                    migrator.process_objects(objs)
+                    print("Processed {} {} objects".format(migrator.total_blobs, self.slug))
 
 
 class ExportMultimedia(BlobExporter):
@@ -101,13 +107,14 @@ class ExportMultimedia(BlobExporter):
         provider = DOC_PROVIDERS_BY_DOC_TYPE['CommCareMultimedia']
         for doc_class, doc_ids in provider.get_doc_ids(self.domain):
             couch_db = doc_class.get_db()
-            for doc in iter_docs(couch_db, doc_ids, chunksize=chunk_size):
-                obj = doc_class.get_doc_class(doc['doc_type']).wrap(doc)
-                for name, blob_meta in obj.blobs.items():
-                    meta = db.metadb.get(parent_id=obj._id, key=blob_meta.key)
-                    migrator.process_object(meta)
-                    if migrator.total_blobs % chunk_size == 0:
-                        print("Processed {} {} objects".format(migrator.total_blobs, self.slug))
+            for docs in chunked(iter_docs(couch_db, doc_ids, chunksize=chunk_size), chunk_size):
+                metas = []
+                for doc in docs:
+                    obj = doc_class.get_doc_class(doc['doc_type']).wrap(doc)
+                    for name, blob_meta in obj.blobs.items():
+                        metas.append(db.metadb.get(parent_id=obj._id, key=blob_meta.key))
+                migrator.process_objects(metas)
+                print("Processed {} {} objects".format(migrator.total_blobs, self.slug))
 
 
 class ExportError(Exception):
@@ -62,8 +62,13 @@ class FilesystemBlobDB(AbstractBlobDB):
 
     def get(self, key=None, type_code=None, meta=None):
         key = self._validate_get_args(key, type_code, meta)
+        if meta is not None and meta.is_packed:
+            return self._get_packed(meta)
         path = self.get_path(key)
         if not exists(path):
+            packed = self._get_packed_meta(key)
+            if packed is not None:
+                return self._get_packed(packed, raw=meta is None)
             metrics_counter('commcare.blobdb.notfound')
             raise NotFound(key)
 
@@ -75,15 +80,27 @@ class FilesystemBlobDB(AbstractBlobDB):
             file_obj = open(path, "rb")
         return BlobStream(file_obj, self, key, content_length, compressed_length)
 
+    def _read_range(self, key, offset, length):
+        path = self.get_path(key)
+        if not exists(path):
+            metrics_counter('commcare.blobdb.notfound')
+            raise NotFound(key)
+        with open(path, "rb") as fh:
+            fh.seek(offset)
+            return fh.read(length)
+
     def size(self, key):
         path = self.get_path(key)
         if not exists(path):
+            packed = self._get_packed_meta(key)
+            if packed is not None:
+                return packed.stored_content_length
             metrics_counter('commcare.blobdb.notfound')
             raise NotFound(key)
         return _count_size(path).size
 
     def exists(self, key):
-        return exists(self.get_path(key))
+        return exists(self.get_path(key)) or self._get_packed_meta(key) is not None
 
     def delete(self, key):
         path = self.get_path(key)
@@ -92,13 +109,19 @@ class FilesystemBlobDB(AbstractBlobDB):
             count, size = _count_size(path)
             os.remove(path)
         else:
-            size = 0
+            packed = self._get_packed_meta(key)
+            # packed blobs have no file of their own
+            file_exists = packed is not None
+            size = packed.stored_content_length if file_exists else 0
         self.metadb.delete(key, size)
         return file_exists
 
     def bulk_delete(self, metas):
         success = True
         for meta in metas:
+            if meta.is_packed:
+                # packed blobs have no file of their own
+                continue
             path = self.get_path(meta.key)
             if not exists(path):
                 success = False
@@ -119,6 +142,12 @@ class FilesystemBlobDB(AbstractBlobDB):
                     break
                 fh.write(chunk)
 
+    def _delete_objects(self, keys):
+        for key in keys:
+            path = self.get_path(key)
+            if exists(path):
+                os.remove(path)
+
     def get_path(self, key):
         return safejoin(self.rootdir, key)
 
@@ -1,9 +1,18 @@
 from abc import ABCMeta, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from gzip import GzipFile
+from io import BytesIO
+from itertools import islice
 
 from . import CODES
+from .exceptions import NotFound
 from .metadata import MetaDB
+from .packing import get_packing_config
+from .util import BlobStream
 
 NOT_SET = object()
+DEFAULT_GET_MANY_WORKERS = 8
 
 
 class AbstractBlobDB(metaclass=ABCMeta):
@@ -69,6 +78,89 @@ class AbstractBlobDB(metaclass=ABCMeta):
         """
         raise NotImplementedError
 
+    def get_many(self, metas, max_workers=DEFAULT_GET_MANY_WORKERS, type_code=None):
+        """Get many blobs concurrently
+
+        Blobs are fetched by a pool of `max_workers` threads and yielded
+        in the order they complete (not the order of `metas`). Blob
+        content is read into memory, but no more than `max_workers`
+        blobs are held at a time (plus the one being consumed), so it
+        is safe to pass a long or lazy iterable of metas.
+
+        :param metas: Iterable of `BlobMeta` objects.
+        :param max_workers: Maximum number of concurrent fetches.
+        :param type_code: Optional type code. If provided, blobs are
+        fetched with `get(key=meta.key, type_code=type_code)` rather
+        than `get(meta=meta)`. Use `CODES.maybe_compressed` to get
+        stored bytes.
+        :yields: `(meta, content)` pairs where `content` is a
+        `BlobStream` over the blob content, or `None` if the blob was
+        not found.
+        """
+        def get_content(meta):
+            try:
+                return self._get_in_memory(meta, type_code)
+            except NotFound:
+                return None
+
+        yield from iter_concurrently(get_content, metas, max_workers)
+
+    def _get_in_memory(self, meta, type_code=None):
+        if meta.is_packed:
+            return self._get_packed(meta, raw=type_code is not None)
+        if type_code is None:
+            stream = self.get(meta=meta)
+        else:
+            stream = self.get(key=meta.key, type_code=type_code)
+        with stream:
+            content = stream.read()
+        return BlobStream(BytesIO(content), self, meta.key,
+                          stream.content_length, stream.compressed_length)
+
+    def _get_packed(self, meta, raw=False):
+        """Get a blob that has been packed into a segment
+
+        :param meta: `BlobMeta` object with `segment_key` set.
+        :param raw: Get stored (possibly compressed) bytes if true.
+        """
+        length = meta.stored_content_length
+        if length:
+            content = self._read_range(meta.segment_key, meta.segment_offset, length)
+        else:
+            content = b""
+        if len(content) != length:
+            raise NotFound(meta.key)
+        if meta.is_compressed and not raw:
+            body = GzipFile(meta.key, mode='rb', fileobj=BytesIO(content))
+            return BlobStream(body, self, None, meta.content_length, meta.compressed_length)
+        # blob_key is None because there is no object to copy from
+        return BlobStream(BytesIO(content), self, None, length, None)
+
+    def _get_packed_meta(self, key):
+        """Get metadata of a packed blob by key, or `None`
+
+        Key misses only look for packed blobs when packing is enabled,
+        since doing so queries every partition database.
+        """
+        if get_packing_config() is None:
+            return None
+        return self.metadb.get_packed(key)
+
+    def _read_range(self, key, offset, length):
+        """Read `length` bytes of an object starting at `offset`
+
+        Backends that support packed blobs must implement this.
+        """
+        raise NotImplementedError
+
+    def _delete_objects(self, keys):
+        """Delete objects from the external blob store without touching
+        blob metadata
+
+        Backends that support packed blobs must implement this.
+        """
+        raise NotImplementedError
+
     @staticmethod
     def _validate_get_args(key, type_code, meta):
         if key is not None or type_code is not None:
@@ -137,3 +229,53 @@ class AbstractBlobDB(metaclass=ABCMeta):
         :param key: Blob key.
         """
         raise NotImplementedError
+
+
+def iter_concurrently(func, items, max_workers):
+    """Call `func(item)` for each item using a pool of threads
+
+    Yields `(item, result)` pairs as they complete. No more than
+    `max_workers` items are in flight at any time, and `items` is
+    consumed lazily. Exceptions raised by `func` propagate to the
+    caller.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+
+        def submit_next():
+            for item in items:
+                pending[executor.submit(func, item)] = item
+                return True
+            return False
+
+        for x in range(max_workers):
+            if not submit_next():
+                break
+        while pending:
+            done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                yield item, future.result()
+                submit_next()
+
+
+def iter_concurrently_in_order(func, items, max_workers):
+    """Call `func(item)` for each item using a pool of threads
+
+    Like `iter_concurrently`, but yields `(item, result)` pairs in the
+    order of `items`. No more than `max_workers` results are held at a
+    time, so a slow item delays the items after it.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque(
+            (item, executor.submit(func, item))
+            for item in islice(items, max_workers)
+        )
+        while pending:
+            item, future = pending.popleft()
+            result = future.result()
+            for next_item in islice(items, 1):
+                pending.append((next_item, executor.submit(func, next_item)))
+            yield item, result
@@ -10,6 +10,7 @@ import corehq.apps.app_manager.models as apps
 import corehq.apps.hqmedia.models as hqmedia
 from corehq.apps.export import models as exports
 from corehq.blobs import get_blob_db, CODES
+from corehq.blobs.cachingdb import get_backend_db
 from corehq.blobs.migratingdb import MigratingBlobDB
 from corehq.blobs.mixin import BlobMetaRef
 from corehq.blobs.util import set_max_connections
@@ -61,7 +62,7 @@ class Command(BaseCommand):
     @change_log_level('botocore', logging.WARNING)
     def handle(self, files, migrate=False, num_workers=10, **options):
         set_max_connections(num_workers)
-        blob_db = get_blob_db()
+        blob_db = get_backend_db(get_blob_db())
         if not isinstance(blob_db, MigratingBlobDB):
             raise CommandError(
                 "Expected to find migrating blob db backend (got %r)" % blob_db)
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 
 from corehq.sql_db.util import (
     get_db_alias_for_partitioned_doc,
+    get_db_aliases_for_partitioned_query,
     split_list_by_db_partition,
 )
 from corehq.util.metrics import metrics_counter
@@ -188,6 +189,28 @@ class MetaDB(object):
             raise BlobMeta.DoesNotExist(repr(kw))
         return meta
 
+    def get_packed(self, key):
+        """Get metadata for a packed blob by key
+
+        Packed blobs have no object of their own in the external blob
+        store (see `corehq.blobs.packing`), so key-based access resolves
+        them with this. All partition databases are queried since the
+        parent id is not known.
+
+        :param key: `BlobMeta.key`
+        :returns: A `BlobMeta` object or `None` if there is no packed
+        blob with the given key.
+        """
+        for dbname in get_db_aliases_for_partitioned_query():
+            meta = (
+                BlobMeta.objects.using(dbname)
+                .filter(key=key, segment_key__isnull=False)
+                .first()
+            )
+            if meta is not None:
+                return meta
+        return None
+
     def get_for_parent(self, parent_id, type_code=None):
         """Get a list of `BlobMeta` objects for the given parent
 
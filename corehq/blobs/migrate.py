@@ -85,6 +85,7 @@ from django.db.models import Q
 
 from corehq.apps.domain import SHARED_DOMAIN
 from corehq.blobs import get_blob_db, CODES
+from corehq.blobs.cachingdb import get_backend_db
 from corehq.blobs.exceptions import NotFound
 from corehq.blobs.migrate_metadata import migrate_metadata
 from corehq.blobs.migratingdb import MigratingBlobDB
@@ -278,6 +279,7 @@ class BlobDbMigrator(BaseDocMigrator, ABC):
 class BlobDbBackendMigrator(BlobDbMigrator):
     def __init__(self, *args, **kw):
         super(BlobDbBackendMigrator, self).__init__(*args, **kw)
+        self.db = get_backend_db(self.db)
         if not isinstance(self.db, MigratingBlobDB):
             raise MigrationError(
                 "Expected to find migrating blob db backend (got %r)" % self.db)
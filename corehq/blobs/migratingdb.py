@@ -2,6 +2,7 @@
 """
 
 from corehq.blobs.exceptions import NotFound
+from corehq.blobs.interface import DEFAULT_GET_MANY_WORKERS, iter_concurrently
 
 
 class MigratingBlobDB(object):
@@ -25,6 +26,32 @@ class MigratingBlobDB(object):
         except NotFound:
             return self.old_db.get(*args, **kw)
 
+    def get_many(self, metas, max_workers=DEFAULT_GET_MANY_WORKERS, type_code=None):
+        def get_content(meta):
+            try:
+                return self._get_in_memory(meta, type_code)
+            except NotFound:
+                return None
+
+        yield from iter_concurrently(get_content, metas, max_workers)
+
+    def _get_in_memory(self, *args, **kw):
+        try:
+            return self.new_db._get_in_memory(*args, **kw)
+        except NotFound:
+            return self.old_db._get_in_memory(*args, **kw)
+
+    def _read_range(self, *args, **kw):
+        try:
+            return self.new_db._read_range(*args, **kw)
+        except NotFound:
+            return self.old_db._read_range(*args, **kw)
+
+    def _delete_objects(self, keys):
+        keys = list(keys)
+        self.new_db._delete_objects(keys)
+        self.old_db._delete_objects(keys)
+
     def size(self, *args, **kw):
         try:
             return self.new_db.size(*args, **kw)
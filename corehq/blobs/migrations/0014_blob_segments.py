@@ -0,0 +1,53 @@
+import datetime
+
+from django.db import migrations, models
+
+from corehq.sql_db.migrations import partitioned
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('blobs', '0013_drop_icds_cas_index'),
+    ]
+
+    operations = [
+        partitioned(migrations.AddField(
+            model_name='blobmeta',
+            name='segment_key',
+            field=models.CharField(help_text='Key of the segment object containing this blob.\n\n        Set when the blob has been packed into a segment with other\n        small blobs (see `corehq.blobs.packing`). The stored (possibly\n        compressed) content is `stored_content_length` bytes starting\n        at `segment_offset`. There is no object at `key` in the\n        external blob store once a blob has been packed.\n        ', max_length=255, null=True),
+        )),
+        partitioned(migrations.AddField(
+            model_name='blobmeta',
+            name='segment_offset',
+            field=models.BigIntegerField(null=True),
+        )),
+        partitioned(migrations.RunSQL("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS "blobs_blobmeta_segment_key"
+            ON "blobs_blobmeta" ("segment_key")
+            WHERE "blobs_blobmeta"."segment_key" IS NOT NULL
+        """, """
+            DROP INDEX CONCURRENTLY IF EXISTS blobs_blobmeta_segment_key
+        """, state_operations=[
+            migrations.AddIndex(
+                model_name='blobmeta',
+                index=models.Index(
+                    condition=models.Q(segment_key__isnull=False),
+                    fields=['segment_key'],
+                    name='blobs_blobmeta_segment_key',
+                ),
+            ),
+        ])),
+        migrations.CreateModel(
+            name='BlobSegment',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('type_code', models.PositiveSmallIntegerField()),
+                ('length', models.BigIntegerField()),
+                ('created_on', models.DateTimeField(default=datetime.datetime.utcnow)),
+                ('retired_on', models.DateTimeField(help_text='Time at which the segment was replaced by compaction.\n\n        Retired segments are deleted after a grace period to allow\n        in-progress reads to complete.\n        ', null=True)),
+            ],
+        ),
+    ]
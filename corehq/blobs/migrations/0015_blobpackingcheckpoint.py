@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blobs', '0014_blob_segments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlobPackingCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dbname', models.CharField(max_length=255)),
+                ('type_code', models.PositiveSmallIntegerField()),
+                ('last_id', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('dbname', 'type_code')},
+            },
+        ),
+    ]
@@ -62,6 +62,19 @@ class BlobMeta(PartitionedModel, Model):
     properties = NullJsonField(default=dict)
     created_on = DateTimeField(default=datetime.utcnow)
     expires_on = DateTimeField(default=None, null=True)
+    segment_key = CharField(
+        max_length=255,
+        null=True,
+        help_text="""Key of the segment object containing this blob.
+
+        Set when the blob has been packed into a segment with other
+        small blobs (see `corehq.blobs.packing`). The stored (possibly
+        compressed) content is `stored_content_length` bytes starting
+        at `segment_offset`. There is no object at `key` in the
+        external blob store once a blob has been packed.
+        """,
+    )
+    segment_offset = BigIntegerField(null=True)
 
     class Meta:
         unique_together = [
@@ -79,6 +92,11 @@ class BlobMeta(PartitionedModel, Model):
                 name="blobs_blobmeta_expires_ed7e3d",
                 condition=Q(expires_on__isnull=False),
             ),
+            Index(
+                fields=['segment_key'],
+                name="blobs_blobmeta_segment_key",
+                condition=Q(segment_key__isnull=False),
+            ),
         ]
 
     def __repr__(self):
@@ -97,6 +115,10 @@ class BlobMeta(PartitionedModel, Model):
     def stored_content_length(self):
         return self.compressed_length if self.is_compressed else self.content_length
 
+    @property
+    def is_packed(self):
+        return self.segment_key is not None
+
     def open(self, db=None):
         """Get a file-like object containing blob content
 
@@ -108,7 +130,7 @@ class BlobMeta(PartitionedModel, Model):
 
     def blob_exists(self):
         from . import get_blob_db
-        return get_blob_db().exists(self.key)
+        return get_blob_db().exists(self.segment_key if self.is_packed else self.key)
 
     @memoized
     def content_md5(self):
@@ -144,3 +166,41 @@ class DeletedBlobMeta(PartitionedModel, Model):
 class BlobMigrationState(Model):
     slug = CharField(max_length=20, unique=True)
     timestamp = DateTimeField(auto_now=True)
+
+
+class BlobSegment(Model):
+    """An object in the blob db containing many packed blobs
+
+    See `corehq.blobs.packing`
+    """
+    key = CharField(max_length=255, unique=True)
+    type_code = PositiveSmallIntegerField()
+    length = BigIntegerField()
+    created_on = DateTimeField(default=datetime.utcnow)
+    retired_on = DateTimeField(
+        null=True,
+        help_text="""Time at which the segment was replaced by compaction.
+
+        Retired segments are deleted after a grace period to allow
+        in-progress reads to complete.
+        """,
+    )
+
+    def __repr__(self):
+        return "<BlobSegment id={self.id} key={self.key}>".format(self=self)
+
+
+class BlobPackingCheckpoint(Model):
+    """Position of the packing scan of a type code in a partition db
+
+    See `corehq.blobs.packing`
+    """
+    dbname = CharField(max_length=255)
+    type_code = PositiveSmallIntegerField()
+    last_id = BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = [("dbname", "type_code")]
+
+    def __repr__(self):
+        return "<BlobPackingCheckpoint dbname={self.dbname} type_code={self.type_code}>".format(self=self)
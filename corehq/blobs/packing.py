@@ -0,0 +1,311 @@
+"""Packed storage of small blobs
+
+Object stores charge per request and keep per-object overhead, which
+makes them a poor fit for the very large number of small blobs (form
+XML, for example) written by HQ. When `settings.BLOB_DB_PACKING` is set,
+small blobs of the configured type codes are periodically packed into
+larger segment objects. A packed `BlobMeta` records the key of its
+segment and the offset of its stored (possibly compressed) bytes, and
+is read with a ranged get.
+
+Blobs are still written individually and are only packed once they are
+older than `pack_after`. Blobs having an expiration date are never
+packed. The packing scan of each type code in each partition database
+resumes from a `BlobPackingCheckpoint`. Key-based access
+(`get(key=...)`, `size`, `exists`, `delete`) falls back to looking up
+the metadata of a packed blob when there is no object at its key.
+Deleting a packed blob only deletes its metadata. The space it occupied
+is reclaimed by `compact_segments`, which rewrites segments consisting
+mostly of deleted blobs.
+
+Example configuration:
+
+    BLOB_DB_PACKING = {
+        "type_codes": [CODES.form_xml],
+        "max_blob_size": 64 * 1024,
+        "segment_size": 16 * 1024 * 1024,
+    }
+
+Packing should not be enabled while migrating blobs between backends.
+"""
+import logging
+from datetime import datetime, timedelta
+from io import BytesIO
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
+
+from dimagi.utils.chunked import chunked
+
+from corehq.blobs import CODES
+from corehq.blobs.models import BlobMeta, BlobPackingCheckpoint, BlobSegment
+from corehq.sql_db.util import get_db_aliases_for_partitioned_query
+from corehq.util.metrics import metrics_counter
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_BLOB_SIZE = 64 * 1024
+DEFAULT_SEGMENT_SIZE = 16 * 1024 * 1024
+DEFAULT_PACK_AFTER = timedelta(days=1)
+# time after which blobs that did not fill a segment are packed anyway
+DEFAULT_FLUSH_AFTER = timedelta(days=1)
+# segments having less than this fraction of live bytes are rewritten
+DEFAULT_COMPACT_THRESHOLD = 0.5
+# time before a retired segment is deleted
+RETIRED_SEGMENT_GRACE = timedelta(days=1)
+SCAN_BATCH_SIZE = 1000
+SEGMENT_KEY_PREFIX = "segments/"
+
+
+class PackingConfig:
+
+    def __init__(self, type_codes, max_blob_size=DEFAULT_MAX_BLOB_SIZE,
+                 segment_size=DEFAULT_SEGMENT_SIZE, pack_after=DEFAULT_PACK_AFTER,
+                 compact_threshold=DEFAULT_COMPACT_THRESHOLD, flush_after=DEFAULT_FLUSH_AFTER):
+        self.type_codes = set(type_codes)
+        self.max_blob_size = max_blob_size
+        self.segment_size = segment_size
+        self.pack_after = pack_after
+        self.compact_threshold = compact_threshold
+        self.flush_after = flush_after
+
+
+def get_packing_config():
+    """Get packing config or `None` if packing is not enabled"""
+    config = getattr(settings, "BLOB_DB_PACKING", None)
+    return None if config is None else PackingConfig(**config)
+
+
+def pack_blobs(db, dbname, config):
+    """Pack small blobs in a single partition database
+
+    Each configured type code is scanned separately, resuming from its
+    `BlobPackingCheckpoint` so that a type code with few blobs does not
+    hold back the others.
+
+    :returns: Number of blobs packed.
+    """
+    packed_count = 0
+    for type_code in sorted(config.type_codes):
+        checkpoint, created = BlobPackingCheckpoint.objects.get_or_create(
+            dbname=dbname,
+            type_code=type_code,
+        )
+        count, next_start_id = _pack_type_code(db, dbname, config, type_code, checkpoint.last_id)
+        if next_start_id != checkpoint.last_id:
+            checkpoint.last_id = next_start_id
+            checkpoint.save()
+        packed_count += count
+    return packed_count
+
+
+def _pack_type_code(db, dbname, config, type_code, start_id):
+    """Pack small blobs of a single type code
+
+    Blob metadata is scanned in `id` order starting after `start_id`
+    until a blob newer than `config.pack_after` is found. Blobs are
+    packed when enough have accumulated to fill a segment. Remaining
+    blobs are left for a later run unless the oldest of them is older
+    than `config.pack_after + config.flush_after`, in which case they
+    are packed into a smaller segment so the scan can move past them.
+
+    :returns: `(packed_count, next_start_id)` where `next_start_id`
+    should be passed as `start_id` on the next run.
+    """
+    now = _utcnow()
+    cutoff = now - config.pack_after
+    pending = []
+    pending_size = 0
+    packed_count = 0
+    last_id = start_id
+    for meta in _iter_metas(dbname, type_code, start_id):
+        if meta.created_on >= cutoff:
+            break
+        last_id = meta.id
+        if not _is_packable(meta, config):
+            continue
+        pending.append(meta)
+        pending_size += meta.stored_content_length
+        if pending_size >= config.segment_size:
+            packed_count += _write_segment(db, dbname, type_code, pending)
+            pending = []
+            pending_size = 0
+    if pending and pending[0].created_on < cutoff - config.flush_after:
+        packed_count += _write_segment(db, dbname, type_code, pending)
+        pending = []
+    # resume before the oldest blob that has not been packed yet
+    next_start_id = pending[0].id - 1 if pending else last_id
+    return packed_count, next_start_id
+
+
+def _iter_metas(dbname, type_code, start_id):
+    while True:
+        batch = list(
+            BlobMeta.objects.using(dbname)
+            .filter(type_code=type_code, id__gt=start_id)
+            .order_by("id")[:SCAN_BATCH_SIZE]
+        )
+        yield from batch
+        if len(batch) < SCAN_BATCH_SIZE:
+            return
+        start_id = batch[-1].id
+
+
+def _is_packable(meta, config):
+    return (
+        meta.type_code in config.type_codes
+        and not meta.is_packed
+        and meta.expires_on is None
+        and meta.stored_content_length <= config.max_blob_size
+    )
+
+
+def compact_segments(db, config):
+    """Reclaim space used by deleted blobs in packed segments
+
+    Live blobs in segments having less than `config.compact_threshold`
+    of their bytes in use are rewritten to new segments and the old
+    segments are retired. Segments having no live blobs are retired
+    without being rewritten. A segment is only retired once no blob
+    refers to it, so a segment still holding blobs that could not be
+    rewritten is left in place. Retired segments are deleted after a
+    grace period so that reads started before compaction can complete.
+
+    :returns: Number of segments retired.
+    """
+    _delete_retired_segments(db)
+    cutoff = _utcnow() - config.pack_after
+    active = (
+        BlobSegment.objects
+        .filter(retired_on__isnull=True, created_on__lt=cutoff)
+        .order_by("id")
+    )
+    retired_count = 0
+    for segments in chunked(active.iterator(), 100):
+        live = _get_live_bytes([s.key for s in segments])
+        sparse = [
+            seg for seg in segments
+            if live.get(seg.key, 0) < seg.length * config.compact_threshold
+        ]
+        if not sparse:
+            continue
+        sparse_keys = [seg.key for seg in sparse]
+        for dbname in get_db_aliases_for_partitioned_query():
+            metas = list(
+                BlobMeta.objects.using(dbname)
+                .filter(segment_key__in=sparse_keys)
+                .order_by("type_code", "id")
+            )
+            _repack(db, dbname, metas, config)
+        unreferenced = set(sparse_keys) - set(_get_live_bytes(sparse_keys))
+        if unreferenced:
+            BlobSegment.objects.filter(key__in=unreferenced).update(retired_on=_utcnow())
+            retired_count += len(unreferenced)
+        if len(unreferenced) < len(sparse_keys):
+            log.warning("not retiring blob segments still in use: %r",
+                        sorted(set(sparse_keys) - unreferenced))
+    metrics_counter('commcare.blobs.segments.retired', retired_count)
+    return retired_count
+
+
+def _get_live_bytes(segment_keys):
+    live = {}
+    for dbname in get_db_aliases_for_partitioned_query():
+        rows = (
+            BlobMeta.objects.using(dbname)
+            .filter(segment_key__in=segment_keys)
+            .values("segment_key")
+            .annotate(live=Sum(Coalesce(F("compressed_length"), F("content_length"))))
+        )
+        for row in rows:
+            live[row["segment_key"]] = live.get(row["segment_key"], 0) + row["live"]
+    return live
+
+
+def _repack(db, dbname, metas, config):
+    group = []
+    size = 0
+    for meta in metas:
+        if group and (meta.type_code != group[0].type_code or size >= config.segment_size):
+            _write_segment(db, dbname, group[0].type_code, group)
+            group = []
+            size = 0
+        group.append(meta)
+        size += meta.stored_content_length
+    if group:
+        _write_segment(db, dbname, group[0].type_code, group)
+
+
+def _delete_retired_segments(db):
+    retired = BlobSegment.objects.filter(retired_on__lt=_utcnow() - RETIRED_SEGMENT_GRACE)
+    for segments in chunked(retired.iterator(), 1000):
+        keys = [seg.key for seg in segments]
+        db._delete_objects(keys)
+        BlobSegment.objects.filter(key__in=keys).delete()
+        log.info("deleted retired blob segments: %r", keys)
+
+
+def _write_segment(db, dbname, type_code, metas):
+    """Write stored blob content to a new segment
+
+    Content is read from the current location of each blob, which is
+    either its own object or another segment. Metadata is only updated
+    for blobs that were not deleted or moved while the segment was
+    being written. Objects holding individual blobs are deleted once
+    their metadata has been updated.
+
+    :returns: Number of blobs packed.
+    """
+    segment_key = SEGMENT_KEY_PREFIX + uuid4().hex
+    original_keys = {meta.id: meta.segment_key for meta in metas}
+    buf = BytesIO()
+    packed = []
+    # get_many() yields in completion order; order by id for locality
+    contents = {
+        meta.id: content
+        for meta, content in db.get_many(metas, type_code=CODES.maybe_compressed)
+    }
+    for meta in metas:
+        content = contents.get(meta.id)
+        if content is None:
+            continue  # deleted since it was scanned
+        with content:
+            data = content.read()
+        if len(data) != meta.stored_content_length:
+            log.warning("not packing blob with unexpected length: %r", meta.key)
+            continue
+        meta.segment_key = segment_key
+        meta.segment_offset = buf.tell()
+        buf.write(data)
+        packed.append(meta)
+    if not packed:
+        return 0
+    length = buf.tell()
+    buf.seek(0)
+    db.copy_blob(buf, key=segment_key)
+    BlobSegment.objects.create(key=segment_key, type_code=type_code, length=length)
+
+    with transaction.atomic(using=dbname):
+        current = dict(
+            BlobMeta.objects.using(dbname)
+            .select_for_update()
+            .filter(id__in=[meta.id for meta in packed])
+            .values_list("id", "segment_key")
+        )
+        packed = [
+            meta for meta in packed
+            if meta.id in current and current[meta.id] == original_keys[meta.id]
+        ]
+        BlobMeta.objects.using(dbname).bulk_update(packed, ["segment_key", "segment_offset"])
+    # individual objects of blobs that were not packed before
+    db._delete_objects([meta.key for meta in packed if original_keys[meta.id] is None])
+    metrics_counter('commcare.blobs.packed.count', len(packed), tags={'type_code': type_code})
+    metrics_counter('commcare.blobs.packed.bytes', length, tags={'type_code': type_code})
+    return len(packed)
+
+
+def _utcnow():
+    return datetime.utcnow()
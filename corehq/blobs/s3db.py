@@ -1,5 +1,7 @@
+import gzip
 from contextlib import contextmanager
 from gzip import GzipFile
+from io import BytesIO
 
 import boto3
 from botocore.client import Config
@@ -68,7 +70,7 @@ class S3BlobDB(AbstractBlobDB):
         meta = self.metadb.new(**blob_meta_args)
         check_safe_key(meta.key)
         s3_bucket = self._s3_bucket(create=True)
-        if isinstance(content, BlobStream) and content.blob_db is self:
+        if isinstance(content, BlobStream) and content.blob_db is self and content.blob_key is not None:
             meta.content_length = content.content_length
             meta.compressed_length = content.compressed_length
             self.metadb.put(meta)
@@ -94,9 +96,17 @@ class S3BlobDB(AbstractBlobDB):
     @retry_on_slow_down
     def get(self, key=None, type_code=None, meta=None):
         key = self._validate_get_args(key, type_code, meta)
+        if meta is not None and meta.is_packed:
+            return self._get_packed(meta)
         check_safe_key(key)
-        with maybe_not_found(throw=NotFound(key)), self.report_timing('get', key):
-            resp = self._s3_bucket().Object(key).get()
+        try:
+            with maybe_not_found(throw=NotFound(key)), self.report_timing('get', key):
+                resp = self._s3_bucket().Object(key).get()
+        except NotFound:
+            packed = self._get_packed_meta(key)
+            if packed is None:
+                raise
+            return self._get_packed(packed, raw=meta is None)
         reported_content_length = resp['ContentLength']
 
         body = resp["Body"]
@@ -107,10 +117,44 @@ class S3BlobDB(AbstractBlobDB):
             content_length, compressed_length = reported_content_length, None
         return BlobStream(body, self, key, content_length, compressed_length)
 
+    @retry_on_slow_down
+    def _get_in_memory(self, meta, type_code=None):
+        # get_many() calls this from multiple threads. boto3 resources are
+        # not thread-safe, so use the (thread-safe) low-level client.
+        if meta.is_packed:
+            return self._get_packed(meta, raw=type_code is not None)
+        if type_code is None:
+            key = self._validate_get_args(None, None, meta)
+            is_compressed = meta.is_compressed
+        else:
+            key = self._validate_get_args(meta.key, type_code, None)
+            is_compressed = False
+        check_safe_key(key)
+        with maybe_not_found(throw=NotFound(key)), self.report_timing('get', key):
+            resp = self.db.meta.client.get_object(Bucket=self.s3_bucket_name, Key=key)
+            body = resp["Body"].read()
+        if is_compressed:
+            content = gzip.decompress(body)
+            return BlobStream(BytesIO(content), self, key, meta.content_length, meta.compressed_length)
+        return BlobStream(BytesIO(body), self, key, len(body), None)
+
+    def _read_range(self, key, offset, length):
+        check_safe_key(key)
+        byte_range = "bytes={}-{}".format(offset, offset + length - 1)
+        with maybe_not_found(throw=NotFound(key)), self.report_timing('get-range', key):
+            resp = self.db.meta.client.get_object(Bucket=self.s3_bucket_name, Key=key, Range=byte_range)
+            return resp["Body"].read()
+
     def size(self, key):
         check_safe_key(key)
-        with maybe_not_found(throw=NotFound(key)), self.report_timing('size', key):
-            return self._s3_bucket().Object(key).content_length
+        try:
+            with maybe_not_found(throw=NotFound(key)), self.report_timing('size', key):
+                return self._s3_bucket().Object(key).content_length
+        except NotFound:
+            packed = self._get_packed_meta(key)
+            if packed is None:
+                raise
+            return packed.stored_content_length
 
     def exists(self, key):
         check_safe_key(key)
@@ -119,7 +163,7 @@ class S3BlobDB(AbstractBlobDB):
                 self._s3_bucket().Object(key).load()
             return True
         except NotFound:
-            return False
+            return self._get_packed_meta(key) is not None
 
     def delete(self, key):
         deleted_bytes = 0
@@ -131,6 +175,12 @@ class S3BlobDB(AbstractBlobDB):
             deleted_bytes = obj.content_length
             obj.delete()
             success = True
+        if not success:
+            packed = self._get_packed_meta(key)
+            if packed is not None:
+                # packed blobs have no object of their own
+                deleted_bytes = packed.stored_content_length
+                success = True
         self.metadb.delete(key, deleted_bytes)
         return success
 
@@ -138,7 +188,11 @@ class S3BlobDB(AbstractBlobDB):
         success = True
         s3_bucket = self._s3_bucket()
         for chunk in chunked(metas, self.bulk_delete_chunksize):
-            objects = [{"Key": meta.key} for meta in chunk]
+            # packed blobs have no object of their own
+            objects = [{"Key": meta.key} for meta in chunk if not meta.is_packed]
+            if not objects:
+                self.metadb.bulk_delete(chunk)
+                continue
             resp = s3_bucket.delete_objects(Delete={"Objects": objects})
             deleted = set(d["Key"] for d in resp.get("Deleted", []))
             success = success and all(o["Key"] in deleted for o in objects)
@@ -149,6 +203,13 @@ class S3BlobDB(AbstractBlobDB):
         with self.report_timing('copy_blobdb', key):
             self._s3_bucket(create=True).upload_fileobj(content, key)
 
+    def _delete_objects(self, keys):
+        s3_bucket = self._s3_bucket()
+        for chunk in chunked(keys, self.bulk_delete_chunksize):
+            objects = [{"Key": key} for key in chunk]
+            with self.report_timing('delete-objects', None):
+                s3_bucket.delete_objects(Delete={"Objects": objects})
+
     def _s3_bucket(self, create=False):
         if create and not self._s3_bucket_exists:
             try:
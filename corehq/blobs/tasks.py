@@ -1,40 +1,154 @@
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 
-from celery.task import periodic_task
+from django.conf import settings
+from django.db.models import Q
+
+from celery.task import periodic_task, task
 from celery.schedules import crontab
 
+from dimagi.utils.couch import get_redis_lock, release_lock
+
 from corehq.blobs.models import BlobMeta
 from corehq.blobs import get_blob_db
+from corehq.blobs.packing import compact_segments, get_packing_config, pack_blobs
 from corehq.sql_db.util import get_db_aliases_for_partitioned_query
-from corehq.util.metrics import metrics_counter
+from corehq.util.metrics import metrics_counter, metrics_gauge
 
 log = logging.getLogger(__name__)
 
 
-@periodic_task(run_every=crontab(minute=0, hour='0,12'))
+# Expired blobs are deleted in batches of this size. S3 multi-object
+# delete accepts at most 1000 keys per request.
+EXPIRED_BATCH_SIZE = 1000
+# Maximum number of expired blobs to delete per second per partition db
+EXPIRED_DELETE_RATE = 2000
+# A sweep re-queues itself after this long to release its worker
+SWEEP_TIME_LIMIT = timedelta(minutes=10)
+SWEEP_LOCK_TIMEOUT = 30 * 60
+PACK_LOCK_TIMEOUT = 60 * 60
+
+
+@periodic_task(run_every=crontab(minute='*/15'))
 def delete_expired_blobs():
-    run_again = False
-    bytes_deleted = 0
+    """Start a concurrent sweep of expired blobs in each partition db
+
+    A sweep of a db that is already being swept is skipped.
+    """
     for dbname in get_db_aliases_for_partitioned_query():
-        expired = list(BlobMeta.objects.using(dbname).filter(
-            expires_on__isnull=False,
-            expires_on__lt=_utcnow(),
-        )[:1000])
+        sweep_expired_blobs.delay(dbname)
+
+
+@task(queue=settings.CELERY_PERIODIC_QUEUE, ignore_result=True)
+def sweep_expired_blobs(dbname):
+    """Delete expired blobs in a single partition db
+
+    Expired metadata is read in `(expires_on, id)` order using the
+    partial index on `expires_on`. Each page starts after the last row
+    of the previous one (keyset pagination) so blobs that could not be
+    deleted are not read again. Deletion is paced to
+    `EXPIRED_DELETE_RATE` blobs per second, and the sweep re-queues
+    itself if it has not caught up within `SWEEP_TIME_LIMIT`.
+
+    :returns: Number of bytes deleted.
+    """
+    lock_key = "sweep-expired-blobs-{}".format(dbname)
+    lock = get_redis_lock(lock_key, timeout=SWEEP_LOCK_TIMEOUT, name=lock_key)
+    if not lock.acquire(blocking=False):
+        metrics_counter('commcare.temp_blobs.sweep.locked_out', tags={'db': dbname})
+        return 0
+    try:
+        bytes_deleted, run_again = _sweep_expired_blobs(dbname)
+    finally:
+        release_lock(lock, True)
+    if run_again:
+        sweep_expired_blobs.delay(dbname)
+    return bytes_deleted
+
+
+def _sweep_expired_blobs(dbname):
+    db = get_blob_db()
+    now = _utcnow()
+    started = time.monotonic()
+    deadline = started + SWEEP_TIME_LIMIT.total_seconds()
+    blobs_deleted = bytes_deleted = 0
+    last = None
+    while True:
+        expired = _get_expired_batch(dbname, now, last)
         if not expired:
-            continue
-        if len(expired) == 1000:
-            run_again = True
-        get_blob_db().bulk_delete(metas=expired)
+            break
+        if last is None:
+            lag = (now - expired[0].expires_on).total_seconds()
+            metrics_gauge('commcare.temp_blobs.sweep.lag', lag, tags={'db': dbname})
+        last = expired[-1]
+        db.bulk_delete(metas=expired)
         log.info("deleted expired blobs: %r", [m.key for m in expired])
-        shard_deleted = sum(m.content_length for m in expired)
-        bytes_deleted += shard_deleted
-        metrics_counter('commcare.temp_blobs.bytes_deleted', value=shard_deleted)
+        batch_bytes = sum(m.content_length for m in expired)
+        blobs_deleted += len(expired)
+        bytes_deleted += batch_bytes
+        metrics_counter('commcare.temp_blobs.bytes_deleted', value=batch_bytes)
+        metrics_counter('commcare.temp_blobs.count_deleted', value=len(expired), tags={'db': dbname})
+        if len(expired) < EXPIRED_BATCH_SIZE:
+            break
+        if time.monotonic() >= deadline:
+            return bytes_deleted, True
+        # pace deletes to the target rate
+        ahead = blobs_deleted / EXPIRED_DELETE_RATE - (time.monotonic() - started)
+        if ahead > 0:
+            time.sleep(ahead)
+    return bytes_deleted, False
 
-    if run_again:
-        delete_expired_blobs.delay()
 
-    return bytes_deleted
+def _get_expired_batch(dbname, now, last=None):
+    query = BlobMeta.objects.using(dbname).filter(
+        expires_on__isnull=False,
+        expires_on__lt=now,
+    )
+    if last is not None:
+        query = query.filter(
+            Q(expires_on__gt=last.expires_on)
+            | Q(expires_on=last.expires_on, id__gt=last.id)
+        )
+    return list(query.order_by("expires_on", "id")[:EXPIRED_BATCH_SIZE])
+
+
+@periodic_task(run_every=crontab(minute=30))
+def pack_small_blobs():
+    """Start packing small blobs concurrently in each partition db"""
+    if get_packing_config() is None:
+        return
+    for dbname in get_db_aliases_for_partitioned_query():
+        pack_small_blobs_in_db.delay(dbname)
+
+
+@task(queue=settings.CELERY_PERIODIC_QUEUE, ignore_result=True)
+def pack_small_blobs_in_db(dbname):
+    """Pack small blobs in a single partition db
+
+    Packing of a db that is already being packed is skipped.
+
+    :returns: Number of blobs packed.
+    """
+    config = get_packing_config()
+    if config is None:
+        return 0
+    lock_key = "pack-small-blobs-{}".format(dbname)
+    lock = get_redis_lock(lock_key, timeout=PACK_LOCK_TIMEOUT, name=lock_key)
+    if not lock.acquire(blocking=False):
+        return 0
+    try:
+        return pack_blobs(get_blob_db(), dbname, config)
+    finally:
+        release_lock(lock, True)
+
+
+@periodic_task(run_every=crontab(minute=0, hour=3))
+def compact_blob_segments():
+    config = get_packing_config()
+    if config is None:
+        return 0
+    return compact_segments(get_blob_db(), config)
 
 
 def _utcnow():
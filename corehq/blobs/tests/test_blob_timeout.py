@@ -6,9 +6,10 @@ from django.test import TestCase
 import corehq.blobs.tasks as mod
 from corehq.blobs import CODES
 from corehq.blobs.exceptions import NotFound
-from corehq.blobs.tasks import delete_expired_blobs
+from corehq.blobs.tasks import delete_expired_blobs, sweep_expired_blobs
 from corehq.blobs.tests.util import TemporaryFilesystemBlobDB
 from corehq.blobs.models import BlobMeta
+from corehq.sql_db.util import get_db_alias_for_partitioned_doc
 from corehq.util.test_utils import capture_log_output
 
 
@@ -47,7 +48,8 @@ class BlobExpireTest(TestCase):
 
             self.assertIsNotNone(self.db.get(key=self.key, type_code=CODES.tempfile))
             with patch('corehq.blobs.tasks._utcnow', return_value=now + timedelta(minutes=61)):
-                bytes_deleted = delete_expired_blobs()
+                dbname = get_db_alias_for_partitioned_doc(self.args["parent_id"])
+                bytes_deleted = sweep_expired_blobs(dbname)
 
             self.assertEqual(bytes_deleted, len('content'))
 
@@ -74,3 +76,19 @@ class BlobExpireTest(TestCase):
 
         self.assertIsNotNone(self.db.get(key=self.key, type_code=CODES.tempfile))
         self.assertEqual(manager.all().count(), pre_expire_count + 1)
+
+    def test_expired_blobs_are_deleted_in_batches(self):
+        now = datetime(2017, 1, 1)
+        keys = ['blob-batch-1', 'blob-batch-2', 'blob-batch-3']
+        with patch('corehq.blobs.metadata._utcnow', return_value=now):
+            for key in keys:
+                self.db.put(BytesIO(b'content'), timeout=60, **dict(self.args, key=key))
+
+        dbname = get_db_alias_for_partitioned_doc(self.args["parent_id"])
+        with patch('corehq.blobs.tasks._utcnow', return_value=now + timedelta(minutes=61)), \
+                patch.object(mod, 'EXPIRED_BATCH_SIZE', 2):
+            bytes_deleted = sweep_expired_blobs(dbname)
+
+        self.assertEqual(bytes_deleted, 3 * len('content'))
+        for key in keys:
+            self.assertFalse(self.db.exists(key=key))
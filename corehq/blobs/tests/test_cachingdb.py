@@ -0,0 +1,84 @@
+from io import BytesIO
+from os.path import exists
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from corehq.blobs.cachingdb import CachingBlobDB
+from corehq.blobs.tests.util import TemporaryFilesystemBlobDB, new_meta
+
+
+class TestCachingBlobDB(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.fsdb = TemporaryFilesystemBlobDB()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fsdb.close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.cache_dir = mkdtemp(prefix="blobcache")
+        self.addCleanup(rmtree, self.cache_dir)
+        self.db = CachingBlobDB(self.fsdb, self.cache_dir, max_size=100, max_blob_size=50)
+
+    def test_read_through(self):
+        meta = self.db.put(BytesIO(b"content"), meta=new_meta())
+        with self.db.get(meta=meta) as fh:
+            self.assertEqual(fh.read(), b"content")
+        self.assertTrue(exists(self.db.get_path(meta.key)))
+        with patch.object(self.fsdb, "get", side_effect=AssertionError("not cached")):
+            with self.db.get(meta=meta) as fh:
+                self.assertEqual(fh.read(), b"content")
+
+    def test_compressed_blob(self):
+        meta = self.db.put(BytesIO(b"<form/>"), meta=new_meta(compressed_length=-1))
+        self.assertTrue(meta.is_compressed)
+        for x in range(2):
+            with self.db.get(meta=meta) as fh:
+                self.assertEqual(fh.read(), b"<form/>")
+
+    def test_corrupt_entry_is_ignored(self):
+        meta = self.db.put(BytesIO(b"content"), meta=new_meta())
+        self.db.get(meta=meta).close()
+        with open(self.db.get_path(meta.key), "wb") as fh:
+            fh.write(b"cont")
+        with self.db.get(meta=meta) as fh:
+            self.assertEqual(fh.read(), b"content")
+
+    def test_large_blob_not_cached(self):
+        meta = self.db.put(BytesIO(b"x" * 60), meta=new_meta())
+        self.db.get(meta=meta).close()
+        self.assertFalse(exists(self.db.get_path(meta.key)))
+
+    def test_get_by_key_not_cached(self):
+        meta = self.db.put(BytesIO(b"content"), meta=new_meta())
+        with self.db.get(key=meta.key, type_code=meta.type_code) as fh:
+            self.assertEqual(fh.read(), b"content")
+        self.assertFalse(exists(self.db.get_path(meta.key)))
+
+    def test_delete_invalidates(self):
+        meta = self.db.put(BytesIO(b"content"), meta=new_meta())
+        self.db.get(meta=meta).close()
+        self.db.delete(key=meta.key)
+        self.assertFalse(exists(self.db.get_path(meta.key)))
+
+    def test_bulk_delete_invalidates(self):
+        metas = [self.db.put(BytesIO(b"content"), meta=new_meta()) for x in range(2)]
+        for meta in metas:
+            self.db.get(meta=meta).close()
+        self.db.bulk_delete(metas=metas)
+        for meta in metas:
+            self.assertFalse(exists(self.db.get_path(meta.key)))
+
+    def test_eviction(self):
+        metas = [self.db.put(BytesIO(b"x" * 40), meta=new_meta()) for x in range(3)]
+        for meta in metas:
+            self.db.get(meta=meta).close()
+        self.assertFalse(exists(self.db.get_path(metas[0].key)))
+        self.assertTrue(exists(self.db.get_path(metas[2].key)))
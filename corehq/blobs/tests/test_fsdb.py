@@ -35,6 +35,26 @@ class _BlobDBTests(object):
         with self.db.get(meta=meta) as fh:
             self.assertEqual(fh.read(), b"content")
 
+    def test_get_many(self):
+        metas = [self.db.put(BytesIO(b"content %d" % n), meta=self.new_meta()) for n in range(5)]
+        missing = self.new_meta(key="missing-blob")
+        results = {}
+        for meta, content in self.db.get_many(metas + [missing], max_workers=2):
+            if content is None:
+                results[meta.key] = None
+            else:
+                with content:
+                    results[meta.key] = content.read()
+        expected = {meta.key: b"content %d" % n for n, meta in enumerate(metas)}
+        expected[missing.key] = None
+        self.assertEqual(results, expected)
+
+    def test_get_many_compressed(self):
+        meta = self.db.put(BytesIO(b"<form/>"), meta=self.new_meta(type_code=CODES.form_xml))
+        [(result_meta, content)] = list(self.db.get_many([meta]))
+        with content:
+            self.assertEqual(content.read(), b"<form/>")
+
     def test_put_and_size(self):
         identifier = self.new_meta()
         with capture_metrics() as metrics:
@@ -0,0 +1,47 @@
+import time
+from threading import Lock
+
+from django.test import SimpleTestCase
+
+from corehq.blobs.interface import iter_concurrently_in_order
+
+
+class TestIterConcurrentlyInOrder(SimpleTestCase):
+
+    def test_results_are_in_item_order(self):
+        def func(n):
+            time.sleep((5 - n) * 0.01)  # first items complete last
+            return n * 10
+
+        results = list(iter_concurrently_in_order(func, range(6), max_workers=3))
+        self.assertEqual(results, [(n, n * 10) for n in range(6)])
+
+    def test_items_in_flight_are_bounded(self):
+        lock = Lock()
+        in_flight = []
+        max_in_flight = []
+
+        def func(n):
+            with lock:
+                in_flight.append(n)
+                max_in_flight.append(len(in_flight))
+            time.sleep(0.01)
+            with lock:
+                in_flight.remove(n)
+            return n
+
+        items = iter(range(10))
+        for item, result in iter_concurrently_in_order(func, items, max_workers=2):
+            self.assertEqual(item, result)
+        self.assertLessEqual(max(max_in_flight), 2)
+
+    def test_exceptions_propagate(self):
+        def func(n):
+            if n == 1:
+                raise ValueError(n)
+            return n
+
+        results = iter_concurrently_in_order(func, range(3), max_workers=2)
+        self.assertEqual(next(results), (0, 0))
+        with self.assertRaises(ValueError):
+            next(results)
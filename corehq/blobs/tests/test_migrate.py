@@ -2,9 +2,13 @@ import json
 import os
 from io import BytesIO
 from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
 
 import corehq.blobs.migrate as mod
+from corehq import blobs
 from corehq.blobs import get_blob_db, CODES
+from corehq.blobs.cachingdb import CachingBlobDB, get_backend_db
 from corehq.blobs.s3db import maybe_not_found
 from corehq.blobs.tests.util import (
     new_meta,
@@ -80,6 +84,18 @@ class TestMigrateBackend(TestCase):
             self.assertEqual(len(data), meta.content_length)
 
 
+class TestMigrateBackendWithCache(TestMigrateBackend):
+
+    def setUp(self):
+        super().setUp()
+        cache_dir = mkdtemp(prefix="blobcache")
+        self.addCleanup(rmtree, cache_dir)
+        caching_db = CachingBlobDB(self.db, cache_dir)
+        blobs._db.append(caching_db)
+        self.addCleanup(blobs._db.remove, caching_db)
+        assert get_backend_db(get_blob_db()) is self.db, get_blob_db()
+
+
 def verify_migration(test, slug, filename, not_founds):
     # verify: migration state recorded
     mod.BlobMigrationState.objects.get(slug=slug)
@@ -0,0 +1,158 @@
+import gzip
+import os
+from datetime import datetime, timedelta
+from io import BytesIO
+from os.path import exists
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from corehq.blobs import CODES
+from corehq.blobs.models import BlobPackingCheckpoint, BlobSegment
+from corehq.blobs.packing import PackingConfig, compact_segments, pack_blobs
+from corehq.blobs.tests.util import TemporaryFilesystemBlobDB, get_meta, new_meta
+from corehq.sql_db.util import get_db_alias_for_partitioned_doc
+
+
+class TestPacking(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.db = TemporaryFilesystemBlobDB()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.parent_id = "packing-parent"
+        self.dbname = get_db_alias_for_partitioned_doc(self.parent_id)
+        self.config = PackingConfig(
+            type_codes=[CODES.form_xml],
+            max_blob_size=100,
+            segment_size=20,
+            pack_after=timedelta(0),
+        )
+
+    def put_form(self, content):
+        return self.db.put(BytesIO(content), meta=new_meta(
+            parent_id=self.parent_id,
+            type_code=CODES.form_xml,
+            created_on=datetime.utcnow() - timedelta(minutes=1),
+        ))
+
+    def get_checkpoint(self):
+        return BlobPackingCheckpoint.objects.get(dbname=self.dbname, type_code=CODES.form_xml).last_id
+
+    def read(self, meta):
+        with self.db.get(meta=get_meta(meta)) as fh:
+            return fh.read()
+
+    def test_pack_blobs(self):
+        metas = [self.put_form(b"<form id='%d'/>" % n) for n in range(3)]
+        self.assertEqual(pack_blobs(self.db, self.dbname, self.config), 3)
+        self.assertGreaterEqual(self.get_checkpoint(), metas[-1].id)
+        for n, meta in enumerate(metas):
+            packed = get_meta(meta)
+            self.assertTrue(packed.is_packed)
+            self.assertFalse(exists(self.db.get_path(meta.key)))
+            self.assertEqual(self.read(meta), b"<form id='%d'/>" % n)
+
+    def test_get_many_packed(self):
+        meta = self.put_form(b"<form>" + b"x" * 20 + b"</form>")
+        pack_blobs(self.db, self.dbname, self.config)
+        [(meta, content)] = list(self.db.get_many([get_meta(meta)]))
+        with content:
+            self.assertEqual(content.read(), b"<form>" + b"x" * 20 + b"</form>")
+
+    @override_settings(BLOB_DB_PACKING={'type_codes': [CODES.form_xml]})
+    def test_key_based_access_to_packed_blob(self):
+        meta = self.put_form(b"<form>" + b"x" * 20 + b"</form>")
+        pack_blobs(self.db, self.dbname, self.config)
+        self.assertTrue(self.db.exists(meta.key))
+        self.assertEqual(self.db.size(meta.key), meta.stored_content_length)
+        with self.db.get(key=meta.key, type_code=CODES.maybe_compressed) as fh:
+            self.assertEqual(gzip.decompress(fh.read()), b"<form>" + b"x" * 20 + b"</form>")
+
+        self.assertTrue(self.db.delete(key=meta.key))
+        self.assertFalse(self.db.exists(meta.key))
+
+    @override_settings(BLOB_DB_PACKING=None)
+    def test_key_miss_without_packing(self):
+        with patch.object(self.db.metadb, 'get_packed') as get_packed:
+            self.assertFalse(self.db.exists("missing-key"))
+            self.assertFalse(self.db.delete(key="missing-key"))
+        get_packed.assert_not_called()
+
+    def test_excluded_blobs_are_not_packed(self):
+        large = self.put_form(os.urandom(300))  # incompressible
+        other = self.db.put(BytesIO(b"x" * 30), meta=new_meta(
+            parent_id=self.parent_id,
+            created_on=datetime.utcnow() - timedelta(minutes=1),
+        ))
+        expiring = self.db.put(BytesIO(b"x" * 30), meta=new_meta(
+            parent_id=self.parent_id,
+            type_code=CODES.form_xml,
+            created_on=datetime.utcnow() - timedelta(minutes=1),
+            expires_on=datetime.utcnow() + timedelta(days=1),
+        ))
+        self.assertEqual(pack_blobs(self.db, self.dbname, self.config), 0)
+        for meta in [large, other, expiring]:
+            self.assertFalse(get_meta(meta).is_packed)
+
+    def test_partial_segment_is_resumed(self):
+        self.config.segment_size = 1000
+        meta = self.put_form(b"<a/>")  # too small to fill a segment
+        self.assertEqual(pack_blobs(self.db, self.dbname, self.config), 0)
+        self.assertLess(self.get_checkpoint(), meta.id)
+
+    def test_old_partial_segment_is_flushed(self):
+        self.config.segment_size = 1000
+        meta = self.put_form(b"<a/>")  # too small to fill a segment
+        later = datetime.utcnow() + self.config.flush_after
+        with patch("corehq.blobs.packing._utcnow", return_value=later):
+            self.assertEqual(pack_blobs(self.db, self.dbname, self.config), 1)
+        self.assertTrue(get_meta(meta).is_packed)
+        self.assertGreaterEqual(self.get_checkpoint(), meta.id)
+
+    def test_delete_packed_blob(self):
+        meta = self.put_form(b"<form>" + b"x" * 20 + b"</form>")
+        pack_blobs(self.db, self.dbname, self.config)
+        self.db.bulk_delete(metas=[get_meta(meta)])
+        with self.assertRaises(type(meta).DoesNotExist):
+            get_meta(meta)
+
+    def test_compact_segments(self):
+        keep, drop = [self.put_form(b"<form>" + b"x" * 20 + b"</form>") for x in range(2)]
+        pack_blobs(self.db, self.dbname, self.config)
+        self.db.bulk_delete(metas=[get_meta(drop)])
+        old_key = get_meta(keep).segment_key
+        BlobSegment.objects.filter(key=old_key).update(length=1000)
+
+        self.assertGreaterEqual(compact_segments(self.db, self.config), 1)
+        new_key = get_meta(keep).segment_key
+        self.assertNotEqual(new_key, old_key)
+        self.assertEqual(self.read(keep), b"<form>" + b"x" * 20 + b"</form>")
+        self.assertIsNotNone(BlobSegment.objects.get(key=old_key).retired_on)
+
+        later = datetime.utcnow() + timedelta(days=2)
+        with patch("corehq.blobs.packing._utcnow", return_value=later):
+            compact_segments(self.db, self.config)
+        self.assertFalse(BlobSegment.objects.filter(key=old_key).exists())
+        self.assertFalse(exists(self.db.get_path(old_key)))
+        self.assertEqual(self.read(keep), b"<form>" + b"x" * 20 + b"</form>")
+
+    def test_segment_in_use_is_not_retired(self):
+        keep, drop = [self.put_form(b"<form>" + b"x" * 20 + b"</form>") for x in range(2)]
+        pack_blobs(self.db, self.dbname, self.config)
+        self.db.bulk_delete(metas=[get_meta(drop)])
+        old_key = get_meta(keep).segment_key
+        BlobSegment.objects.filter(key=old_key).update(length=1000)
+
+        with patch.object(self.db, "get_many", return_value=[]):  # content not found
+            self.assertEqual(compact_segments(self.db, self.config), 0)
+        self.assertEqual(get_meta(keep).segment_key, old_key)
+        self.assertIsNone(BlobSegment.objects.get(key=old_key).retired_on)
+        self.assertEqual(self.read(keep), b"<form>" + b"x" * 20 + b"</form>")
@@ -1,3 +1,5 @@
+from django.conf import settings
+
 from pillowtop.processors.elastic import send_to_elasticsearch as send_to_es
 
 from corehq.apps.es.client import ElasticManageAdapter, get_client
@@ -74,7 +76,10 @@ def _iter_es_docs(index_cname, ids):
 
 def iter_es_docs_from_query(query):
     """Returns all docs which match query"""
-    scroll_result = query.scroll_ids()
+    if sliced_scroll_supported() and settings.ES_EXPORT_SCROLL_SLICES > 1:
+        scroll_result = query.scroll_ids_sliced(settings.ES_EXPORT_SCROLL_SLICES)
+    else:
+        scroll_result = query.scroll_ids()
 
     def iter_export_docs():
         with TransientTempfile() as temp_path:
@@ -114,6 +119,50 @@ def scroll_query(index_cname, query, for_export=False, **kw):
         raise ESError(e)
 
 
+def sliced_scroll_query(index_cname, query, slices, for_export=False, **kw):
+    """Perform a sliced scrolling search, consuming ``slices`` scroll
+    contexts concurrently and yielding each doc (in no particular order)
+    until all of them are exhausted.
+
+    :param index_cname: Canonical (registered) name of index to search.
+    :param query: Dict, raw search query.
+    :param slices: Integer, number of slices to scroll concurrently.
+    :param for_export: See `corehq.apps.es.client.get_client()`
+    :param **kw: Additional scroll keyword arguments, see `scroll_query()`
+    """
+    index_info = registry_entry(index_cname)
+    adapter = doc_adapter_from_info(index_info, for_export=for_export)
+    yield from adapter.scroll_sliced(query, slices, **kw)
+
+
+def search_after_query(index_cname, query, for_export=False, **kw):
+    """Iterate over all docs matching a query using ``search_after``
+    pagination rather than a scroll context.
+
+    :param index_cname: Canonical (registered) name of index to search.
+    :param query: Dict, raw search query.
+    :param for_export: See `corehq.apps.es.client.get_client()`
+    :param **kw: Additional keyword arguments. Valid options:
+                 `size`: Integer, number of documents per page.
+    """
+    valid_kw = {"size"}
+    if not set(kw).issubset(valid_kw):
+        raise ValueError(f"invalid keyword args: {set(kw) - valid_kw}")
+    index_info = registry_entry(index_cname)
+    adapter = doc_adapter_from_info(index_info, for_export=for_export)
+    yield from adapter.search_after(query, **kw)
+
+
+def search_after_supported():
+    """``search_after`` pagination requires Elasticsearch 5 or later"""
+    return settings.ELASTICSEARCH_MAJOR_VERSION >= 5
+
+
+def sliced_scroll_supported():
+    """Sliced scrolls require Elasticsearch 5 or later"""
+    return settings.ELASTICSEARCH_MAJOR_VERSION >= 5
+
+
 def count_query(index_cname, q):
     index_info = registry_entry(index_cname)
     adapter = doc_adapter_from_info(index_info)
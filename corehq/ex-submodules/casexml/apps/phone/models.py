@@ -133,6 +133,9 @@ class OTARestoreUser(object):
     def get_fixture_data_items(self):
         raise NotImplementedError()
 
+    def get_fixture_data_item_ids(self):
+        raise NotImplementedError()
+
     def get_commtrack_location_id(self):
         raise NotImplementedError()
 
@@ -172,6 +175,9 @@ class OTARestoreWebUser(OTARestoreUser):
     def get_fixture_data_items(self):
         return []
 
+    def get_fixture_data_item_ids(self):
+        return set()
+
     def get_commtrack_location_id(self):
         return None
 
@@ -207,6 +213,11 @@ class OTARestoreCommCareUser(OTARestoreUser):
 
         return FixtureDataItem.by_user(self._couch_user)
 
+    def get_fixture_data_item_ids(self):
+        from corehq.apps.fixtures.models import FixtureDataItem
+
+        return FixtureDataItem.by_user(self._couch_user, include_docs=False)
+
     def get_commtrack_location_id(self):
         from corehq.apps.commtrack.util import get_commtrack_location_id
 
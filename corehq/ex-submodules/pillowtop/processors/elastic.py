@@ -166,12 +166,10 @@ class BulkElasticProcessor(ElasticProcessor, BulkPillowProcessor):
 
         try:
             with self._datadog_timing('bulk_load'):
-                _, errors = self.es_interface.bulk_ops(
+                _, errors = self.es_interface.bulk_concurrent(
                     self.index_info.alias,
                     self.index_info.type,
                     es_actions,
-                    raise_on_error=False,
-                    raise_on_exception=False,
                 )
         except Exception as e:
             pillow_logging.exception("Elastic bulk error: %s", e)
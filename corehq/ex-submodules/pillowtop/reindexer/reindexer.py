@@ -1,6 +1,6 @@
 from abc import ABCMeta, abstractmethod
 
-from corehq.util.es.elasticsearch import BulkIndexError, TransportError
+from corehq.util.es.elasticsearch import TransportError
 from corehq.util.es.interface import ElasticsearchInterface
 
 from pillowtop.es_utils import (
@@ -217,10 +217,10 @@ class BulkPillowReindexProcessor(BaseDocProcessor):
 
         es_interface = ElasticsearchInterface(self.es)
         try:
-            es_interface.bulk_ops(self.index_info.alias, self.index_info.type,
-                                  bulk_changes)
-        except BulkIndexError as e:
-            pillow_logging.error("Bulk index errors\n%s", e.errors)
+            _, errors = es_interface.bulk_concurrent(self.index_info.alias, self.index_info.type,
+                                                     bulk_changes)
+            if errors:
+                pillow_logging.error("Bulk index errors\n%s", errors)
         except Exception as exc:
             pillow_logging.exception("Error sending bulk payload to Elasticsearch: %s", exc)
             return False
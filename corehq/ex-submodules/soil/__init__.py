@@ -280,7 +280,8 @@ class BlobDownload(DownloadBase):
                  content_disposition='attachment; filename="download.txt"',
                  transfer_encoding=None, extras=None, download_id=None,
                  cache_backend=SOIL_DEFAULT_CACHE,
-                 content_type=None, owner_ids=None):
+                 content_type=None, owner_ids=None, blob_key=None,
+                 type_code=CODES.tempfile):
         super(BlobDownload, self).__init__(
             mimetype=content_type if content_type else mimetype,
             content_disposition=content_disposition,
@@ -291,6 +292,10 @@ class BlobDownload(DownloadBase):
             owner_ids=owner_ids,
         )
         self.identifier = identifier
+        # key of a blob that is not owned by this download (may be shared
+        # by many downloads). Defaults to the download id.
+        self.blob_key = blob_key
+        self.type_code = type_code
 
     def get_filename(self):
         return self.identifier
@@ -299,13 +304,17 @@ class BlobDownload(DownloadBase):
         raise NotImplementedError
 
     def toHttpResponse(self):
-        if self.download_id.startswith(self.new_id_prefix):
+        # getattr: downloads pickled before blob_key was added don't have it
+        if getattr(self, "blob_key", None):
+            blob_key = self.blob_key
+        elif self.download_id.startswith(self.new_id_prefix):
             blob_key = self.download_id
         else:
             # legacy key; remove after all legacy blob downloads have expired
             blob_key = "_default/" + self.identifier
         blob_db = get_blob_db()
-        file_obj = blob_db.get(key=blob_key, type_code=CODES.tempfile)
+        type_code = getattr(self, "type_code", CODES.tempfile)
+        file_obj = blob_db.get(key=blob_key, type_code=type_code)
 
         response = StreamingHttpResponse(
             FileWrapper(file_obj, CHUNK_SIZE),
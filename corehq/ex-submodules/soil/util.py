@@ -54,9 +54,13 @@ def expose_blob_download(
         mimetype='text/plain',
         content_disposition=None,
         download_id=None,
-        owner_ids=None):
+        owner_ids=None,
+        **blob_kwargs):
     """
     Expose a blob object for download
+
+    :param blob_kwargs: `blob_key` and `type_code` of a blob that is not
+    keyed by the download id. See `BlobDownload`.
     """
     # TODO add file parameter and refactor blob_db.put(...) into this method
     ref = BlobDownload(
@@ -65,6 +69,7 @@ def expose_blob_download(
         content_disposition=content_disposition,
         download_id=download_id,
         owner_ids=owner_ids,
+        **blob_kwargs
     )
     ref.save(expiry)
     return ref
@@ -21,6 +21,7 @@ from casexml.apps.case.xml import V2
 from casexml.apps.case.xml.parser import KNOWN_PROPERTIES
 
 from corehq import toggles
+from corehq.apps.case_search.cache import invalidate_case_type_change
 from corehq.form_processor.exceptions import StockProcessingError
 from corehq.form_processor.models import (
     CaseAttachment,
@@ -160,6 +161,8 @@ class SqlCaseUpdateStrategy(UpdateStrategy):
     def _update_known_properties(self, action):
         for name, value in action.get_known_properties().items():
             if value is not None:
+                if name == 'type' and self.case.type and value != self.case.type and self.case.is_saved():
+                    invalidate_case_type_change(self.case.domain, self.case.type)
                 setattr(self.case, name, _convert_type_check_length(name, value))
 
     def _apply_create_action(self, case_update, create_action):
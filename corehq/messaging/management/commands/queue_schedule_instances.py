@@ -10,18 +10,23 @@ from corehq.messaging.scheduling.scheduling_partitioned.models import (
     CaseTimedScheduleInstance,
 )
 from corehq.messaging.scheduling.tasks import (
-    handle_alert_schedule_instance,
-    handle_timed_schedule_instance,
+    handle_alert_schedule_instance_batch,
+    handle_timed_schedule_instance_batch,
     handle_case_alert_schedule_instance,
     handle_case_timed_schedule_instance,
 )
 from corehq.sql_db.util import handle_connection_failure, get_default_and_partitioned_db_aliases
+from collections import defaultdict
 from datetime import datetime
+from dimagi.utils.chunked import chunked
 from dimagi.utils.couch import get_redis_lock
 from dimagi.utils.logging import notify_exception
 from django.core.management.base import BaseCommand
 from time import sleep
 
+# number of alert or timed schedule instances handled by one task
+BATCH_SIZE = 100
+
 
 def skip_domain(domain):
     return any_migrations_in_progress(domain)
@@ -34,13 +39,18 @@ class Command(BaseCommand):
     consumes from the reminder_queue. This is ok because this process uses
     locks to ensure items are only enqueued once, and it's what is desired
     in order to more efficiently spawn the needed celery tasks.
+
+    Due alert and timed schedule instances are grouped by domain and
+    handled in batches, so that a broadcast to many recipients doesn't
+    spawn one task per recipient. Case schedule instances are handled
+    one per task because they lock on their case.
     """
     help = "Spawns tasks to process schedule instances"
 
     def get_task(self, cls):
         task = {
-            AlertScheduleInstance: handle_alert_schedule_instance,
-            TimedScheduleInstance: handle_timed_schedule_instance,
+            AlertScheduleInstance: handle_alert_schedule_instance_batch,
+            TimedScheduleInstance: handle_timed_schedule_instance_batch,
             CaseAlertScheduleInstance: handle_case_alert_schedule_instance,
             CaseTimedScheduleInstance: handle_case_timed_schedule_instance,
         }.get(cls)
@@ -66,6 +76,7 @@ class Command(BaseCommand):
     @handle_connection_failure(get_db_aliases=get_default_and_partitioned_db_aliases)
     def create_tasks(self):
         for cls in (AlertScheduleInstance, TimedScheduleInstance):
+            batches = defaultdict(list)
             for domain, schedule_instance_id, next_event_due in get_active_schedule_instance_ids(
                     cls, datetime.utcnow()):
                 if skip_domain(domain):
@@ -75,7 +86,11 @@ class Command(BaseCommand):
                 # that we only retry non-processed schedule instances once an hour.
                 enqueue_lock = self.get_enqueue_lock(cls, schedule_instance_id, next_event_due)
                 if enqueue_lock.acquire(blocking=False):
-                    self.get_task(cls).delay(schedule_instance_id.hex, domain)
+                    batches[domain].append(schedule_instance_id.hex)
+
+            for domain, schedule_instance_ids in batches.items():
+                for batch in chunked(schedule_instance_ids, BATCH_SIZE):
+                    self.get_task(cls).delay(list(batch), domain)
 
         for cls in (CaseAlertScheduleInstance, CaseTimedScheduleInstance):
             for domain, case_id, schedule_instance_id, next_event_due in get_active_case_schedule_instance_ids(
@@ -5,6 +5,7 @@ from django.db.models import Q
 from corehq.sql_db.util import (
     get_db_aliases_for_partitioned_query,
     paginate_query_across_partitioned_databases,
+    split_list_by_db_partition,
 )
 from corehq.util.metrics.load_counters import load_counter_for_model
 
@@ -35,6 +36,25 @@ def get_timed_schedule_instance(schedule_instance_id):
     return TimedScheduleInstance.objects.partitioned_get(schedule_instance_id)
 
 
+def get_alert_schedule_instances(schedule_instance_ids):
+    """Instances for all of schedule_instance_ids, with one query per shard"""
+    from corehq.messaging.scheduling.scheduling_partitioned.models import AlertScheduleInstance
+    return _get_schedule_instances(AlertScheduleInstance, schedule_instance_ids)
+
+
+def get_timed_schedule_instances(schedule_instance_ids):
+    """Instances for all of schedule_instance_ids, with one query per shard"""
+    from corehq.messaging.scheduling.scheduling_partitioned.models import TimedScheduleInstance
+    return _get_schedule_instances(TimedScheduleInstance, schedule_instance_ids)
+
+
+def _get_schedule_instances(model_class, schedule_instance_ids):
+    for schedule_instance_id in schedule_instance_ids:
+        _validate_uuid(schedule_instance_id)
+    for db_name, ids_chunk in split_list_by_db_partition(schedule_instance_ids):
+        yield from model_class.objects.using(db_name).filter(schedule_instance_id__in=ids_chunk)
+
+
 def save_alert_schedule_instance(instance):
     from corehq.messaging.scheduling.scheduling_partitioned.models import AlertScheduleInstance
 
@@ -51,6 +71,32 @@ def save_timed_schedule_instance(instance):
     instance.save()
 
 
+def save_alert_schedule_instances(instances):
+    """Save changes to instances, with one query per shard"""
+    from corehq.messaging.scheduling.scheduling_partitioned.models import AlertScheduleInstance
+    _save_schedule_instances(AlertScheduleInstance, instances)
+
+
+def save_timed_schedule_instances(instances):
+    """Save changes to instances, with one query per shard"""
+    from corehq.messaging.scheduling.scheduling_partitioned.models import TimedScheduleInstance
+    _save_schedule_instances(TimedScheduleInstance, instances)
+
+
+def _save_schedule_instances(model_class, instances):
+    instances_by_id = {}
+    for instance in instances:
+        _validate_class(instance, model_class)
+        _validate_uuid(instance.schedule_instance_id)
+        instances_by_id[instance.schedule_instance_id] = instance
+    fields = [field.name for field in model_class._meta.concrete_fields if not field.primary_key]
+    for db_name, ids_chunk in split_list_by_db_partition(instances_by_id):
+        model_class.objects.using(db_name).bulk_update(
+            [instances_by_id[schedule_instance_id] for schedule_instance_id in ids_chunk],
+            fields,
+        )
+
+
 def delete_alert_schedule_instance(instance):
     from corehq.messaging.scheduling.scheduling_partitioned.models import AlertScheduleInstance
 
@@ -274,6 +320,25 @@ def get_case_timed_schedule_instances_for_schedule(case_id, schedule):
     return get_case_timed_schedule_instances_for_schedule_id(case_id, schedule.schedule_id)
 
 
+def get_case_alert_schedule_instances_for_cases(case_ids, schedule_id):
+    """Instances of the schedule for all of case_ids, with one query per shard"""
+    from corehq.messaging.scheduling.scheduling_partitioned.models import CaseAlertScheduleInstance
+    return _get_case_schedule_instances_for_cases(
+        CaseAlertScheduleInstance, case_ids, alert_schedule_id=schedule_id)
+
+
+def get_case_timed_schedule_instances_for_cases(case_ids, schedule_id):
+    """Instances of the schedule for all of case_ids, with one query per shard"""
+    from corehq.messaging.scheduling.scheduling_partitioned.models import CaseTimedScheduleInstance
+    return _get_case_schedule_instances_for_cases(
+        CaseTimedScheduleInstance, case_ids, timed_schedule_id=schedule_id)
+
+
+def _get_case_schedule_instances_for_cases(model_class, case_ids, **filters):
+    for db_name, case_ids_chunk in split_list_by_db_partition(case_ids):
+        yield from model_class.objects.using(db_name).filter(case_id__in=case_ids_chunk, **filters)
+
+
 def get_case_schedule_instance(cls, case_id, schedule_instance_id):
     from corehq.messaging.scheduling.scheduling_partitioned.models import (
         CaseAlertScheduleInstance,
@@ -373,14 +373,25 @@ class ScheduleInstance(PartitionedModel):
     def schedule(self, value):
         raise NotImplementedError()
 
+    _memoized_schedule = None
+
     @property
-    @memoized
     def memoized_schedule(self):
         """
         This is named with a memoized_ prefix to be clear that it should only be used
         when the schedule is not changing.
         """
-        return self.schedule
+        if self._memoized_schedule is None:
+            self._memoized_schedule = self.schedule
+        return self._memoized_schedule
+
+    @memoized_schedule.setter
+    def memoized_schedule(self, value):
+        """
+        Set the schedule to use, so that instances of the same schedule
+        that are handled together can share its events and content.
+        """
+        self._memoized_schedule = value
 
     def additional_deactivation_condition_reached(self):
         """
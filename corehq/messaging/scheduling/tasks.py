@@ -5,7 +5,9 @@ from django.conf import settings
 
 from celery.task import task
 
+from dimagi.utils.chunked import chunked
 from dimagi.utils.couch import CriticalSection
+from dimagi.utils.logging import notify_exception
 
 from corehq.messaging.scheduling.models import (
     AlertSchedule,
@@ -21,15 +23,19 @@ from corehq.messaging.scheduling.scheduling_partitioned.dbaccessors import (
     delete_timed_schedule_instance,
     delete_timed_schedule_instances_for_schedule,
     get_alert_schedule_instance,
+    get_alert_schedule_instances,
     get_alert_schedule_instances_for_schedule,
     get_case_alert_schedule_instances_for_schedule,
     get_case_schedule_instance,
     get_case_timed_schedule_instances_for_schedule,
     get_timed_schedule_instance,
+    get_timed_schedule_instances,
     get_timed_schedule_instances_for_schedule,
     save_alert_schedule_instance,
+    save_alert_schedule_instances,
     save_case_schedule_instance,
     save_timed_schedule_instance,
+    save_timed_schedule_instances,
 )
 from corehq.messaging.scheduling.scheduling_partitioned.models import (
     AlertScheduleInstance,
@@ -41,6 +47,9 @@ from corehq.messaging.scheduling.scheduling_partitioned.models import (
 from corehq.util.celery_utils import no_result_task
 from corehq.util.dates import iso_string_to_date
 
+# schedule instances of a batch that are locked and saved together
+SCHEDULE_INSTANCE_LOCK_CHUNK_SIZE = 10
+
 
 class ScheduleInstanceRefresher(object):
 
@@ -392,7 +401,7 @@ def handle_case_alert_schedule_instance_reset(instance, schedule, reset_case_pro
     return False
 
 
-def refresh_case_alert_schedule_instances(case, schedule, action_definition, rule):
+def refresh_case_alert_schedule_instances(case, schedule, action_definition, rule, existing_instances=None):
     """
     :param case: the CommCareCase/SQL
     :param schedule: the AlertSchedule
@@ -400,18 +409,23 @@ def refresh_case_alert_schedule_instances(case, schedule, action_definition, rul
     causing the schedule instances to be refreshed
     :param rule: the AutomaticUpdateRule that is causing the schedule instances
     to be refreshed
+    :param existing_instances: the case's instances of the schedule, if they
+    have already been loaded; they are queried if None
     """
+    if existing_instances is None:
+        existing_instances = get_case_alert_schedule_instances_for_schedule(case.case_id, schedule)
     CaseAlertScheduleInstanceRefresher(
         case,
         action_definition,
         rule,
         schedule,
         action_definition.recipients,
-        get_case_alert_schedule_instances_for_schedule(case.case_id, schedule)
+        existing_instances
     ).refresh()
 
 
-def refresh_case_timed_schedule_instances(case, schedule, action_definition, rule, start_date=None):
+def refresh_case_timed_schedule_instances(case, schedule, action_definition, rule, start_date=None,
+                                          existing_instances=None):
     """
     :param case: the CommCareCase/SQL
     :param schedule: the TimedSchedule
@@ -420,14 +434,18 @@ def refresh_case_timed_schedule_instances(case, schedule, action_definition, rul
     :param rule: the AutomaticUpdateRule that is causing the schedule instances
     to be refreshed
     :param start_date: the date to start the TimedSchedule
+    :param existing_instances: the case's instances of the schedule, if they
+    have already been loaded; they are queried if None
     """
+    if existing_instances is None:
+        existing_instances = get_case_timed_schedule_instances_for_schedule(case.case_id, schedule)
     CaseTimedScheduleInstanceRefresher(
         case,
         action_definition,
         rule,
         schedule,
         action_definition.recipients,
-        get_case_timed_schedule_instances_for_schedule(case.case_id, schedule),
+        existing_instances,
         start_date=start_date
     ).refresh()
 
@@ -500,6 +518,77 @@ def handle_timed_schedule_instance(schedule_instance_id, domain):
             update_broadcast_last_sent_timestamp(ScheduledBroadcast, instance.timed_schedule_id)
 
 
+@no_result_task(queue='reminder_queue')
+def handle_alert_schedule_instance_batch(schedule_instance_ids, domain):
+    _handle_schedule_instance_batch(
+        schedule_instance_ids,
+        lock_key_format='handle-alert-schedule-instance-%s',
+        get_instances=get_alert_schedule_instances,
+        save_instances=save_alert_schedule_instances,
+        schedule_class=AlertSchedule,
+        schedule_id_attr='alert_schedule_id',
+        broadcast_class=ImmediateBroadcast,
+    )
+
+
+@no_result_task(queue='reminder_queue')
+def handle_timed_schedule_instance_batch(schedule_instance_ids, domain):
+    _handle_schedule_instance_batch(
+        schedule_instance_ids,
+        lock_key_format='handle-timed-schedule-instance-%s',
+        get_instances=get_timed_schedule_instances,
+        save_instances=save_timed_schedule_instances,
+        schedule_class=TimedSchedule,
+        schedule_id_attr='timed_schedule_id',
+        broadcast_class=ScheduledBroadcast,
+    )
+
+
+def _handle_schedule_instance_batch(schedule_instance_ids, lock_key_format, get_instances,
+                                    save_instances, schedule_class, schedule_id_attr, broadcast_class):
+    """
+    Handle due schedule instances together. Instances of the same schedule
+    share one schedule object, and so its events and content.
+
+    Instances are locked, loaded and saved a few at a time, so that changes
+    to them are saved soon after their events are handled. Uses the same
+    lock keys as the tasks which handle one instance, sorted so that
+    overlapping batches can't deadlock.
+    """
+    schedule_instance_uuids = sorted(uuid.UUID(schedule_instance_id)
+                                     for schedule_instance_id in schedule_instance_ids)
+    schedules = {}
+    for instance_uuids in chunked(schedule_instance_uuids, SCHEDULE_INSTANCE_LOCK_CHUNK_SIZE, list):
+        lock_keys = [lock_key_format % instance_uuid.hex for instance_uuid in instance_uuids]
+        with CriticalSection(lock_keys, timeout=5 * 60):
+            instances = list(get_instances(instance_uuids))
+            schedule_ids = {getattr(instance, schedule_id_attr) for instance in instances}
+            schedules.update(schedule_class.objects.in_bulk(schedule_ids - set(schedules)))
+
+            instances_to_save = []
+            handled_schedule_ids = set()
+            try:
+                for instance in instances:
+                    schedule_id = getattr(instance, schedule_id_attr)
+                    if schedule_id in schedules:
+                        instance.memoized_schedule = schedules[schedule_id]
+
+                    try:
+                        if _handle_schedule_instance(instance, instances_to_save.append):
+                            handled_schedule_ids.add(schedule_id)
+                    except Exception:
+                        # Failed instances are retried by the framework, don't let
+                        # one of them hold up the rest of the batch.
+                        notify_exception(None, "Error handling schedule instance", details={
+                            'schedule_instance_id': instance.schedule_instance_id.hex,
+                            'domain': instance.domain,
+                        })
+            finally:
+                save_instances(instances_to_save)
+                for schedule_id in handled_schedule_ids:
+                    update_broadcast_last_sent_timestamp(broadcast_class, schedule_id)
+
+
 @no_result_task(queue='reminder_queue')
 def handle_case_alert_schedule_instance(case_id, schedule_instance_id, domain):
     schedule_instance_uuid = uuid.UUID(schedule_instance_id)
@@ -26,6 +26,7 @@ from corehq.messaging.scheduling.scheduling_partitioned.dbaccessors import (
     get_alert_schedule_instances_for_schedule,
     get_timed_schedule_instances_for_schedule,
     save_alert_schedule_instance,
+    save_alert_schedule_instances,
     save_timed_schedule_instance,
 )
 from corehq.messaging.scheduling.scheduling_partitioned.models import (
@@ -34,6 +35,7 @@ from corehq.messaging.scheduling.scheduling_partitioned.models import (
     TimedScheduleInstance,
 )
 from corehq.messaging.scheduling.tasks import (
+    handle_alert_schedule_instance_batch,
     refresh_alert_schedule_instances,
     refresh_timed_schedule_instances,
 )
@@ -454,6 +456,73 @@ class DeleteScheduleInstancesTest(BaseScheduleTest):
         self.assertEqual(self.count(get_timed_schedule_instances_for_schedule(self.timed_schedule_2)), 0)
 
 
+@sharded
+@patch('corehq.messaging.scheduling.models.content.SMSContent.send')
+class HandleScheduleInstanceBatchTest(BaseScheduleTest):
+
+    def setUp(self):
+        super(HandleScheduleInstanceBatchTest, self).setUp()
+        self.schedule = AlertSchedule.create_simple_alert(self.domain, SMSContent())
+        self.deleted_schedule = AlertSchedule.create_simple_alert(self.domain, SMSContent())
+
+    def tearDown(self):
+        for schedule in (self.schedule, self.deleted_schedule):
+            delete_alert_schedule_instances_for_schedule(AlertScheduleInstance, schedule.schedule_id)
+            schedule.delete()
+        super(HandleScheduleInstanceBatchTest, self).tearDown()
+
+    def test_handle_alert_schedule_instance_batch(self, send_patch):
+        refresh_alert_schedule_instances(
+            self.schedule.schedule_id.hex,
+            (('CommCareUser', self.user1.get_id), ('CommCareUser', self.user2.get_id))
+        )
+        refresh_alert_schedule_instances(
+            self.deleted_schedule.schedule_id.hex,
+            (('CommCareUser', self.user1.get_id),)
+        )
+        self.deleted_schedule.deleted = True
+        self.deleted_schedule.save()
+        instances = (
+            list(get_alert_schedule_instances_for_schedule(self.schedule))
+            + list(get_alert_schedule_instances_for_schedule(self.deleted_schedule))
+        )
+        self.assertEqual(len(instances), 3)
+
+        handle_alert_schedule_instance_batch(
+            [instance.schedule_instance_id.hex for instance in instances],
+            self.domain,
+        )
+
+        self.assertEqual(send_patch.call_count, 2)
+        instances = list(get_alert_schedule_instances_for_schedule(self.schedule))
+        self.assertEqual(
+            {instance.recipient_id for instance in instances},
+            {self.user1.get_id, self.user2.get_id},
+        )
+        for instance in instances:
+            self.assertEqual(instance.schedule_iteration_num, 2)
+            self.assertFalse(instance.active)
+        self.assertEqual(list(get_alert_schedule_instances_for_schedule(self.deleted_schedule)), [])
+
+    def test_instances_are_saved_after_each_chunk(self, send_patch):
+        refresh_alert_schedule_instances(
+            self.schedule.schedule_id.hex,
+            (('CommCareUser', self.user1.get_id), ('CommCareUser', self.user2.get_id))
+        )
+        instances = list(get_alert_schedule_instances_for_schedule(self.schedule))
+
+        with patch('corehq.messaging.scheduling.tasks.SCHEDULE_INSTANCE_LOCK_CHUNK_SIZE', 1), \
+                patch('corehq.messaging.scheduling.tasks.save_alert_schedule_instances',
+                      wraps=save_alert_schedule_instances) as save_patch:
+            handle_alert_schedule_instance_batch(
+                [instance.schedule_instance_id.hex for instance in instances],
+                self.domain,
+            )
+
+        self.assertEqual(send_patch.call_count, 2)
+        self.assertEqual([len(call.args[0]) for call in save_patch.call_args_list], [1, 1])
+
+
 @sharded
 @patch('corehq.messaging.scheduling.models.content.SMSContent.send')
 @patch('corehq.messaging.scheduling.util.utcnow')
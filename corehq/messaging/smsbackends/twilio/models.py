@@ -78,8 +78,7 @@ class SQLTwilioBackend(SQLSMSBackend, PhoneLoadBalancingMixin):
             raise Exception("Expected orig_phone_number to be passed for all "
                             "instances of PhoneLoadBalancingMixin")
 
-        config = self.config
-        client = Client(config.account_sid, config.auth_token)
+        client = kwargs.get('client') or self._get_twilio_client()
         to = msg.phone_number
         msg.system_phone_number = orig_phone_number
         if toggles.WHATSAPP_MESSAGING.enabled(msg.domain) and not kwargs.get('skip_whatsapp', False):
@@ -122,6 +121,11 @@ class SQLTwilioBackend(SQLSMSBackend, PhoneLoadBalancingMixin):
         msg.backend_message_id = message.sid
         msg.save()
 
+    def send_many(self, messages, orig_phone_numbers=None, **kwargs):
+        # share one client, and its connection pool, between the messages
+        kwargs['client'] = self._get_twilio_client()
+        return super().send_many(messages, orig_phone_numbers, **kwargs)
+
     def from_or_messaging_service_sid(self, phone_number: str) -> (Optional[str], Optional[str]):
         if self.phone_number_is_messaging_service_sid(phone_number):
             return None, phone_number
@@ -1,3 +1,5 @@
+from contextlib import nullcontext
+
 from django.conf import settings
 from django.db import transaction
 from django.db.models import Q
@@ -24,6 +26,9 @@ from corehq.util.celery_utils import no_result_task
 from corehq.util.metrics.load_counters import case_load_counter
 
 
+SYNC_LOCK_CHUNK_SIZE = 10
+
+
 def get_sync_key(case_id):
     return 'sync-case-for-messaging-%s' % case_id
 
@@ -50,12 +55,19 @@ def sync_case_for_messaging_rule(self, domain, case_id, rule_id):
 
 @no_result_task(queue=settings.CELERY_REMINDER_CASE_UPDATE_BULK_QUEUE, acks_late=True)
 def sync_case_chunk_for_messaging_rule(domain, case_id_chunk, rule_id):
-    for case_id in case_id_chunk:
+    # cases are locked a few at a time so that sync_case_for_messaging is not
+    # held up for the whole chunk, and are loaded once they are locked
+    failed_case_ids = []
+    for case_ids in chunked(case_id_chunk, SYNC_LOCK_CHUNK_SIZE, list):
+        sync_keys = [get_sync_key(case_id) for case_id in sorted(case_ids)]
         try:
-            with CriticalSection([get_sync_key(case_id)], timeout=5 * 60):
-                _sync_case_for_messaging_rule(domain, case_id, rule_id)
+            with CriticalSection(sync_keys, timeout=5 * 60):
+                failed_case_ids.extend(_sync_case_chunk_for_messaging_rule(domain, case_ids, rule_id))
         except Exception:
-            sync_case_for_messaging_rule.delay(domain, case_id, rule_id)
+            failed_case_ids.extend(case_ids)
+
+    for case_id in failed_case_ids:
+        sync_case_for_messaging_rule.delay(domain, case_id, rule_id)
 
 
 def _sync_case_for_messaging(domain, case_id):
@@ -109,6 +121,36 @@ def _sync_case_for_messaging_rule(domain, case_id, rule_id):
         MessagingRuleProgressHelper(rule_id).increment_current_case_count()
 
 
+def _sync_case_chunk_for_messaging_rule(domain, case_ids, rule_id):
+    """
+    Bulk version of _sync_case_for_messaging_rule. The cases, and the
+    rule's schedule instances for them, are loaded with one query per shard.
+
+    :return: ids of the cases that failed to sync
+    """
+    case_load_counter("messaging_rule_sync", domain)(len(case_ids))
+    cases = {case.case_id: case for case in CommCareCase.objects.get_cases(case_ids, domain)}
+    rule = _get_cached_rule(domain, rule_id)
+    now = utcnow()
+    failed_case_ids = []
+    synced_count = 0
+    with rule.prefetch_schedule_instances(list(cases)) if rule else nullcontext():
+        for case_id in case_ids:
+            try:
+                case = cases.get(case_id)
+                if case is None:
+                    clear_messaging_for_case(domain, case_id)
+                elif rule:
+                    rule.run_rule(case, now)
+                    synced_count += 1
+            except Exception:
+                failed_case_ids.append(case_id)
+
+    if synced_count:
+        MessagingRuleProgressHelper(rule_id).increment_current_case_count(amount=synced_count)
+    return failed_case_ids
+
+
 def initiate_messaging_rule_run(rule):
     if not rule.active:
         return
@@ -79,9 +79,9 @@ class MessagingRuleProgressHelper(object):
     def set_rule_complete(self):
         self.clear_rule_initiation_key()
 
-    def increment_current_case_count(self, fail_hard=False):
+    def increment_current_case_count(self, fail_hard=False, amount=1):
         try:
-            self.client.incr(self.current_key)
+            self.client.incr(self.current_key, amount)
             self.client.expire(self.current_key, self.key_expiry)
         except Exception:
             if fail_hard:
@@ -3,6 +3,7 @@ from datetime import datetime
 from django.core.mail import mail_admins
 from django.db import ProgrammingError
 
+from corehq.apps.case_search.cache import invalidate_case_search_cache
 from corehq.apps.case_search.const import (
     INDEXED_ON,
     SPECIAL_CASE_PROPERTIES_MAP,
@@ -29,6 +30,7 @@ from corehq.pillows.mappings.case_search_mapping import (
 from corehq.toggles import (
     CASE_API_V0_6,
     CASE_LIST_EXPLORER,
+    CASE_SEARCH_RESULT_CACHE,
     ECD_MIGRATED_DOMAINS,
     EXPLORE_CASE_DATA,
     USH_CASE_CLAIM_UPDATES,
@@ -141,6 +143,11 @@ class CaseSearchPillowProcessor(ElasticProcessor):
 
         if domain and domain_needs_search_index(domain):
             super(CaseSearchPillowProcessor, self).process_change(change)
+            # Reindexes don't change cases. Results for the type a case was
+            # changed from are invalidated when the case is updated.
+            if change.metadata is not None and CASE_SEARCH_RESULT_CACHE.enabled(domain):
+                doc = change.get_document()
+                invalidate_case_search_cache(domain, doc.get('type') if doc else None)
 
 
 def get_case_search_processor():
@@ -956,6 +956,17 @@ USH_USERCASES_FOR_WEB_USERS = StaticToggle(
     Toggle to enable the creation of usercases for web users."""
 )
 
+CASE_SEARCH_RESULT_CACHE = StaticToggle(
+    'case_search_result_cache',
+    'Cache case search results for repeated identical queries',
+    TAG_INTERNAL,
+    namespaces=[NAMESPACE_DOMAIN],
+    description="""
+    Cache the results of case search queries for a short time. Cached results are invalidated by
+    the case search pillow when a case of a searched case type changes in the project.
+    """,
+)
+
 WEBAPPS_STICKY_SEARCH = StaticToggle(
     "webapps_sticky_search",
     "USH: Sticky search: In web apps, save user's most recent inputs on case search & claim screen.",
@@ -82,6 +82,10 @@ class ElasticsearchInterface:
         doc_adapter = self._get_doc_adapter(index_alias, doc_type)
         return doc_adapter.bulk(actions, **kwargs)
 
+    def bulk_concurrent(self, index_alias, doc_type, actions, **kwargs):
+        doc_adapter = self._get_doc_adapter(index_alias, doc_type)
+        return doc_adapter.bulk_concurrent(actions, **kwargs)
+
     def search(self, index_alias, doc_type, body=None, **kwargs):
         self._verify_is_alias(index_alias)
         doc_adapter = self._get_doc_adapter(index_alias, doc_type)
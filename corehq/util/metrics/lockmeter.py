@@ -46,6 +46,18 @@ class MeteredLock(object):
                 self.lock_trace.set_tags({"key": self.key, "name": self.name})
         return acquired
 
+    def reacquire(self):
+        """Reset the timeout of an acquired lock
+
+        Raises an error if the lock is no longer owned (see
+        `redis.lock.Lock.reacquire`).
+        """
+        result = self.lock.reacquire()
+        timeout = getattr(self.lock, "timeout", None)
+        if timeout:
+            self.end_time = time.time() + timeout
+        return result
+
     def release(self):
         self.lock.release()
         if self.lock_timer.is_started():
@@ -75,6 +75,15 @@ class TestMeteredLock(TestCase):
             lock.release()
         self.assertEqual(1, len(metrics.list("commcare.lock.released_after_timeout", lock_name='test')), metrics)
 
+    def test_reacquire_resets_timeout(self):
+        lock = MeteredLock(FakeLock(timeout=-1), "test")
+        lock.acquire()
+        lock.lock.timeout = 60
+        self.assertTrue(lock.reacquire())
+        with capture_metrics() as metrics:
+            lock.release()
+        self.assertFalse(metrics.list("commcare.lock.released_after_timeout"), metrics)
+
     def test_lock_without_timeout(self):
         fake = FakeLock()
         del fake.timeout
@@ -167,5 +176,8 @@ class FakeLock(object):
         self.locked = True
         return blocking
 
+    def reacquire(self):
+        return self.locked
+
     def release(self):
         self.locked = False
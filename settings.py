@@ -546,6 +546,14 @@ RESTORE_PAYLOAD_DIR_NAME = None
 SHARED_TEMP_DIR_NAME = None
 SHARED_BLOB_DIR_NAME = 'blobdb'
 
+# Optional node-local cache for blob db reads (see corehq.blobs.cachingdb)
+# Example: {"cache_dir": "/opt/blobcache", "max_size": 2 * 1024 ** 3}
+BLOB_DB_LOCAL_CACHE = None
+
+# Optional packing of small blobs into segment objects (see corehq.blobs.packing)
+# Example: {"type_codes": [2], "max_blob_size": 64 * 1024}
+BLOB_DB_PACKING = None
+
 ## django-transfer settings
 # These settings must match the apache / nginx config
 TRANSFER_SERVER = None  # 'apache' or 'nginx'
@@ -660,6 +668,11 @@ SMS_QUEUE_DOMAIN_RESTRICTED_RETRY_INTERVAL = 15
 # messages will not be processed.
 SMS_QUEUE_STALE_MESSAGE_DURATION = 7 * 24
 
+# Max number of due outgoing SMS for one domain that are processed together
+# in one task, checking limits in bulk and sending with the backend's
+# send_many(). Set this to 1 to process each SMS in its own task.
+SMS_QUEUE_BATCH_SIZE = 1
+
 
 ####### Reminders Queue Settings #######
 
@@ -850,6 +863,9 @@ ELASTICSEARCH_PORT = 9200
 ELASTICSEARCH_MAJOR_VERSION = 2
 # If elasticsearch queries take more than this, they result in timeout errors
 ES_SEARCH_TIMEOUT = 30
+# Number of concurrent scroll slices used to collect doc IDs for exports
+# (only used with Elasticsearch 5 or later)
+ES_EXPORT_SCROLL_SLICES = 4
 
 BITLY_OAUTH_TOKEN = None
 